@@ -20,6 +20,7 @@ along with evo.  If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
 import logging
+import os
 import typing
 
 from evo.core.metrics import PoseRelation, Unit
@@ -73,6 +74,15 @@ def load_trajectories(
     else:
         raise KeyError("unknown sub-command: {}".format(args.subcommand))
 
+    # Validate the rotations once here instead of in every angle extraction.
+    # Only the angle and twist pose relations extract angles, the others
+    # don't need to pay for the validation.
+    if get_pose_relation(args) in (PoseRelation.rotation_angle_deg,
+                                   PoseRelation.rotation_angle_rad,
+                                   PoseRelation.twist):
+        for traj in (traj_ref, traj_est):
+            traj.validate_so3()
+
     return traj_ref, traj_est, ref_name, est_name
 
 
@@ -91,6 +101,8 @@ def get_pose_relation(args: argparse.Namespace) -> PoseRelation:
         pose_relation = PoseRelation.point_distance
     elif args.pose_relation == "point_distance_error_ratio":
         pose_relation = PoseRelation.point_distance_error_ratio
+    elif args.pose_relation == "twist":
+        pose_relation = PoseRelation.twist
     return pose_relation
 
 
@@ -107,6 +119,19 @@ def get_delta_unit(args: argparse.Namespace) -> Unit:
     return delta_unit
 
 
+def sweep_results_path(path: str, name: str, value: float) -> str:
+    """
+    :param path: the result path given by the user
+    :param name: name of the swept parameter
+    :param value: parameter value of one step of the sweep
+    :return: path of the result file of this step,
+             e.g. results.zip -> results_delta_100.zip
+    """
+    base, ext = os.path.splitext(path)
+    value_str = str(int(value)) if float(value).is_integer() else str(value)
+    return "{}_{}_{}{}".format(base, name, value_str, ext)
+
+
 def plot_result(args: argparse.Namespace, result: Result, traj_ref: PosePath3D,
                 traj_est: PosePath3D,
                 traj_ref_full: typing.Optional[PosePath3D] = None) -> None:
@@ -18,6 +18,7 @@ You should have received a copy of the GNU General Public License
 along with evo.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import concurrent.futures
 import logging
 import typing
 
@@ -35,10 +36,12 @@ class FilterException(EvoException):
 
 
 IdPairs = typing.List[typing.Tuple[int, int]]
+ProgressCallback = typing.Callable[[int, int], None]
 
 
-def filter_pairs_by_index(poses: typing.Sequence[np.ndarray], delta: int,
-                          all_pairs: bool = False) -> IdPairs:
+def filter_pairs_by_index(
+        poses: typing.Union[typing.Sequence[np.ndarray], np.ndarray],
+        delta: int, all_pairs: bool = False) -> IdPairs:
     """
     filters pairs in a list of SE(3) poses by their index distance
     :param poses: list of SE(3) poses
@@ -55,8 +58,11 @@ def filter_pairs_by_index(poses: typing.Sequence[np.ndarray], delta: int,
     return id_pairs
 
 
-def filter_pairs_by_path(poses: typing.Sequence[np.ndarray], delta: float,
-                         tol: float = 0.0, all_pairs: bool = False) -> IdPairs:
+def filter_pairs_by_path(
+        poses: typing.Union[typing.Sequence[np.ndarray], np.ndarray],
+        delta: float, tol: float = 0.0,
+        all_pairs: bool = False,
+        distances: typing.Optional[np.ndarray] = None) -> IdPairs:
     """
     filters pairs in a list of SE(3) poses by their path distance in meters
      - the accumulated, traveled path distance between the two pair points
@@ -66,38 +72,174 @@ def filter_pairs_by_path(poses: typing.Sequence[np.ndarray], delta: float,
     :param tol: absolute path tolerance to accept or reject pairs
                 in all_pairs mode
     :param all_pairs: use all pairs instead of consecutive pairs
+    :param distances: accumulated distances of the poses, can be passed
+                      to reuse them when filtering with multiple deltas
     :return: list of index tuples of the filtered pairs
     """
-    id_pairs = []
+    id_pairs: IdPairs = []
     if all_pairs:
-        positions = np.array([pose[:3, 3] for pose in poses])
-        distances = geometry.accumulated_distances(positions)
-        for i in range(distances.size - 1):
-            offset = i + 1
-            distances_from_here = distances[offset:] - distances[i]
-            candidate_index = int(
-                np.argmin(np.abs(distances_from_here - delta)))
-            if (np.abs(distances_from_here[candidate_index] - delta) > tol):
-                continue
-            id_pairs.append((i, candidate_index + offset))
+        if distances is None:
+            positions = np.asarray(poses)[:, :3, 3]
+            distances = geometry.accumulated_distances(positions)
+        if distances.size < 2:
+            return id_pairs
+        # The accumulated distances are monotonic, so the end index closest
+        # to the target distance of each start index is next to the
+        # insertion index of the target. Candidates around it are checked
+        # to be robust against rounding, the first index of a group of equal
+        # distances is used for ties.
+        start_ids = np.arange(distances.size - 1)
+        targets = distances[start_ids] + delta
+        insertion_ids = np.searchsorted(distances, targets, side="left")
+        candidates = insertion_ids[:, np.newaxis] + np.arange(-2, 2)
+        candidates = np.clip(candidates, start_ids[:, np.newaxis] + 1,
+                             distances.size - 1)
+        candidates = np.maximum(
+            np.searchsorted(distances, distances[candidates], side="left"),
+            start_ids[:, np.newaxis] + 1)
+        errors = np.abs((distances[candidates] -
+                         distances[start_ids, np.newaxis]) - delta)
+        best = np.argmin(errors, axis=1)
+        end_ids = candidates[start_ids, best]
+        valid = ~(errors[start_ids, best] > tol)
+        id_pairs = list(
+            zip(start_ids[valid].tolist(), end_ids[valid].tolist()))
     else:
-        ids = []
-        previous_pose = poses[0]
-        current_path = 0.0
-        for i, current_pose in enumerate(poses):
-            current_path += float(
-                np.linalg.norm(current_pose[:3, 3] - previous_pose[:3, 3]))
-            previous_pose = current_pose
-            if current_path >= delta:
-                ids.append(i)
-                current_path = 0.0
+        positions = np.asarray(poses)[:, :3, 3]
+
+        def exact_steps(start: int, stop: int) -> typing.List[float]:
+            return [
+                float(np.linalg.norm(positions[i] - positions[max(i - 1, 0)]))
+                for i in range(start, stop)
+            ]
+
+        # Step i is the distance between pose i-1 and i (0 for the first).
+        steps = np.concatenate(
+            ([0.], np.linalg.norm(np.diff(positions, axis=0), axis=1)))
+        ids = _accumulated_segment_ends(steps, delta, exact_steps)
         id_pairs = [(i, j) for i, j in zip(ids, ids[1:])]
     return id_pairs
 
 
-def filter_pairs_by_angle(poses: typing.Sequence[np.ndarray], delta: float,
-                          tol: float = 0.0, degrees: bool = False,
-                          all_pairs: bool = False) -> IdPairs:
+def _accumulated_segment_ends(
+        steps: np.ndarray, delta: float,
+        exact_steps: typing.Callable[[int, int], typing.Sequence[float]]
+) -> typing.List[int]:
+    """
+    Vectorized equivalent of the loop:
+        total = 0.0
+        for i, step in enumerate(steps):
+            total += step
+            if total >= delta:
+                ends.append(i)
+                total = 0.0
+    The end of a segment starting at each index is found with a single
+    searchsorted on the prefix sums of the non-negative steps, the segments
+    are then chained in O(1) each. Prefix sum differences and bulk computed
+    steps can differ from the loop by rounding, so segments that end too
+    close to delta to decide are checked with the sequential sum (like the
+    loop) of exact_steps(start, stop), the steps computed like in the
+    original loop. stop is bounded by the first index that is beyond delta
+    even with rounding, so the checks sum each step at most about once.
+    :param steps: array of the non-negative steps
+    :param delta: threshold of the accumulated steps
+    :param exact_steps: returns the exact steps with indices [start, stop)
+    :return: indices of the steps that end a segment
+    """
+    prefix = np.cumsum(steps)
+    num_steps = len(steps)
+    if num_steps == 0:
+        return []
+    bases = np.concatenate(([0.], prefix[:-1]))
+    segment_ends = np.maximum(
+        np.searchsorted(prefix, bases + delta, side="left"),
+        np.arange(num_steps))
+    eps = np.finfo(float).eps
+    ends = []
+    start = 0
+    while start < num_steps:
+        base = bases[start]
+        end = int(segment_ends[start])
+        # Bound of the rounding differences to the loop.
+        margin = 4 * (end - start + 4) * eps * max(abs(delta),
+                                                  abs(prefix[-1]))
+        ambiguous = (end > start and
+                     delta - (prefix[end - 1] - base) <= margin)
+        if end < num_steps:
+            ambiguous |= (prefix[end] - base) - delta <= margin
+        if ambiguous:
+            # The loop's end is before the first step with a sum beyond
+            # delta + margin, the slack covers rounding of exact_steps.
+            stop = min(
+                int(np.searchsorted(prefix, base + delta + margin,
+                                    side="right")) + 2, num_steps)
+            totals = np.cumsum(exact_steps(start, stop))
+            end = start + int(np.searchsorted(totals, delta, side="left"))
+        if end >= num_steps:
+            break
+        ends.append(end)
+        start = end + 1
+    return ends
+
+
+def _all_pairs_by_angle(
+        poses: np.ndarray, lower_bound: float, upper_bound: float,
+        block_size: int, workers: typing.Optional[int],
+        progress_callback: typing.Optional[ProgressCallback]) -> IdPairs:
+    """
+    Searches all pairs with a relative rotation angle within the bounds.
+    All rotations are converted to unit quaternions once, the angle of a
+    pair is then 2 * acos(|q_i . q_j|). Since the angle decreases with the
+    absolute dot product, the bounds are checked on the dot products.
+    """
+    if block_size < 1:
+        raise FilterException("block_size must be a positive integer")
+    quats = lie.so3_to_quat_wxyz_batch(poses[:, :3, :3])
+    # Bounds of |q_i . q_j|, angles are within [0, pi].
+    max_dot = np.cos(lower_bound / 2) if lower_bound > 0 else np.inf
+    min_dot = np.cos(upper_bound / 2) if upper_bound < np.pi else -np.inf
+
+    def process_tile(tile: typing.Tuple[int, int]) -> np.ndarray:
+        row_start, col_start = tile
+        rows = quats[row_start:row_start + block_size]
+        cols = quats[col_start:col_start + block_size]
+        dots = np.abs(np.matmul(rows, cols.T))
+        matches = (min_dot <= dots) & (dots <= max_dot)
+        if row_start == col_start:
+            # Only pairs (i, j) with i < j.
+            matches = np.triu(matches, k=1)
+        i, j = np.nonzero(matches)
+        return np.stack((i + row_start, j + col_start), axis=1)
+
+    # Tiles of the upper triangle of the n x n pair matrix.
+    starts = range(0, len(quats), block_size)
+    tiles = [(r, c) for r in starts for c in starts if c >= r]
+    logger.info("Searching all pairs with matching rotation delta in {} "
+                "tiles, this can take a while.".format(len(tiles)))
+    matches = []
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        # numpy releases the GIL in the heavy operations of the tiles.
+        for i, tile_matches in enumerate(executor.map(process_tile, tiles)):
+            matches.append(tile_matches)
+            if progress_callback is not None:
+                progress_callback(i + 1, len(tiles))
+            elif (i + 1) * 10 // len(tiles) > i * 10 // len(tiles):
+                logger.debug("Processed {}% of the tiles.".format(
+                    (i + 1) * 100 // len(tiles)))
+    if not matches:
+        return []
+    id_pairs = np.concatenate(matches)
+    id_pairs = id_pairs[np.lexsort((id_pairs[:, 1], id_pairs[:, 0]))]
+    return list(zip(id_pairs[:, 0].tolist(), id_pairs[:, 1].tolist()))
+
+
+def filter_pairs_by_angle(
+        poses: typing.Union[typing.Sequence[np.ndarray], np.ndarray],
+        delta: float, tol: float = 0.0,
+        degrees: bool = False, all_pairs: bool = False,
+        block_size: int = 1024, workers: typing.Optional[int] = None,
+        progress_callback: typing.Optional[ProgressCallback] = None
+) -> IdPairs:
     """
     filters pairs in a list of SE(3) poses by their relative angle
      - by default, the angle accumulated on the path between the two pair poses
@@ -110,6 +252,13 @@ def filter_pairs_by_angle(poses: typing.Sequence[np.ndarray], delta: float,
                 in all_pairs mode
     :param degrees: set to True if <delta> is in degrees instead of radians
     :param all_pairs: use all pairs instead of consecutive pairs
+    :param block_size: all_pairs mode compares the poses in tiles of
+                       block_size x block_size pairs, the memory used per
+                       worker is proportional to block_size^2
+    :param workers: max. number of threads processing tiles in parallel
+                    (default: chosen by concurrent.futures)
+    :param progress_callback: optional, called with the number of processed
+                              and total tiles in all_pairs mode
     :return: list of index tuples of the filtered pairs
     """
     # Angle-axis angles are within [0, pi] / [0, 180] (Euler theorem).
@@ -119,42 +268,26 @@ def filter_pairs_by_angle(poses: typing.Sequence[np.ndarray], delta: float,
     delta = np.deg2rad(delta) if degrees else delta
     tol = np.deg2rad(tol) if degrees else tol
     if all_pairs:
-        upper_bound = delta + tol
-        lower_bound = delta - tol
-        id_pairs = []
-        ids = list(range(len(poses)))
-        # All pairs search is O(n^2) here. Use vectorized operations with
-        # scipy.spatial.transform.Rotation for quicker processing.
-        logger.info("Searching all pairs with matching rotation delta,"
-                    " this can take a while.")
-        start_indices = ids[:-1]
-        for i in start_indices:
-            if not i % 100:
-                print(int(i / len(start_indices) * 100), "%", end="\r")
-            offset = i + 1
-            end_indices = ids[offset:]
-            rotations_i = lie.sst_rotation_from_matrix(
-                np.array([poses[i][:3, :3]] * len(end_indices)))
-            rotations_j = lie.sst_rotation_from_matrix(
-                np.array([poses[j][:3, :3] for j in end_indices]))
-            delta_angles = np.linalg.norm(
-                (rotations_i.inv() * rotations_j).as_rotvec(), axis=1)
-            matches = np.argwhere((lower_bound <= delta_angles)
-                                  & (delta_angles <= upper_bound)) + offset
-            id_pairs.extend([(i, j) for j in matches.flatten().tolist()])
+        id_pairs = _all_pairs_by_angle(np.asarray(poses), delta - tol,
+                                       delta + tol, block_size, workers,
+                                       progress_callback)
     else:
-        delta_angles = [
-            lie.so3_log_angle(lie.relative_so3(p1[:3, :3], p2[:3, :3]))
-            for p1, p2 in zip(poses, poses[1:])
+        rotations = np.asarray(poses)[:, :3, :3]
+
+        def exact_steps(start: int, stop: int) -> typing.List[float]:
+            return [
+                lie.so3_log_angle(
+                    lie.relative_so3(rotations[i], rotations[i + 1]))
+                for i in range(start, stop)
+            ]
+
+        # Step i is the angle between pose i and i+1.
+        delta_angles = lie.so3_log_angle_batch(
+            lie.relative_so3_batch(rotations[:-1], rotations[1:]))
+        end_ids = [
+            i + 1
+            for i in _accumulated_segment_ends(delta_angles, delta,
+                                               exact_steps)
         ]
-        accumulated_delta = 0.0
-        current_start_index = 0
-        id_pairs = []
-        for i, current_delta in enumerate(delta_angles):
-            end_index = i + 1
-            accumulated_delta += current_delta
-            if accumulated_delta >= delta:
-                id_pairs.append((current_start_index, end_index))
-                accumulated_delta = 0.0
-                current_start_index = end_index
+        id_pairs = list(zip([0] + end_ids[:-1], end_ids))
     return id_pairs
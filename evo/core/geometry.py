@@ -30,6 +30,55 @@ class GeometryException(EvoException):
 
 
 UmeyamaResult = typing.Tuple[np.ndarray, np.ndarray, float]
+UmeyamaBatchResult = typing.Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _umeyama_from_moments(
+        mean_x: np.ndarray, mean_y: np.ndarray, sigma_x: np.ndarray,
+        cov_xy: np.ndarray, with_scale: bool,
+        rank_tol: typing.Optional[np.ndarray] = None) -> UmeyamaBatchResult:
+    """
+    Solves the Umeyama problem for a stack of k point set pairs,
+    given their means, variances and cross-covariance matrices.
+    :param mean_x: kxm means of x (eq. 34)
+    :param mean_y: kxm means of y (eq. 35)
+    :param sigma_x: k variances of x (eq. 36)
+    :param cov_xy: kxmxm covariance matrices (eq. 38)
+    :param with_scale: set to True to align also the scale
+    :param rank_tol: k thresholds for singular values that are considered
+                     zero in the rank check (default: machine epsilon)
+    :return: r, t, c - stacked rotations (kxmxm), translations (kxm)
+             and scale factors (k)
+    """
+    k, m = mean_x.shape
+
+    # SVD (text betw. eq. 38 and 39)
+    u, d, v = np.linalg.svd(cov_xy)
+    if rank_tol is None:
+        rank_tol = np.full(k, np.finfo(d.dtype).eps)
+    degenerate = np.count_nonzero(d > rank_tol[:, np.newaxis],
+                                  axis=1) < m - 1
+    if np.any(degenerate):
+        raise GeometryException("Degenerate covariance rank, "
+                                "Umeyama alignment is not possible")
+
+    # S matrix, eq. 43
+    s = np.tile(np.eye(m), (k, 1, 1))
+    # Ensure a RHS coordinate system (Kabsch algorithm).
+    s[np.linalg.det(u) * np.linalg.det(v) < 0.0, m - 1, m - 1] = -1
+
+    # rotation, eq. 40
+    r = np.matmul(np.matmul(u, s), v)
+
+    # scale & translation, eq. 42 and 41
+    if with_scale:
+        # trace(diag(d) * S), S is diagonal
+        c = 1 / sigma_x * np.einsum("ki,kii->k", d, s)
+    else:
+        c = np.ones(k)
+    t = mean_y - c[:, np.newaxis] * np.einsum("kij,kj->ki", r, mean_x)
+
+    return r, t, c
 
 
 def umeyama_alignment(x: np.ndarray, y: np.ndarray,
@@ -56,42 +105,153 @@ def umeyama_alignment(x: np.ndarray, y: np.ndarray,
 
     # variance, eq. 36
     # "transpose" for column subtraction
-    sigma_x = 1.0 / n * (np.linalg.norm(x - mean_x[:, np.newaxis])**2)
+    x_centered = x - mean_x[:, np.newaxis]
+    sigma_x = 1.0 / n * (np.linalg.norm(x_centered)**2)
 
     # covariance matrix, eq. 38
-    outer_sum = np.zeros((m, m))
-    for i in range(n):
-        outer_sum += np.outer((y[:, i] - mean_y), (x[:, i] - mean_x))
-    cov_xy = np.multiply(1.0 / n, outer_sum)
+    cov_xy = 1.0 / n * np.dot(y - mean_y[:, np.newaxis], x_centered.T)
 
-    # SVD (text betw. eq. 38 and 39)
-    u, d, v = np.linalg.svd(cov_xy)
-    if np.count_nonzero(d > np.finfo(d.dtype).eps) < m - 1:
-        raise GeometryException("Degenerate covariance rank, "
-                                "Umeyama alignment is not possible")
+    r, t, c = _umeyama_from_moments(mean_x[np.newaxis], mean_y[np.newaxis],
+                                    np.array([sigma_x]), cov_xy[np.newaxis],
+                                    with_scale)
+    return r[0], t[0], float(c[0])
 
-    # S matrix, eq. 43
-    s = np.eye(m)
-    if np.linalg.det(u) * np.linalg.det(v) < 0.0:
-        # Ensure a RHS coordinate system (Kabsch algorithm).
-        s[m - 1, m - 1] = -1
 
-    # rotation, eq. 40
-    r = u.dot(s).dot(v)
+def umeyama_alignment_batch(x: typing.Sequence[np.ndarray],
+                            y: typing.Sequence[np.ndarray],
+                            with_scale: bool = False) -> UmeyamaBatchResult:
+    """
+    Like umeyama_alignment(), but for k pairs of point sets at once.
+    The SVDs of all pairs are computed in a single stacked call.
+    :param x: k mxn_i matrices of points (or a kxmxn array)
+    :param y: k mxn_i matrices of points (or a kxmxn array), n_i must match
+              the number of points of the corresponding matrix in x
+    :param with_scale: set to True to align also the scale (default: 1.0 scale)
+    :return: r, t, c - stacked rotations (kxmxm), translations (kxm)
+             and scale factors (k)
+    """
+    if len(x) != len(y):
+        raise GeometryException("need the same number of data matrices")
+    if len(x) == 0:
+        raise GeometryException("no data matrices")
+    if isinstance(x, np.ndarray) and isinstance(y, np.ndarray) \
+            and x.ndim == 3:
+        if x.shape != y.shape:
+            raise GeometryException("data matrices must have the same shape")
+        n = x.shape[2]
+        mean_x = x.mean(axis=2)
+        mean_y = y.mean(axis=2)
+        x_centered = x - mean_x[:, :, np.newaxis]
+        sigma_x = 1.0 / n * np.einsum("kij,kij->k", x_centered, x_centered)
+        cov_xy = 1.0 / n * np.matmul(y - mean_y[:, :, np.newaxis],
+                                     np.swapaxes(x_centered, 1, 2))
+    else:
+        if any(x_i.shape != y_i.shape for x_i, y_i in zip(x, y)):
+            raise GeometryException("data matrices must have the same shape")
+        if len(set(x_i.shape[0] for x_i in x)) != 1:
+            raise GeometryException("data matrices must have same dimension")
+        mean_x = np.array([x_i.mean(axis=1) for x_i in x])
+        mean_y = np.array([y_i.mean(axis=1) for y_i in y])
+        x_centered = [x_i - mu[:, np.newaxis] for x_i, mu in zip(x, mean_x)]
+        sigma_x = np.array([
+            1.0 / x_i.shape[1] * np.linalg.norm(x_c)**2
+            for x_i, x_c in zip(x, x_centered)
+        ])
+        cov_xy = np.array([
+            1.0 / y_i.shape[1] * np.dot(y_i - mu[:, np.newaxis], x_c.T)
+            for y_i, mu, x_c in zip(y, mean_y, x_centered)
+        ])
+    return _umeyama_from_moments(mean_x, mean_y, sigma_x, cov_xy, with_scale)
 
-    # scale & translation, eq. 42 and 41
-    c = 1 / sigma_x * np.trace(np.diag(d).dot(s)) if with_scale else 1.0
-    t = mean_y - np.multiply(c, r.dot(mean_x))
 
-    return r, t, c
+def umeyama_alignment_prefixes(
+        x: np.ndarray, y: np.ndarray, with_scale: bool = False,
+        lengths: typing.Optional[typing.Sequence[int]] = None
+) -> UmeyamaBatchResult:
+    """
+    Computes umeyama_alignment(x[:, :n], y[:, :n], with_scale) for many
+    prefix lengths n at once, e.g. to study the influence of the number of
+    aligned poses. Running sums of the means, variances and covariances are
+    precomputed in one pass, so each length costs O(1) afterwards.
+    :param x: mxn matrix of points, m = dimension, n = nr. of data points
+    :param y: mxn matrix of points, m = dimension, n = nr. of data points
+    :param with_scale: set to True to align also the scale (default: 1.0 scale)
+    :param lengths: the prefix lengths (numbers of points) to solve for,
+                    each within [m, n] (default: all prefixes from m to n)
+    :return: r, t, c - stacked rotations (kxmxm), translations (kxm)
+             and scale factors (k) for the k lengths, in the given order
+    """
+    if x.shape != y.shape:
+        raise GeometryException("data matrices must have the same shape")
+    m, n = x.shape
+    if lengths is None:
+        prefix_lengths = np.arange(min(m, n), n + 1)
+    else:
+        prefix_lengths = np.asarray(lengths, dtype=int)
+    if prefix_lengths.size == 0:
+        raise GeometryException("no prefix lengths given")
+    # Fewer points than dimensions can't determine the rotation, check all
+    # lengths before solving instead of failing within the batch.
+    invalid = prefix_lengths[(prefix_lengths < m) | (prefix_lengths > n)]
+    if invalid.size != 0:
+        raise GeometryException(
+            "prefix lengths must be within [{}, {}] (at least one point per "
+            "dimension, at most all points), invalid: {}".format(
+                m, n, sorted(set(invalid.tolist()))))
+
+    # Translation doesn't affect rotation and scale, shift the data to
+    # avoid cancellation in the running sums (variance = E[x^2] - E[x]^2).
+    offset_x = x.mean(axis=1)
+    offset_y = y.mean(axis=1)
+    x = (x - offset_x[:, np.newaxis]).T
+    y = (y - offset_y[:, np.newaxis]).T
+
+    # Sums over the segments between the sorted unique lengths,
+    # accumulated to prefix sums afterwards.
+    unique_lengths, inverse = np.unique(prefix_lengths, return_inverse=True)
+    x = x[:unique_lengths[-1]]
+    y = y[:unique_lengths[-1]]
+    starts = np.concatenate(([0], unique_lengths[:-1]))
+    sum_x = np.cumsum(np.add.reduceat(x, starts, axis=0), axis=0)
+    sum_y = np.cumsum(np.add.reduceat(y, starts, axis=0), axis=0)
+    sum_xx = np.cumsum(np.add.reduceat(np.einsum("ni,ni->n", x, x), starts))
+    sum_yy = np.cumsum(np.add.reduceat(np.einsum("ni,ni->n", y, y), starts))
+    sum_yx = np.cumsum(
+        np.add.reduceat(np.einsum("ni,nj->nij", y, x), starts, axis=0),
+        axis=0)
+
+    counts = unique_lengths.astype(float)
+    mean_x = sum_x / counts[:, np.newaxis]
+    mean_y = sum_y / counts[:, np.newaxis]
+    sigma_x = sum_xx / counts - np.einsum("ki,ki->k", mean_x, mean_x)
+    cov_xy = (sum_yx / counts[:, np.newaxis, np.newaxis] -
+              np.einsum("ki,kj->kij", mean_y, mean_x))
+
+    # The subtraction in cov_xy leaves rounding noise instead of exact zeros
+    # in degenerate cases, use a rank tolerance relative to its magnitude.
+    rank_tol = 16 * np.finfo(float).eps * np.maximum(
+        np.sqrt(sum_xx * sum_yy) / counts, 1.)
+
+    r, t, c = _umeyama_from_moments(mean_x, mean_y, sigma_x, cov_xy,
+                                    with_scale, rank_tol)
+    # Undo the shift: y = c * r * (x - offset_x) + t + offset_y
+    t = t + offset_y - c[:, np.newaxis] * np.einsum("kij,j->ki", r, offset_x)
+    return r[inverse], t[inverse], c[inverse]
 
 
-def arc_len(x: np.ndarray) -> float:
+def arc_len(x: np.ndarray, chunk_size: int = 1 << 20) -> float:
     """
     :param x: nxm array of points, m=dimension
+    :param chunk_size: number of points processed at once, bounds the size
+                       of temporary arrays e.g. for memory mapped points
     :return: the (discrete approximated) arc-length of the point sequence
     """
-    return np.sum(np.linalg.norm(x[:-1] - x[1:], axis=1))
+    length = 0.
+    # Chunks overlap by one point to include all consecutive pairs.
+    for start in range(0, max(len(x) - 1, 1), chunk_size):
+        chunk = x[start:start + chunk_size + 1]
+        length += np.sum(np.linalg.norm(chunk[:-1] - chunk[1:], axis=1))
+    return length
 
 
 def accumulated_distances(x: np.ndarray) -> np.ndarray:
@@ -64,6 +64,19 @@ def hat(v: np.ndarray) -> np.ndarray:
     # yapf: enable
 
 
+def hat_batch(v: np.ndarray) -> np.ndarray:
+    """
+    :param v: nx3 array of vectors
+    :return: nx3x3 array of skew symmetric matrices
+    """
+    v = np.asarray(v)
+    m = np.zeros((v.shape[0], 3, 3))
+    m[:, 0, 1], m[:, 0, 2] = -v[:, 2], v[:, 1]
+    m[:, 1, 0], m[:, 1, 2] = v[:, 2], -v[:, 0]
+    m[:, 2, 0], m[:, 2, 1] = -v[:, 1], v[:, 0]
+    return m
+
+
 def vee(m: np.ndarray) -> np.ndarray:
     """
     :param m: 3x3 skew symmetric matrix
@@ -84,16 +97,19 @@ def so3_exp(rotation_vector: np.ndarray):
         return sst.Rotation.from_rotvec(rotation_vector).as_matrix()
 
 
-def so3_log(r: np.ndarray, return_skew: bool = False) -> np.ndarray:
+def so3_log(r: np.ndarray, return_skew: bool = False,
+            check: bool = True) -> np.ndarray:
     """
     :param r: SO(3) rotation matrix
     :param return_skew: return skew symmetric Lie algebra element
+    :param check: validate r, set to False to skip this for trusted input
+                  that was validated before
     :return:
             rotation vector (axis * angle)
         or if return_skew is True:
              3x3 skew symmetric logarithmic map in so(3) (Ma, Soatto eq. 2.8)
     """
-    if not is_so3(r):
+    if check and not is_so3(r):
         raise LieAlgebraException("matrix is not a valid SO(3) group element")
     rotation_vector = sst_rotation_from_matrix(r).as_rotvec()
     if return_skew:
@@ -102,18 +118,64 @@ def so3_log(r: np.ndarray, return_skew: bool = False) -> np.ndarray:
         return rotation_vector
 
 
-def so3_log_angle(r: np.ndarray, degrees: bool = False) -> float:
+def so3_log_angle(r: np.ndarray, degrees: bool = False,
+                  check: bool = True) -> float:
     """
     :param r: SO(3) rotation matrix
     :param degrees: whether to return in degrees, default is radians
+    :param check: validate r, set to False to skip this for trusted input
+                  that was validated before
     :return: the rotation angle of the logarithmic map
     """
-    angle = np.linalg.norm(so3_log(r, return_skew=False))
+    angle = np.linalg.norm(so3_log(r, return_skew=False, check=check))
     if degrees:
         angle = np.rad2deg(angle)
     return float(angle)
 
 
+def so3_log_batch(r: np.ndarray, return_skew: bool = False,
+                  check: bool = True) -> np.ndarray:
+    """
+    Vectorized equivalent of so3_log() for many matrices.
+    :param r: nx3x3 array of SO(3) rotation matrices
+    :param return_skew: return skew symmetric Lie algebra elements
+    :param check: validate r, set to False to skip this for trusted input
+                  that was validated before
+    :return:
+            nx3 array of rotation vectors (axis * angle)
+        or if return_skew is True:
+             nx3x3 array of skew symmetric matrices in so(3)
+    """
+    r = np.asarray(r)
+    if check and not np.all(is_so3_batch(r)):
+        raise LieAlgebraException(
+            "matrices are not all valid SO(3) group elements")
+    if r.shape[0] == 0:
+        rotation_vectors = np.empty((0, 3))
+    else:
+        rotation_vectors = sst_rotation_from_matrix(r).as_rotvec()
+    if return_skew:
+        return hat_batch(rotation_vectors)
+    else:
+        return rotation_vectors
+
+
+def so3_log_angle_batch(r: np.ndarray, degrees: bool = False,
+                        check: bool = True) -> np.ndarray:
+    """
+    Vectorized equivalent of so3_log_angle() for many matrices.
+    :param r: nx3x3 array of SO(3) rotation matrices
+    :param degrees: whether to return in degrees, default is radians
+    :param check: validate r, set to False to skip this for trusted input
+                  that was validated before
+    :return: array of the n rotation angles of the logarithmic map
+    """
+    angles = np.linalg.norm(so3_log_batch(r, check=check), axis=1)
+    if degrees:
+        angles = np.rad2deg(angles)
+    return angles
+
+
 def se3(r: np.ndarray = np.eye(3),
         t: np.ndarray = np.array([0, 0, 0])) -> np.ndarray:
     """
@@ -158,6 +220,105 @@ def se3_inverse(p: np.ndarray) -> np.ndarray:
     return se3(r_inv, t_inv)
 
 
+def se3_inverse_batch(p: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of se3_inverse() for many poses.
+    :param p: nx4x4 array of absolute SE(3) poses
+    :return: nx4x4 array of the inverted poses
+    """
+    p = np.asarray(p)
+    p_inv = np.zeros(p.shape)
+    p_inv[:, :3, :3] = p[:, :3, :3].transpose(0, 2, 1)
+    p_inv[:, :3, 3] = -np.einsum("nij,nj->ni", p_inv[:, :3, :3], p[:, :3, 3])
+    p_inv[:, 3, 3] = 1.0
+    return p_inv
+
+
+def _se3_jacobian_coefficients(
+        theta: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Coefficients of the left Jacobian V = I + a * W + b * W^2 of SO(3) and
+    of its inverse V^-1 = I - 0.5 * W + c * W^2, with W = hat(axis * theta).
+    Taylor expansions are used for small angles to avoid 0 / 0.
+    :param theta: array of rotation angles
+    :return: arrays a, b, c
+    """
+    small = theta < 1e-4
+    t = np.where(small, 1.0, theta)
+    t_sq = t * t
+    # 1 - cos(t) = 2 * sin(t / 2)^2 without cancellation for small t
+    half_sin = np.sin(t / 2)
+    a = np.where(small, 0.5 - theta**2 / 24, 2 * half_sin**2 / t_sq)
+    b = np.where(small, 1 / 6 - theta**2 / 120, (t - np.sin(t)) / (t_sq * t))
+    c = np.where(small, 1 / 12 + theta**2 / 720,
+                 (1 - t / 2 * np.cos(t / 2) / half_sin) / t_sq)
+    return a, b, c
+
+
+def se3_exp(twist: np.ndarray) -> np.ndarray:
+    """
+    Computes an SE(3) matrix from a twist, see se3_exp_batch().
+    :param twist: 6x1 twist vector (v, omega)
+    :return: SE(3) transformation matrix (matrix exponential of se(3))
+    """
+    return se3_exp_batch(np.asarray(twist).reshape((1, 6)))[0]
+
+
+def se3_exp_batch(twists: np.ndarray) -> np.ndarray:
+    """
+    Vectorized SE(3) exponential map for many twists.
+    :param twists: nx6 array of twists, each with the translational part v
+                   first and the rotation vector omega last
+    :return: nx4x4 array of SE(3) transformation matrices
+    """
+    twists = np.asarray(twists, dtype=float)
+    p = np.zeros((twists.shape[0], 4, 4))
+    p[:, 3, 3] = 1.0
+    if twists.shape[0] == 0:
+        return p
+    v, omega = twists[:, :3], twists[:, 3:]
+    w = hat_batch(omega)
+    w_sq = np.matmul(w, w)
+    a, b, _ = _se3_jacobian_coefficients(np.linalg.norm(omega, axis=1))
+    V = np.eye(3) + a[:, None, None] * w + b[:, None, None] * w_sq
+    p[:, :3, :3] = so3_exp(omega)
+    p[:, :3, 3] = np.einsum("nij,nj->ni", V, v)
+    return p
+
+
+def se3_log(p: np.ndarray, check: bool = True) -> np.ndarray:
+    """
+    Computes the twist of an SE(3) matrix, see se3_log_batch().
+    :param p: SE(3) transformation matrix
+    :param check: validate p, set to False to skip this for trusted input
+                  that was validated before
+    :return: 6x1 twist vector (v, omega)
+    """
+    return se3_log_batch(np.asarray(p)[None], check=check)[0]
+
+
+def se3_log_batch(p: np.ndarray, check: bool = True) -> np.ndarray:
+    """
+    Vectorized SE(3) logarithmic map for many matrices.
+    :param p: nx4x4 array of SE(3) transformation matrices
+    :param check: validate p, set to False to skip this for trusted input
+                  that was validated before
+    :return: nx6 array of twists, each with the translational part v
+             first and the rotation vector omega last
+    """
+    p = np.asarray(p)
+    if check and not np.all(is_se3_batch(p)):
+        raise LieAlgebraException(
+            "matrices are not all valid SE(3) group elements")
+    omega = so3_log_batch(p[:, :3, :3], check=False)
+    w = hat_batch(omega)
+    w_sq = np.matmul(w, w)
+    _, _, c = _se3_jacobian_coefficients(np.linalg.norm(omega, axis=1))
+    V_inv = np.eye(3) - 0.5 * w + c[:, None, None] * w_sq
+    v = np.einsum("nij,nj->ni", V_inv, p[:, :3, 3])
+    return np.hstack((v, omega))
+
+
 def sim3_inverse(a: np.ndarray) -> np.ndarray:
     """
     :param a: Sim(3) matrix in form:
@@ -173,6 +334,23 @@ def sim3_inverse(a: np.ndarray) -> np.ndarray:
     return sim3(r, t, 1 / s)
 
 
+def sim3_inverse_batch(a: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of sim3_inverse() for many matrices.
+    :param a: nx4x4 array of Sim(3) matrices
+    :return: nx4x4 array of the inverse Sim(3) matrices
+    """
+    a = np.asarray(a)
+    s = np.power(np.linalg.det(a[:, :3, :3]), 1 / 3)
+    r = (a[:, :3, :3] / s[:, np.newaxis, np.newaxis]).transpose(0, 2, 1)
+    t = -np.einsum("nij,nj->ni", r, a[:, :3, 3] / s[:, np.newaxis])
+    a_inv = np.zeros(a.shape)
+    a_inv[:, :3, :3] = r / s[:, np.newaxis, np.newaxis]
+    a_inv[:, :3, 3] = t
+    a_inv[:, 3, 3] = 1.0
+    return a_inv
+
+
 def is_so3(r: np.ndarray) -> bool:
     """
     :param r: a 3x3 matrix
@@ -185,6 +363,19 @@ def is_so3(r: np.ndarray) -> bool:
     return det_valid and inv_valid
 
 
+def is_so3_batch(r: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of is_so3() for many matrices.
+    :param r: nx3x3 array of matrices
+    :return: boolean mask, True where r is in the SO(3) group
+    """
+    r = np.asarray(r)
+    det_valid = np.isclose(np.linalg.det(r), 1.0, atol=1e-6)
+    inv_valid = np.isclose(np.matmul(r.transpose(0, 2, 1), r), np.eye(3),
+                           atol=1e-6).all(axis=(1, 2))
+    return det_valid & inv_valid
+
+
 def is_se3(p: np.ndarray) -> bool:
     """
     :param p: a 4x4 matrix
@@ -195,6 +386,19 @@ def is_se3(p: np.ndarray) -> bool:
     return rot_valid and bool(lower_valid)
 
 
+def is_se3_batch(p: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of is_se3() for many matrices.
+    :param p: nx4x4 array of matrices
+    :return: boolean mask, True where p is in the SE(3) group
+    """
+    p = np.asarray(p)
+    rot_valid = is_so3_batch(p[:, :3, :3])
+    lower_valid = np.all(p[:, 3, :] == np.array([0.0, 0.0, 0.0, 1.0]),
+                         axis=1)
+    return rot_valid & lower_valid
+
+
 def is_sim3(p: np.ndarray, s: float) -> bool:
     """
     :param p: a 4x4 matrix
@@ -208,6 +412,67 @@ def is_sim3(p: np.ndarray, s: float) -> bool:
     return rot_valid and bool(lower_valid)
 
 
+def quat_wxyz_to_so3_batch(quat_wxyz: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of tr.quaternion_matrix() for many quaternions.
+    Non-unit quaternions are normalized, (near) zero ones map to identity.
+    :param quat_wxyz: nx4 array of quaternions (w, x, y, z)
+    :return: nx3x3 array of SO(3) matrices
+    """
+    q = np.array(quat_wxyz, dtype=np.float64).reshape((-1, 4))
+    n = np.einsum("ij,ij->i", q, q)
+    valid = n >= tr._EPS
+    q[valid] *= np.sqrt(2.0 / n[valid])[:, np.newaxis]
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    r = np.empty((q.shape[0], 3, 3))
+    r[:, 0, 0] = 1.0 - y * y - z * z
+    r[:, 0, 1] = x * y - z * w
+    r[:, 0, 2] = x * z + y * w
+    r[:, 1, 0] = x * y + z * w
+    r[:, 1, 1] = 1.0 - x * x - z * z
+    r[:, 1, 2] = y * z - x * w
+    r[:, 2, 0] = x * z - y * w
+    r[:, 2, 1] = y * z + x * w
+    r[:, 2, 2] = 1.0 - x * x - y * y
+    r[~valid] = np.eye(3)
+    return r
+
+
+def so3_to_quat_wxyz_batch(r: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of tr.quaternion_from_matrix() for many matrices,
+    with the same conventions: the quaternion is the eigenvector of the
+    largest eigenvalue of the symmetric matrix K (robust for slightly
+    non-orthogonal input) and the sign is chosen such that w >= 0.
+    :param r: nx3x3 array of SO(3) matrices (or nx4x4 SE(3) matrices)
+    :return: nx4 array of unit quaternions (w, x, y, z)
+    """
+    m = np.asarray(r, dtype=np.float64)[:, :3, :3]
+    m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+    # Only the lower triangle is used by eigh().
+    k = np.zeros((m.shape[0], 4, 4))
+    k[:, 0, 0] = m00 - m11 - m22
+    k[:, 1, 0] = m01 + m10
+    k[:, 1, 1] = m11 - m00 - m22
+    k[:, 2, 0] = m02 + m20
+    k[:, 2, 1] = m12 + m21
+    k[:, 2, 2] = m22 - m00 - m11
+    k[:, 3, 0] = m21 - m12
+    k[:, 3, 1] = m02 - m20
+    k[:, 3, 2] = m10 - m01
+    k[:, 3, 3] = m00 + m11 + m22
+    k /= 3.0
+    if k.shape[0] == 0:
+        return np.empty((0, 4))
+    w, v = np.linalg.eigh(k)
+    largest = np.argmax(w, axis=1)
+    q = v[np.arange(k.shape[0]), :, largest][:, [3, 0, 1, 2]]
+    q[q[:, 0] < 0.0] *= -1
+    return q
+
+
 def relative_so3(r1: np.ndarray, r2: np.ndarray) -> np.ndarray:
     """
     :param r1, r2: SO(3) matrices
@@ -216,6 +481,15 @@ def relative_so3(r1: np.ndarray, r2: np.ndarray) -> np.ndarray:
     return np.dot(r1.transpose(), r2)
 
 
+def relative_so3_batch(r1: np.ndarray, r2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of relative_so3() for many matrices.
+    :param r1, r2: nx3x3 arrays of SO(3) matrices
+    :return: nx3x3 array of the relative rotations r1^{⁻1} * r2
+    """
+    return np.matmul(np.asarray(r1).transpose(0, 2, 1), r2)
+
+
 def relative_se3(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
     """
     :param p1, p2: SE(3) matrices
@@ -224,6 +498,15 @@ def relative_se3(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
     return np.dot(se3_inverse(p1), p2)
 
 
+def relative_se3_batch(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of relative_se3() for many poses.
+    :param p1, p2: nx4x4 arrays of SE(3) matrices
+    :return: nx4x4 array of the relative transformations p1^{⁻1} * p2
+    """
+    return np.matmul(se3_inverse_batch(p1), p2)
+
+
 def random_so3() -> np.ndarray:
     """
     :return: a random SO(3) matrix (for debugging)
@@ -29,7 +29,7 @@ from enum import Enum
 import numpy as np
 
 from evo import EvoException
-from evo.core import filters, trajectory
+from evo.core import filters, geometry, trajectory
 from evo.core.result import Result
 from evo.core import lie_algebra as lie
 
@@ -65,6 +65,7 @@ class PoseRelation(Enum):
     rotation_angle_deg = "rotation angle in degrees"
     point_distance = "point distance"
     point_distance_error_ratio = "point distance error ratio"
+    twist = "twist"
 
 
 class Unit(Enum):
@@ -75,6 +76,8 @@ class Unit(Enum):
     radians = "rad"
     frames = "frames"
     percent = "%"  # used like a unit for display purposes
+    degrees_per_meter = "deg/m"
+    radians_per_meter = "rad/m"
 
 
 class VelUnit(Enum):
@@ -105,6 +108,10 @@ class PE(Metric):
     """
     Abstract base class of pose error metrics.
     """
+    # nx6 twist coordinates of the errors, set by the metrics that support
+    # PoseRelation.twist (exported by get_result() for that relation).
+    twists: np.ndarray
+
     def __init__(self):
         self.unit = Unit.none
         self.error = np.array([])
@@ -169,9 +176,115 @@ class PE(Metric):
         result.add_stats(self.get_all_statistics())
         if hasattr(self, "error"):
             result.add_np_array("error_array", self.error)
+        if getattr(self, "pose_relation", None) == PoseRelation.twist:
+            result.add_np_array("twists", self.twists)
         return result
 
 
+class StatisticsAccumulator(object):
+    """
+    Accumulates the statistics of non-negative error values that are added
+    in chunks, without keeping all values in memory.
+    The median is exact if median_accuracy is None, which requires to keep
+    all values. Otherwise it's approximated with a histogram of logarithmic
+    bins, with a relative error of at most median_accuracy.
+    """
+    def __init__(self, median_accuracy: typing.Optional[float] = None):
+        """
+        :param median_accuracy: relative accuracy of the approximate median
+                                in (0, 1), or None for the exact median
+        """
+        if median_accuracy is not None and not 0 < median_accuracy < 1:
+            raise MetricsException("median_accuracy must be in (0, 1)")
+        self.median_accuracy = median_accuracy
+        self.count = 0
+        self.sum = 0.
+        self.sum_of_squares = 0.
+        self.min = np.inf
+        self.max = -np.inf
+        # Sum of squared differences from the mean, for a stable std.
+        self._m2 = 0.
+        self._values: typing.List[np.ndarray] = []
+        # Counts of the logarithmic bins, see _bin_value().
+        self._bin_counts: typing.Dict[int, int] = {}
+        self._zero_count = 0
+        if median_accuracy is not None:
+            self._gamma = (1 + median_accuracy) / (1 - median_accuracy)
+
+    def add(self, values: np.ndarray) -> None:
+        """
+        :param values: array of error values
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        # Combine mean and m2 of both sets (Chan et al.).
+        chunk_mean = np.mean(values)
+        chunk_m2 = np.sum(np.square(values - chunk_mean))
+        if self.count != 0:
+            delta = chunk_mean - self.sum / self.count
+            self._m2 += chunk_m2 + delta**2 * self.count * values.size / (
+                self.count + values.size)
+        else:
+            self._m2 = chunk_m2
+        self.count += values.size
+        self.sum += float(np.sum(values))
+        self.sum_of_squares += float(np.sum(np.square(values)))
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+        if self.median_accuracy is None:
+            self._values.append(values)
+            return
+        positive = values[values > 0]
+        self._zero_count += values.size - positive.size
+        bins = np.ceil(np.log(positive) / np.log(self._gamma)).astype(int)
+        for i, count in zip(*np.unique(bins, return_counts=True)):
+            self._bin_counts[int(i)] = self._bin_counts.get(int(i),
+                                                            0) + int(count)
+
+    def _bin_value(self, i: int) -> float:
+        # Bin i holds the values in (gamma^(i-1), gamma^i], this value has
+        # a relative error of at most median_accuracy to all of them.
+        return 2 * self._gamma**i / (self._gamma + 1)
+
+    def _approximate_median(self) -> float:
+        bins = sorted(self._bin_counts)
+        cumulative_counts = self._zero_count + np.cumsum(
+            [self._bin_counts[i] for i in bins], dtype=int)
+        # Average of the two middle values for even counts, like np.median.
+        values = []
+        for rank in ((self.count - 1) // 2, self.count // 2):
+            if rank < self._zero_count:
+                values.append(0.)
+            else:
+                values.append(
+                    self._bin_value(bins[np.searchsorted(
+                        cumulative_counts, rank, side="right")]))
+        return float(np.mean(values))
+
+    def get_statistic(self, statistics_type: StatisticsType) -> float:
+        if self.count == 0:
+            raise MetricsException("no values were accumulated")
+        if statistics_type == StatisticsType.rmse:
+            return math.sqrt(self.sum_of_squares / self.count)
+        elif statistics_type == StatisticsType.sse:
+            return self.sum_of_squares
+        elif statistics_type == StatisticsType.mean:
+            return self.sum / self.count
+        elif statistics_type == StatisticsType.median:
+            if self.median_accuracy is None:
+                return float(np.median(np.concatenate(self._values)))
+            return self._approximate_median()
+        elif statistics_type == StatisticsType.max:
+            return self.max
+        elif statistics_type == StatisticsType.min:
+            return self.min
+        elif statistics_type == StatisticsType.std:
+            return math.sqrt(self._m2 / self.count)
+        else:
+            raise MetricsException("unsupported statistics_type")
+
+
 class RPE(PE):
     """
     RPE: relative pose error
@@ -181,22 +294,28 @@ class RPE(PE):
                  pose_relation: PoseRelation = PoseRelation.translation_part,
                  delta: float = 1.0, delta_unit: Unit = Unit.frames,
                  rel_delta_tol: float = 0.1, all_pairs: bool = False,
-                 pairs_from_reference: bool = False):
+                 pairs_from_reference: bool = False, retain_E: bool = True,
+                 chunk_size: int = 10000):
         if delta < 0:
             raise MetricsException("delta must be a positive number")
         if delta_unit == Unit.frames and not isinstance(delta, int) \
                 and not delta.is_integer():
             raise MetricsException(
                 "delta must be integer for delta unit {}".format(delta_unit))
+        if chunk_size < 1:
+            raise MetricsException("chunk_size must be a positive integer")
         self.delta = int(delta) if delta_unit == Unit.frames else delta
         self.delta_unit = delta_unit
         self.rel_delta_tol = rel_delta_tol
         self.pose_relation = pose_relation
         self.all_pairs = all_pairs
         self.pairs_from_reference = pairs_from_reference
-        self.E: typing.List[np.ndarray] = []
+        self.retain_E = retain_E
+        self.chunk_size = chunk_size
+        self.E: np.ndarray = np.array([])
         self.error = np.array([])
         self.delta_ids: typing.List[int] = []
+        self.twists = np.empty((0, 6))
         if pose_relation in (PoseRelation.translation_part,
                              PoseRelation.point_distance):
             self.unit = Unit.meters
@@ -237,6 +356,21 @@ class RPE(PE):
         E_i = lie.relative_se3(Q_rel, P_rel)
         return E_i
 
+    @staticmethod
+    def rpe_base_batch(Q_i: np.ndarray, Q_i_delta: np.ndarray,
+                       P_i: np.ndarray, P_i_delta: np.ndarray) -> np.ndarray:
+        """
+        Vectorized equivalent of rpe_base() for stacks of pose pairs.
+        :param Q_i: nx4x4 reference SE(3) poses at i
+        :param Q_i_delta: nx4x4 reference SE(3) poses at i+delta
+        :param P_i: nx4x4 estimated SE(3) poses at i
+        :param P_i_delta: nx4x4 estimated SE(3) poses at i+delta
+        :return: the nx4x4 RPE matrices E_i in SE(3)
+        """
+        Q_rel = lie.relative_se3_batch(Q_i, Q_i_delta)
+        P_rel = lie.relative_se3_batch(P_i, P_i_delta)
+        return lie.relative_se3_batch(Q_rel, P_rel)
+
     def process_data(self, data: PathPair) -> None:
         """
         Calculates the RPE on a batch of SE(3) poses from trajectories.
@@ -256,23 +390,49 @@ class RPE(PE):
             (traj_ref.poses_se3
              if self.pairs_from_reference else traj_est.poses_se3), self.delta,
             self.delta_unit, self.rel_delta_tol, all_pairs=self.all_pairs)
+        self.process_id_pairs(data, id_pairs)
 
+    def process_id_pairs(self, data: PathPair,
+                         id_pairs: typing.Union[filters.IdPairs, np.ndarray]
+                         ) -> None:
+        """
+        Calculates the RPE for given pose pairs, e.g. found in advance with
+        id_pairs_from_delta().
+        :param data: tuple (traj_ref, traj_est) with:
+        traj_ref: reference evo.trajectory.PosePath or derived
+        traj_est: estimated evo.trajectory.PosePath or derived
+        :param id_pairs: list of index tuples or (M,2) array of the pairs
+        """
+        traj_ref, traj_est = data
+        id_pairs = np.array(id_pairs, dtype=int).reshape((-1, 2))
+        if len(id_pairs) == 0:
+            raise MetricsException("empty index list of pose pairs, "
+                                   "can't calculate the RPE")
         # Store flat id list e.g. for plotting.
-        self.delta_ids = [j for i, j in id_pairs]
+        self.delta_ids = id_pairs[:, 1].tolist()
+
+        logger.debug(
+            "Compared {} relative pose pairs, delta = {} ({}) {}".format(
+                len(id_pairs), self.delta, self.delta_unit.value,
+                ("with all pairs." if self.all_pairs \
+                else "with consecutive pairs.")))
+
+        logger.debug("Calculating RPE for {} pose relation...".format(
+            self.pose_relation.value))
 
         if self.pose_relation in (PoseRelation.point_distance,
                                   PoseRelation.point_distance_error_ratio):
             # Only compares the magnitude of the point distance instead of
             # doing the full vector comparison of 'translation_part'.
             # Can be directly calculated on positions instead of full poses.
-            ref_distances = np.array([
-                np.linalg.norm(traj_ref.positions_xyz[i] -
-                               traj_ref.positions_xyz[j]) for i, j in id_pairs
-            ])
-            est_distances = np.array([
-                np.linalg.norm(traj_est.positions_xyz[i] -
-                               traj_est.positions_xyz[j]) for i, j in id_pairs
-            ])
+            positions_ref = traj_ref.positions_xyz
+            positions_est = traj_est.positions_xyz
+            ref_distances = np.linalg.norm(
+                positions_ref[id_pairs[:, 0]] - positions_ref[id_pairs[:, 1]],
+                axis=1)
+            est_distances = np.linalg.norm(
+                positions_est[id_pairs[:, 0]] - positions_est[id_pairs[:, 1]],
+                axis=1)
             self.error = np.abs(ref_distances - est_distances)
             if self.pose_relation == PoseRelation.point_distance_error_ratio:
                 nonzero = ref_distances.nonzero()[0]
@@ -283,60 +443,202 @@ class RPE(PE):
                     self.delta_ids = [self.delta_ids[i] for i in nonzero]
                 self.error = np.divide(self.error[nonzero],
                                        ref_distances[nonzero]) * 100
-        else:
-            # All other pose relations require the full pose error.
-            self.E = [
-                self.rpe_base(traj_ref.poses_se3[i], traj_ref.poses_se3[j],
-                              traj_est.poses_se3[i], traj_est.poses_se3[j])
-                for i, j in id_pairs
-            ]
-
-        logger.debug(
-            "Compared {} relative pose pairs, delta = {} ({}) {}".format(
-                len(self.E), self.delta, self.delta_unit.value,
-                ("with all pairs." if self.all_pairs \
-                else "with consecutive pairs.")))
-
-        logger.debug("Calculating RPE for {} pose relation...".format(
-            self.pose_relation.value))
-
-        if self.pose_relation in (PoseRelation.point_distance,
-                                  PoseRelation.point_distance_error_ratio):
-            # Already computed, see above.
-            pass
-        elif self.pose_relation == PoseRelation.translation_part:
-            self.error = [np.linalg.norm(E_i[:3, 3]) for E_i in self.E]
+            return
+
+        # All other pose relations require the full pose error.
+        # The pairs are processed in chunks to bound the memory used for
+        # the intermediate pose stacks.
+        poses_ref = traj_ref.poses_se3
+        poses_est = traj_est.poses_se3
+        # Relative poses of validated trajectories are valid as well.
+        check = not (traj_ref.so3_validated and traj_est.so3_validated)
+        errors = []
+        twists = []
+        E_chunks = []
+        for start in range(0, len(id_pairs), self.chunk_size):
+            i, j = id_pairs[start:start + self.chunk_size].T
+            E = self.rpe_base_batch(poses_ref[i], poses_ref[j], poses_est[i],
+                                    poses_est[j])
+            if self.pose_relation == PoseRelation.twist:
+                twists.append(lie.se3_log_batch(E, check=check))
+                errors.append(np.linalg.norm(twists[-1], axis=1))
+            else:
+                errors.append(self._errors_from_poses(E, check))
+            if self.retain_E:
+                E_chunks.append(E)
+        self.error = np.concatenate(errors)
+        if twists:
+            self.twists = np.concatenate(twists)
+        self.E = np.concatenate(E_chunks) if self.retain_E else np.array([])
+
+    def _errors_from_poses(self, E: np.ndarray,
+                           check: bool = True) -> np.ndarray:
+        """
+        :param E: nx4x4 RPE matrices
+        :param check: validate the rotations before the angle extraction
+        :return: the n errors w.r.t. the pose relation
+        """
+        if self.pose_relation == PoseRelation.translation_part:
+            return np.linalg.norm(E[:, :3, 3], axis=1)
         elif self.pose_relation == PoseRelation.rotation_part:
             # ideal: rot(E_i) = 3x3 identity
-            self.error = np.array([
-                np.linalg.norm(lie.so3_from_se3(E_i) - np.eye(3))
-                for E_i in self.E
-            ])
+            return np.linalg.norm(E[:, :3, :3] - np.eye(3), axis=(1, 2))
         elif self.pose_relation == PoseRelation.full_transformation:
             # ideal: E_i = 4x4 identity
-            self.error = np.array(
-                [np.linalg.norm(E_i - np.eye(4)) for E_i in self.E])
+            return np.linalg.norm(E - np.eye(4), axis=(1, 2))
         elif self.pose_relation == PoseRelation.rotation_angle_rad:
-            self.error = np.array(
-                [abs(lie.so3_log_angle(E_i[:3, :3])) for E_i in self.E])
+            return lie.so3_log_angle_batch(E[:, :3, :3], check=check)
         elif self.pose_relation == PoseRelation.rotation_angle_deg:
-            self.error = np.array(
-                [abs(lie.so3_log_angle(E_i[:3, :3], True)) for E_i in self.E])
+            return lie.so3_log_angle_batch(E[:, :3, :3], degrees=True,
+                                           check=check)
         else:
             raise MetricsException("unsupported pose_relation: ",
                                    self.pose_relation)
 
 
+class KittiOdometry(PE):
+    """
+    KITTI odometry benchmark metric: translational or rotational drift
+    on segments of fixed path lengths, as in the devkit of the benchmark.
+    The mean of the errors is the t_err / r_err value of the benchmark.
+    """
+    def __init__(self,
+                 pose_relation: PoseRelation = PoseRelation.translation_part,
+                 lengths: typing.Sequence[float] = (100., 200., 300., 400.,
+                                                    500., 600., 700., 800.),
+                 step_size: int = 10):
+        """
+        :param pose_relation: translation_part (in % of the segment length)
+                              or rotation_angle_deg / rotation_angle_rad
+                              (per meter of the segment length)
+        :param lengths: the segment lengths in meters
+        :param step_size: frame step between the segment start poses
+        """
+        if pose_relation == PoseRelation.translation_part:
+            self.unit = Unit.percent
+        elif pose_relation == PoseRelation.rotation_angle_deg:
+            self.unit = Unit.degrees_per_meter
+        elif pose_relation == PoseRelation.rotation_angle_rad:
+            self.unit = Unit.radians_per_meter
+        else:
+            raise MetricsException(
+                "unsupported pose_relation for KITTI odometry metric: {}".
+                format(pose_relation))
+        if len(lengths) == 0 or min(lengths) <= 0:
+            raise MetricsException("segment lengths must be positive")
+        if step_size < 1:
+            raise MetricsException("step_size must be a positive integer")
+        self.pose_relation = pose_relation
+        self.lengths = np.array(lengths, dtype=float)
+        self.step_size = int(step_size)
+        self.error = np.array([])
+        self.segment_lengths = np.array([])
+        self.id_pairs = np.empty((0, 2), dtype=int)
+
+    def __str__(self) -> str:
+        return ("KITTI odometry error w.r.t. {} ({})\n"
+                "for segment lengths {} (m)".format(
+                    self.pose_relation.value, self.unit.value,
+                    ", ".join("{:g}".format(l) for l in self.lengths)))
+
+    def process_data(self, data: PathPair) -> None:
+        """
+        Calculates the errors of all segments, with start poses every
+        step_size frames and the lengths measured on the reference path.
+        :param data: tuple (traj_ref, traj_est) with:
+        traj_ref: reference evo.trajectory.PosePath or derived
+        traj_est: estimated evo.trajectory.PosePath or derived
+        """
+        if len(data) != 2:
+            raise MetricsException(
+                "please provide data tuple as: (traj_ref, traj_est)")
+        traj_ref, traj_est = data
+        if traj_ref.num_poses != traj_est.num_poses:
+            raise MetricsException(
+                "trajectories must have same number of poses")
+
+        distances = geometry.accumulated_distances(traj_ref.positions_xyz)
+        first_ids, lengths = np.meshgrid(
+            np.arange(0, traj_ref.num_poses, self.step_size), self.lengths,
+            indexing="ij")
+        first_ids = first_ids.ravel()
+        lengths = lengths.ravel()
+        # A segment ends at the first pose farther than its length away
+        # from the start, segments that would exceed the path are skipped.
+        last_ids = np.searchsorted(distances, distances[first_ids] + lengths,
+                                   side="right")
+        valid = last_ids < traj_ref.num_poses
+        if not np.any(valid):
+            raise MetricsException(
+                "the reference path is too short for the segment lengths")
+        self.id_pairs = np.stack((first_ids[valid], last_ids[valid]), axis=1)
+        self.segment_lengths = lengths[valid]
+        logger.debug("Found {} segments among {} poses.".format(
+            len(self.id_pairs), traj_ref.num_poses))
+
+        i, j = self.id_pairs.T
+        poses_ref = traj_ref.poses_se3
+        poses_est = traj_est.poses_se3
+        E = RPE.rpe_base_batch(poses_ref[i], poses_ref[j], poses_est[i],
+                               poses_est[j])
+        if self.pose_relation == PoseRelation.translation_part:
+            self.error = (np.linalg.norm(E[:, :3, 3], axis=1) /
+                          self.segment_lengths * 100)
+        else:
+            # Same angle as acos((trace(R) - 1) / 2) in the devkit, but
+            # atan2 is accurate also for the small angles of short segments.
+            r = E[:, :3, :3]
+            sin_axis = np.stack((r[:, 2, 1] - r[:, 1, 2], r[:, 0, 2] -
+                                 r[:, 2, 0], r[:, 1, 0] - r[:, 0, 1]), axis=1)
+            angles = np.arctan2(0.5 * np.linalg.norm(sin_axis, axis=1),
+                                0.5 * (np.trace(r, axis1=1, axis2=2) - 1))
+            if self.pose_relation == PoseRelation.rotation_angle_deg:
+                angles = np.rad2deg(angles)
+            self.error = angles / self.segment_lengths
+
+    def get_result(self, ref_name: str = "reference",
+                   est_name: str = "estimate") -> Result:
+        """
+        Wrap the result in Result object, including the segments.
+        :param ref_name: optional, label of the reference data
+        :param est_name: optional, label of the estimated data
+        :return:
+        """
+        result = super(KittiOdometry, self).get_result(ref_name, est_name)
+        result.add_np_array("segment_lengths", self.segment_lengths)
+        result.add_np_array("segment_id_pairs", self.id_pairs)
+        return result
+
+
 class APE(PE):
     """
     APE: absolute pose error
     metric for investigating the global consistency of a SLAM trajectory
     """
     def __init__(self,
-                 pose_relation: PoseRelation = PoseRelation.translation_part):
+                 pose_relation: PoseRelation = PoseRelation.translation_part,
+                 retain_E: bool = True, accumulate: bool = False,
+                 median_accuracy: typing.Optional[float] = None):
+        """
+        :param pose_relation: the pose relation to compute the error for
+        :param retain_E: keep the error poses E in memory after processing,
+                         disable to save 128 bytes per pose if only the
+                         error values are needed
+        :param accumulate: accumulate the statistics over all process_data()
+                           calls, e.g. with trajectory chunks from
+                           sync.associate_trajectory_streams(). error and E
+                           then only hold the data of the last call.
+        :param median_accuracy: relative accuracy of the median in accumulate
+                                mode, None for the exact median (keeps all
+                                errors), see StatisticsAccumulator
+        """
         self.pose_relation = pose_relation
-        self.E: typing.List[np.ndarray] = []
+        self.retain_E = retain_E
+        self.accumulator = StatisticsAccumulator(
+            median_accuracy) if accumulate else None
+        self.E: np.ndarray = np.array([])
         self.error = np.array([])
+        self.twists = np.empty((0, 6))
         if pose_relation in (PoseRelation.translation_part,
                              PoseRelation.point_distance):
             self.unit = Unit.meters
@@ -378,46 +680,120 @@ class APE(PE):
         if traj_ref.num_poses != traj_est.num_poses:
             raise MetricsException(
                 "trajectories must have same number of poses")
+        logger.debug("Compared {} absolute pose pairs.".format(
+            traj_ref.num_poses))
+        logger.debug("Calculating APE for {} pose relation...".format(
+            (self.pose_relation.value)))
 
+        if self.pose_relation in (PoseRelation.translation_part,
+                                  PoseRelation.point_distance) \
+                and not self.retain_E:
+            # Only the distances are needed, computed in chunks to bound the
+            # memory used e.g. for memory mapped trajectories.
+            positions_ref = traj_ref.positions_xyz
+            positions_est = traj_est.positions_xyz
+            self.error = np.concatenate([
+                np.linalg.norm(
+                    positions_est[i:i + trajectory.CHUNK_SIZE] -
+                    positions_ref[i:i + trajectory.CHUNK_SIZE], axis=1)
+                for i in range(0, traj_ref.num_poses, trajectory.CHUNK_SIZE)
+            ])
+            self.E = np.array([])
+            if self.accumulator is not None:
+                self.accumulator.add(self.error)
+            return
         if self.pose_relation in (PoseRelation.translation_part,
                                   PoseRelation.point_distance):
             # Translation part of APE is equivalent to distance between poses,
             # we don't require full SE(3) matrices for faster computation.
-            self.E = traj_est.positions_xyz - traj_ref.positions_xyz
+            E = traj_est.positions_xyz - traj_ref.positions_xyz
         else:
-            self.E = [
-                self.ape_base(x_t, x_t_star) for x_t, x_t_star in zip(
-                    traj_est.poses_se3, traj_ref.poses_se3)
-            ]
-        logger.debug("Compared {} absolute pose pairs.".format(len(self.E)))
-        logger.debug("Calculating APE for {} pose relation...".format(
-            (self.pose_relation.value)))
+            # Stacked equivalent of ape_base() for all pose pairs.
+            E = lie.relative_se3_batch(traj_est.poses_se3, traj_ref.poses_se3)
+        # Relative poses of validated trajectories are valid as well.
+        check = not (traj_ref.so3_validated and traj_est.so3_validated)
 
         if self.pose_relation in (PoseRelation.translation_part,
                                   PoseRelation.point_distance):
             # E is an array of position vectors only in this case
-            self.error = np.array([np.linalg.norm(E_i) for E_i in self.E])
+            self.error = np.linalg.norm(E, axis=1)
         elif self.pose_relation == PoseRelation.rotation_part:
-            self.error = np.array([
-                np.linalg.norm(lie.so3_from_se3(E_i) - np.eye(3))
-                for E_i in self.E
-            ])
+            self.error = np.linalg.norm(E[:, :3, :3] - np.eye(3), axis=(1, 2))
         elif self.pose_relation == PoseRelation.full_transformation:
-            self.error = np.array(
-                [np.linalg.norm(E_i - np.eye(4)) for E_i in self.E])
+            self.error = np.linalg.norm(E - np.eye(4), axis=(1, 2))
         elif self.pose_relation == PoseRelation.rotation_angle_rad:
-            self.error = np.array(
-                [abs(lie.so3_log_angle(E_i[:3, :3])) for E_i in self.E])
+            self.error = lie.so3_log_angle_batch(E[:, :3, :3], check=check)
         elif self.pose_relation == PoseRelation.rotation_angle_deg:
-            self.error = np.array(
-                [abs(lie.so3_log_angle(E_i[:3, :3], True)) for E_i in self.E])
+            self.error = lie.so3_log_angle_batch(E[:, :3, :3], degrees=True,
+                                                 check=check)
+        elif self.pose_relation == PoseRelation.twist:
+            self.twists = lie.se3_log_batch(E, check=check)
+            self.error = np.linalg.norm(self.twists, axis=1)
         else:
             raise MetricsException("unsupported pose_relation")
+        self.E = E if self.retain_E else np.array([])
+        if self.accumulator is not None:
+            self.accumulator.add(self.error)
+
+    def get_statistic(self, statistics_type: StatisticsType) -> float:
+        if self.accumulator is not None:
+            return self.accumulator.get_statistic(statistics_type)
+        return super(APE, self).get_statistic(statistics_type)
 
+    def get_result(self, ref_name: str = "reference",
+                   est_name: str = "estimate") -> Result:
+        result = super(APE, self).get_result(ref_name, est_name)
+        if self.accumulator is not None:
+            # Only the errors of the last chunk are available.
+            del result.np_arrays["error_array"]
+            result.np_arrays.pop("twists", None)
+        return result
 
-def id_pairs_from_delta(poses: typing.Sequence[np.ndarray], delta: float,
-                        delta_unit: Unit, rel_tol: float = 0.1,
-                        all_pairs: bool = False) -> filters.IdPairs:
+
+def rpe_for_deltas(data: PathPair, deltas: typing.Sequence[float],
+                   pose_relation: PoseRelation = PoseRelation.translation_part,
+                   delta_unit: Unit = Unit.frames, rel_delta_tol: float = 0.1,
+                   all_pairs: bool = False, pairs_from_reference: bool = False,
+                   retain_E: bool = False) -> typing.List[RPE]:
+    """
+    Calculates the RPE for multiple deltas, e.g. for drift analysis with
+    segments of different lengths. The pose stack used to find the pairs
+    and its accumulated distances are computed only once for all deltas.
+    :param data: tuple (traj_ref, traj_est) with:
+    traj_ref: reference evo.trajectory.PosePath or derived
+    traj_est: estimated evo.trajectory.PosePath or derived
+    :param deltas: the deltas in delta_unit
+    :return: one processed RPE metric per delta, in the given order
+    """
+    if len(data) != 2:
+        raise MetricsException(
+            "please provide data tuple as: (traj_ref, traj_est)")
+    traj_ref, traj_est = data
+    if traj_ref.num_poses != traj_est.num_poses:
+        raise MetricsException("trajectories must have same number of poses")
+
+    poses = (traj_ref.poses_se3
+             if pairs_from_reference else traj_est.poses_se3)
+    distances = None
+    if delta_unit == Unit.meters and all_pairs:
+        distances = geometry.accumulated_distances(poses[:, :3, 3])
+
+    rpe_metrics = []
+    for delta in deltas:
+        rpe_metric = RPE(pose_relation, delta, delta_unit, rel_delta_tol,
+                         all_pairs, pairs_from_reference, retain_E)
+        id_pairs = id_pairs_from_delta(poses, rpe_metric.delta, delta_unit,
+                                       rel_delta_tol, all_pairs, distances)
+        rpe_metric.process_id_pairs(data, id_pairs)
+        rpe_metrics.append(rpe_metric)
+    return rpe_metrics
+
+
+def id_pairs_from_delta(
+        poses: typing.Union[typing.Sequence[np.ndarray], np.ndarray],
+        delta: float, delta_unit: Unit,
+        rel_tol: float = 0.1, all_pairs: bool = False,
+        distances: typing.Optional[np.ndarray] = None) -> filters.IdPairs:
     """
     high-level function - get index tuples of pairs with distance==delta
     from a pose list
@@ -426,13 +802,15 @@ def id_pairs_from_delta(poses: typing.Sequence[np.ndarray], delta: float,
     :param delta_unit: unit of delta (metrics.Unit enum member)
     :param rel_tol: relative tolerance to accept or reject deltas
     :param all_pairs: use all pairs instead of consecutive pairs
+    :param distances: optional, precomputed accumulated distances of the
+                      poses for delta_unit meters
     :return: list of index tuples (pairs)
     """
     if delta_unit == Unit.frames:
         id_pairs = filters.filter_pairs_by_index(poses, int(delta), all_pairs)
     elif delta_unit == Unit.meters:
         id_pairs = filters.filter_pairs_by_path(poses, delta, delta * rel_tol,
-                                                all_pairs)
+                                                all_pairs, distances)
     elif delta_unit in {Unit.degrees, Unit.radians}:
         use_degrees = (delta_unit == Unit.degrees)
         id_pairs = filters.filter_pairs_by_angle(poses, delta, delta * rel_tol,
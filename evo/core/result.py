@@ -88,40 +88,147 @@ class Result(object):
         self.trajectories[name] = traj
 
 
-def merge_results(results: typing.Sequence[Result]) -> Result:
-    if not results or not all(isinstance(r, Result) for r in results):
-        raise ValueError("no results to merge")
-    if len(results) == 1:
-        return results[0]
-
-    # Check if all results share keys for "stats" and "np_arrays" dicts.
-    dict_lists = [[r.np_arrays for r in results], [r.stats for r in results]]
-    for dicts in dict_lists:
-        if not all(a.keys() == b.keys() for a, b in zip(dicts, dicts[1:])):
+# Shape and dtype of an array, e.g. from the header of an .npy file.
+ArrayHeader = typing.Tuple[typing.Tuple[int, ...], np.dtype]
+
+
+class ResultMerger(object):
+    """
+    Single-pass N-way merge of results that are added one by one.
+    The stats are averaged with exact running sums. The raw value arrays are
+    averaged if they have the same shape in all results, otherwise they are
+    appended (flattened, in the order of the results).
+    The info and trajectories are taken from the first result.
+    """
+    def __init__(self,
+                 array_headers: typing.Optional[typing.Dict[
+                     str, typing.List[ArrayHeader]]] = None):
+        """
+        :param array_headers: {name: headers of the array in all results}
+                              if known in advance: then the merged arrays are
+                              pre-allocated and the arrays of the added
+                              results are not kept in memory
+        """
+        self.count = 0
+        self._first: typing.Optional[Result] = None
+        self._stats_sums: typing.Dict[str, float] = {}
+        self._array_headers = array_headers
+        # Arrays of all results if the merge strategy isn't known yet.
+        self._array_parts: typing.Dict[str, typing.List[np.ndarray]] = {}
+        # Running sums or pre-allocated buffers of the merged arrays.
+        self._merged_arrays: typing.Dict[str, np.ndarray] = {}
+        self._offsets: typing.Dict[str, int] = {}
+        self._average: typing.Optional[bool] = None
+        if array_headers is None:
+            return
+        self._average = all(
+            len(set(tuple(shape) for shape, _ in headers)) == 1
+            for headers in array_headers.values())
+        for name, headers in array_headers.items():
+            dtype = np.result_type(*(dtype for _, dtype in headers))
+            if self._average:
+                self._merged_arrays[name] = np.zeros(
+                    headers[0][0], dtype=np.result_type(dtype, float))
+            else:
+                self._merged_arrays[name] = np.empty(
+                    sum(int(np.prod(shape)) for shape, _ in headers),
+                    dtype=dtype)
+            self._offsets[name] = 0
+
+    def add(self, result: Result) -> None:
+        """
+        :param result: the next result to merge
+        """
+        if not isinstance(result, Result):
+            raise ValueError("can only merge result.Result objects")
+        if self._first is None:
+            self._first = result
+        elif result.stats.keys() != self._first.stats.keys() \
+                or result.np_arrays.keys() != self._first.np_arrays.keys():
             raise ResultException("can't merge results with non-matching keys")
-
-    # Determine merge strategy:
-    strategy = "average"
-    length_lists = [[a.size for a in r.np_arrays.values()] for r in results]
-    if not all(a == b for a, b in zip(length_lists, length_lists[1:])):
-        logger.warning("Appending raw value arrays due to different lengths.")
-        strategy = "append"
-    else:
-        logger.info("Averaging raw values of input results in merged result.")
-
-    merged_result = copy.deepcopy(results[0])
-    logger.warning("Using info dict of first result.")
-    for result in results[1:]:
+        if self._array_headers is not None and \
+                result.np_arrays.keys() != self._array_headers.keys():
+            raise ResultException("array_headers don't match the results")
+        for key, value in result.stats.items():
+            self._stats_sums[key] = self._stats_sums.get(key, 0.) + value
+        for name, array in result.np_arrays.items():
+            array = np.asarray(array)
+            if self._average is None:
+                self._array_parts.setdefault(name, []).append(array)
+            elif self._average:
+                self._merged_arrays[name] += array
+            else:
+                buffer = self._merged_arrays[name]
+                start = self._offsets[name]
+                if start + array.size > buffer.size:
+                    raise ResultException(
+                        "array_headers don't match the results")
+                buffer[start:start + array.size] = array.ravel()
+                self._offsets[name] += array.size
+        self.count += 1
+
+    def get_result(self) -> Result:
+        """
+        :return: the merged result
+        """
+        if self._first is None:
+            raise ValueError("no results to merge")
+        if self.count == 1:
+            return self._first
+
+        average = self._average
+        if average is None:
+            average = all(
+                all(part.shape == parts[0].shape for part in parts)
+                for parts in self._array_parts.values())
+        if average:
+            logger.info(
+                "Averaging raw values of input results in merged result.")
+        else:
+            logger.warning(
+                "Appending raw value arrays due to different lengths.")
+
+        merged_result = Result()
+        logger.warning("Using info dict of first result.")
+        merged_result.info = copy.deepcopy(self._first.info)
+        merged_result.trajectories = copy.deepcopy(self._first.trajectories)
         merged_result.stats = {
-            key: ((merged_result.stats[key] + result.stats[key]) / 2)
-            for key in merged_result.stats
+            key: value / self.count
+            for key, value in self._stats_sums.items()
         }
-        for key, array in merged_result.np_arrays.items():
-            if strategy == "average":
-                merged_result.np_arrays[key] = np.mean(
-                    (array, result.np_arrays[key]), axis=0)
-            elif strategy == "append":
-                merged_result.np_arrays[key] = np.append(
-                    array, result.np_arrays[key])
-
-    return merged_result
+        if self._average is None:
+            for name, parts in self._array_parts.items():
+                if average:
+                    merged_array = np.zeros(
+                        parts[0].shape,
+                        dtype=np.result_type(float,
+                                             *(part.dtype for part in parts)))
+                    for part in parts:
+                        merged_array += part
+                    self._merged_arrays[name] = merged_array
+                else:
+                    # Allocates the merged array once.
+                    self._merged_arrays[name] = np.concatenate(
+                        [part.ravel() for part in parts])
+        elif not average and any(self._offsets[name] != buffer.size
+                                 for name, buffer in
+                                 self._merged_arrays.items()):
+            raise ResultException("array_headers don't match the results")
+        for name, merged_array in self._merged_arrays.items():
+            if average:
+                merged_array = merged_array / self.count
+            merged_result.add_np_array(name, merged_array)
+        return merged_result
+
+
+def merge_results(results: typing.Iterable[Result]) -> Result:
+    """
+    Merges results in a single pass, see ResultMerger.
+    :param results: results to merge, e.g. a generator loading them one by
+                    one (note that their arrays are kept until the end)
+    :return: the merged result
+    """
+    merger = ResultMerger()
+    for result in results:
+        merger.add(result)
+    return merger.get_result()
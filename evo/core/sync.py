@@ -26,7 +26,7 @@ import typing
 import numpy as np
 
 from evo import EvoException
-from evo.core.trajectory import PoseTrajectory3D
+from evo.core.trajectory import PosePath3D, PoseTrajectory3D
 
 logger = logging.getLogger(__name__)
 
@@ -37,46 +37,115 @@ class SyncException(EvoException):
 
 MatchingIndices = typing.Tuple[typing.List[int], typing.List[int]]
 TrajectoryPair = typing.Tuple[PoseTrajectory3D, PoseTrajectory3D]
+PathType = typing.TypeVar("PathType", bound=PosePath3D)
+
+
+def shared_copy(traj: PathType) -> PathType:
+    """
+    Shallow copy of a trajectory that shares the memory of its arrays with
+    the original (copy-on-write). The arrays are read-only until the copy is
+    modified with transform(), scale(), align() etc., which copy the arrays
+    that are still shared. reduce_to_ids() keeps the arrays shared and
+    read-only, whether the ids are contiguous (views) or not.
+    Arrays that are read-only in the original already (e.g. memory maps)
+    are shared as they are and never copied.
+    :param traj: trajectory.PosePath3D or trajectory.PoseTrajectory3D object
+    :return: the shallow copy, of the same type
+    """
+    traj_copy = copy.copy(traj)
+    traj_copy.meta = dict(traj.meta)
+    shared_names = set(getattr(traj, "_shared_names", ()))
+    for name, value in vars(traj).items():
+        if isinstance(value, np.ndarray):
+            view = value.view()
+            if view.flags.writeable:
+                view.flags.writeable = False
+                shared_names.add(name)
+            setattr(traj_copy, name, view)
+    traj_copy._shared_names = shared_names
+    return traj_copy
 
 
 def matching_time_indices(stamps_1: np.ndarray, stamps_2: np.ndarray,
-                          max_diff: float = 0.01,
-                          offset_2: float = 0.0) -> MatchingIndices:
+                          max_diff: float = 0.01, offset_2: float = 0.0,
+                          unique_matches: bool = False) -> MatchingIndices:
     """
     Searches for the best matching timestamps of two lists of timestamps
     and returns the list indices of the best matches.
+    Uses a binary search of each stamp of stamps_1 in the sorted stamps_2,
+    i.e. runs in O((n+m) log m) instead of comparing all pairs.
     :param stamps_1: first vector of timestamps (numpy array)
     :param stamps_2: second vector of timestamps (numpy array)
     :param max_diff: max. allowed absolute time difference
     :param offset_2: optional time offset to be applied to stamps_2
+    :param unique_matches: set to True to match each stamp of stamps_2 at
+                           most once (keeps the closest stamp of stamps_1)
     :return: 2 lists of the matching timestamp indices (stamps_1, stamps_2)
     """
-    matching_indices_1 = []
-    matching_indices_2 = []
-    stamps_2 = copy.deepcopy(stamps_2)
-    stamps_2 += offset_2
-    for index_1, stamp_1 in enumerate(stamps_1):
-        diffs = np.abs(stamps_2 - stamp_1)
-        index_2 = int(np.argmin(diffs))
-        if diffs[index_2] <= max_diff:
-            matching_indices_1.append(index_1)
-            matching_indices_2.append(index_2)
-    return matching_indices_1, matching_indices_2
+    stamps_1 = np.asarray(stamps_1)
+    stamps_2 = np.asarray(stamps_2) + offset_2
+    if stamps_1.size == 0 or stamps_2.size == 0:
+        return [], []
+
+    # Stable sort: equal stamps keep their order, so that the first index
+    # of equally good candidates is chosen (like np.argmin would do).
+    order_2 = np.argsort(stamps_2, kind="stable")
+    sorted_2 = stamps_2[order_2]
+
+    # Nearest candidates: the last stamp < stamp_1 and the first >= stamp_1.
+    right = np.searchsorted(sorted_2, stamps_1, side="left")
+    left = np.clip(right - 1, 0, None)
+    right = np.clip(right, None, sorted_2.size - 1)
+    # First occurrence of the left value, in case of duplicate stamps.
+    left = np.searchsorted(sorted_2, sorted_2[left], side="left")
+
+    diffs_left = np.abs(sorted_2[left] - stamps_1)
+    diffs_right = np.abs(sorted_2[right] - stamps_1)
+    left_ids = order_2[left]
+    right_ids = order_2[right]
+    take_left = (diffs_left < diffs_right) | ((diffs_left == diffs_right)
+                                              & (left_ids < right_ids))
+    indices_2 = np.where(take_left, left_ids, right_ids)
+    diffs = np.where(take_left, diffs_left, diffs_right)
+
+    indices_1 = np.flatnonzero(diffs <= max_diff)
+    indices_2 = indices_2[indices_1]
+
+    if unique_matches and indices_2.size != 0:
+        # Sort by index in stamps_2, then by time difference (stable, so that
+        # ties keep the lower index of stamps_1), and keep the first of each.
+        diffs = diffs[indices_1]
+        by_diff = np.argsort(diffs, kind="stable")
+        by_index_2 = by_diff[np.argsort(indices_2[by_diff], kind="stable")]
+        first = np.ones(by_index_2.size, dtype=bool)
+        first[1:] = indices_2[by_index_2][1:] != indices_2[by_index_2][:-1]
+        keep = np.sort(by_index_2[first])
+        indices_1 = indices_1[keep]
+        indices_2 = indices_2[keep]
+
+    return indices_1.tolist(), indices_2.tolist()
 
 
 def associate_trajectories(
         traj_1: PoseTrajectory3D, traj_2: PoseTrajectory3D,
         max_diff: float = 0.01, offset_2: float = 0.0,
         first_name: str = "first trajectory",
-        snd_name: str = "second trajectory") -> TrajectoryPair:
+        snd_name: str = "second trajectory",
+        unique_matches: bool = False) -> TrajectoryPair:
     """
     Synchronizes two trajectories by matching their timestamps.
+    The inputs are not copied: the synchronized trajectories share the
+    memory of the input arrays as far as possible (see shared_copy).
+    Their arrays are read-only until they are modified with transform(),
+    scale(), align() etc., in-place writes before that raise a ValueError.
     :param traj_1: trajectory.PoseTrajectory3D object of first trajectory
     :param traj_2: trajectory.PoseTrajectory3D object of second trajectory
     :param max_diff: max. allowed absolute time difference for associating
     :param offset_2: optional time offset of second trajectory
     :param first_name: name of first trajectory for verbose logging
     :param snd_name: name of second trajectory for verbose/debug logging
+    :param unique_matches: set to True to use each pose of the longer
+                           trajectory at most once (see matching_time_indices)
     :return: traj_1, traj_2 (synchronized)
     """
     if not isinstance(traj_1, PoseTrajectory3D) \
@@ -84,13 +153,13 @@ def associate_trajectories(
         raise SyncException("trajectories must be PoseTrajectory3D objects")
 
     snd_longer = len(traj_2.timestamps) > len(traj_1.timestamps)
-    traj_long = copy.deepcopy(traj_2) if snd_longer else copy.deepcopy(traj_1)
-    traj_short = copy.deepcopy(traj_1) if snd_longer else copy.deepcopy(traj_2)
+    traj_long = shared_copy(traj_2) if snd_longer else shared_copy(traj_1)
+    traj_short = shared_copy(traj_1) if snd_longer else shared_copy(traj_2)
     max_pairs = len(traj_short.timestamps)
 
     matching_indices_short, matching_indices_long = matching_time_indices(
         traj_short.timestamps, traj_long.timestamps, max_diff,
-        offset_2 if snd_longer else -offset_2)
+        offset_2 if snd_longer else -offset_2, unique_matches)
     if len(matching_indices_short) != len(matching_indices_long):
         raise SyncException(
             "matching_time_indices returned unequal number of indices")
@@ -114,3 +183,104 @@ def associate_trajectories(
                                           snd_name, max_diff, offset_2))
 
     return traj_1, traj_2
+
+
+def associate_trajectory_streams(
+        stream_1: typing.Iterable[PoseTrajectory3D],
+        stream_2: typing.Iterable[PoseTrajectory3D], max_diff: float = 0.01,
+        offset_2: float = 0.0) -> typing.Iterator[TrajectoryPair]:
+    """
+    Streaming version of associate_trajectories() for trajectories that are
+    given as chunks, e.g. from file_interface.iter_tum_trajectory_file().
+    Merges the two sorted timestamp streams and matches the poses one-to-one,
+    i.e. each pose of either stream is used at most once, keeping the closest
+    pair (like associate_trajectories(..., unique_matches=True), independent
+    of the order of the streams).
+    Only the poses that are within a few max_diff of the current chunk of the
+    first stream are kept in memory.
+    :param stream_1: chunks of the first trajectory, ascending timestamps
+    :param stream_2: chunks of the second trajectory, ascending timestamps
+    :param max_diff: max. allowed absolute time difference for associating
+    :param offset_2: optional time offset of second trajectory
+    :return: generator of synchronized (traj_1, traj_2) chunks,
+             chunks without matches are skipped
+    """
+    def check_sorted(buffer: typing.List[np.ndarray], stamps: np.ndarray,
+                     name: str) -> None:
+        if (buffer[0].size != 0 and stamps[0] < buffer[0][-1]) \
+                or np.any(np.diff(stamps) < 0):
+            raise SyncException("timestamps of the {} stream must be "
+                                "sorted in ascending order".format(name))
+
+    def extend(buffer: typing.List[np.ndarray],
+               chunk: PoseTrajectory3D) -> typing.List[np.ndarray]:
+        return [
+            np.concatenate((buffered, new)) for buffered, new in zip(
+                buffer, (chunk.timestamps, chunk.positions_xyz,
+                         chunk.orientations_quat_wxyz))
+        ]
+
+    # Buffered poses of both streams: timestamps (without offset),
+    # positions and orientations.
+    empty = [np.empty(0), np.empty((0, 3)), np.empty((0, 4))]
+    buffer_1, buffer_2 = list(empty), list(empty)
+    # Number of poses at the start of buffer_1 that are already associated.
+    # They're kept as long as they can compete for a pose of the second
+    # stream with poses that are not associated yet.
+    num_done_1 = 0
+    stream_1, stream_2 = iter(stream_1), iter(stream_2)
+    exhausted_1, exhausted_2 = False, False
+    while not exhausted_1:
+        chunk_1 = next(stream_1, None)
+        if chunk_1 is None:
+            exhausted_1 = True
+            if buffer_1[0].size == num_done_1:
+                break
+        elif chunk_1.num_poses == 0:
+            continue
+        else:
+            check_sorted(buffer_1, chunk_1.timestamps, "first")
+            buffer_1 = extend(buffer_1, chunk_1)
+        last_stamp_1 = buffer_1[0][-1]
+        # Buffer the second stream until it's past the first one,
+        # later poses can't be a match of the buffered poses.
+        while not exhausted_2 and (buffer_2[0].size == 0 or buffer_2[0][-1] +
+                                   offset_2 <= last_stamp_1 + max_diff):
+            chunk_2 = next(stream_2, None)
+            if chunk_2 is None:
+                exhausted_2 = True
+                break
+            if chunk_2.num_poses == 0:
+                continue
+            check_sorted(buffer_2, chunk_2.timestamps, "second")
+            buffer_2 = extend(buffer_2, chunk_2)
+        # A pose can only compete for a match with poses that are at most
+        # 2 * max_diff away, so the association of earlier poses is final.
+        # All remaining poses are final if the first stream is exhausted.
+        final_stamp_1 = np.inf if exhausted_1 else last_stamp_1 - 2 * max_diff
+        num_final_1 = int(
+            np.searchsorted(buffer_1[0], final_stamp_1, side="left"))
+        indices_1, indices_2 = matching_time_indices(buffer_1[0],
+                                                     buffer_2[0], max_diff,
+                                                     offset_2,
+                                                     unique_matches=True)
+        ids_1 = np.asarray(indices_1, dtype=int)
+        ids_2 = np.asarray(indices_2, dtype=int)
+        new = (ids_1 >= num_done_1) & (ids_1 < num_final_1)
+        if np.any(new):
+            stamps_1, xyz_1, quat_1 = (array[ids_1[new]]
+                                       for array in buffer_1)
+            stamps_2, xyz_2, quat_2 = (array[ids_2[new]]
+                                       for array in buffer_2)
+            yield (PoseTrajectory3D(xyz_1, quat_1, stamps_1),
+                   PoseTrajectory3D(xyz_2, quat_2, stamps_2))
+        # Drop poses that are too old to compete with the remaining ones.
+        keep_1 = int(
+            np.searchsorted(buffer_1[0], final_stamp_1 - 2 * max_diff,
+                            side="left"))
+        buffer_1 = [array[keep_1:] for array in buffer_1]
+        num_done_1 = num_final_1 - keep_1
+        if buffer_1[0].size != 0:
+            keep_2 = np.searchsorted(buffer_2[0] + offset_2,
+                                     buffer_1[0][0] - max_diff, side="left")
+            buffer_2 = [array[keep_2:] for array in buffer_2]
@@ -31,11 +31,22 @@ from evo.core import lie_algebra as lie
 
 logger = logging.getLogger(__name__)
 
+# Number of poses that chunked read-only operations process at once.
+CHUNK_SIZE = 1 << 20
+
 
 class TrajectoryException(EvoException):
     pass
 
 
+def _as_array(data) -> np.ndarray:
+    # Memory mapped arrays are kept to avoid loading them into RAM,
+    # everything else is copied as usual.
+    if isinstance(data, np.memmap):
+        return data
+    return np.array(data)
+
+
 class PosePath3D(object):
     """
     just a path, no temporal information
@@ -44,24 +55,26 @@ class PosePath3D(object):
     def __init__(
             self, positions_xyz: typing.Optional[np.ndarray] = None,
             orientations_quat_wxyz: typing.Optional[np.ndarray] = None,
-            poses_se3: typing.Optional[typing.Sequence[np.ndarray]] = None,
+            poses_se3: typing.Optional[
+                typing.Union[typing.Sequence[np.ndarray], np.ndarray]] = None,
             meta: typing.Optional[dict] = None):
         """
         :param positions_xyz: nx3 list of x,y,z positions
         :param orientations_quat_wxyz: nx4 list of quaternions (w,x,y,z format)
-        :param poses_se3: list of SE(3) poses
+        :param poses_se3: list or nx4x4 array of SE(3) poses
         :param meta: optional metadata
+        Note: np.memmap arrays are used without copying them into memory.
         """
         if (positions_xyz is None
                 or orientations_quat_wxyz is None) and poses_se3 is None:
             raise TrajectoryException("must provide at least positions_xyz "
                                       "& orientations_quat_wxyz or poses_se3")
         if positions_xyz is not None:
-            self._positions_xyz = np.array(positions_xyz)
+            self._positions_xyz = _as_array(positions_xyz)
         if orientations_quat_wxyz is not None:
-            self._orientations_quat_wxyz = np.array(orientations_quat_wxyz)
+            self._orientations_quat_wxyz = _as_array(orientations_quat_wxyz)
         if poses_se3 is not None:
-            self._poses_se3 = poses_se3
+            self._poses_se3 = stack_se3_poses(poses_se3)
         if self.num_poses == 0:
             raise TrajectoryException("pose data is empty")
         self.meta = {} if meta is None else meta
@@ -76,10 +89,7 @@ class PosePath3D(object):
         if not self.num_poses == other.num_poses:
             return False
         equal = True
-        equal &= all([
-            np.allclose(p1, p2)
-            for p1, p2 in zip(self.poses_se3, other.poses_se3)
-        ])
+        equal &= np.allclose(self.poses_se3, other.poses_se3)
         equal &= (np.allclose(self.orientations_quat_wxyz,
                               other.orientations_quat_wxyz)
                   or np.allclose(self.orientations_quat_wxyz,
@@ -94,21 +104,27 @@ class PosePath3D(object):
     def positions_xyz(self) -> np.ndarray:
         if not hasattr(self, "_positions_xyz"):
             assert hasattr(self, "_poses_se3")
-            self._positions_xyz = np.array([p[:3, 3] for p in self._poses_se3])
+            self._positions_xyz = self._poses_se3[:, :3, 3].copy()
         return self._positions_xyz
 
     @property
     def distances(self) -> np.ndarray:
         return geometry.accumulated_distances(self.positions_xyz)
 
+    @property
+    def so3_validated(self) -> bool:
+        """
+        True if the rotations were validated with check() or validate_so3()
+        and are still valid, angle extraction can then skip validating them.
+        """
+        return getattr(self, "_so3_validated", False)
+
     @property
     def orientations_quat_wxyz(self) -> np.ndarray:
         if not hasattr(self, "_orientations_quat_wxyz"):
             assert hasattr(self, "_poses_se3")
             self._orientations_quat_wxyz \
-                = np.array(
-                    [tr.quaternion_from_matrix(p)
-                     for p in self._poses_se3])
+                = lie.so3_to_quat_wxyz_batch(self._poses_se3)
         return self._orientations_quat_wxyz
 
     def get_orientations_euler(self, axes="sxyz") -> np.ndarray:
@@ -122,7 +138,10 @@ class PosePath3D(object):
         ])
 
     @property
-    def poses_se3(self) -> typing.Sequence[np.ndarray]:
+    def poses_se3(self) -> np.ndarray:
+        """
+        :return: nx4x4 array of SE(3) poses (behaves like a list of matrices)
+        """
         if not hasattr(self, "_poses_se3"):
             assert hasattr(self, "_positions_xyz")
             assert hasattr(self, "_orientations_quat_wxyz")
@@ -154,23 +173,27 @@ class PosePath3D(object):
         :param right_mul: whether to apply it right-multiplicative or not
         :param propagate: whether to propagate drift with RHS transformations
         """
+        poses = self.poses_se3
         if right_mul and not propagate:
             # Transform each pose individually.
-            self._poses_se3 = [np.dot(p, t) for p in self.poses_se3]
+            self._poses_se3 = np.matmul(poses, t)
         elif right_mul and propagate:
             # Transform each pose and propagate resulting drift to the next.
-            ids = np.arange(0, self.num_poses, 1)
-            rel_poses = [
-                lie.relative_se3(self.poses_se3[i], self.poses_se3[j]).dot(t)
-                for i, j in zip(ids, ids[1:])
-            ]
-            self._poses_se3 = [self.poses_se3[0]]
-            for i, j in zip(ids[:-1], ids):
-                self._poses_se3.append(self._poses_se3[j].dot(rel_poses[i]))
+            rel_poses = np.matmul(
+                np.matmul(np.linalg.inv(poses[:-1]), poses[1:]), t)
+            propagated = np.empty_like(poses)
+            propagated[0] = poses[0]
+            for i, rel_pose in enumerate(rel_poses):
+                propagated[i + 1] = propagated[i].dot(rel_pose)
+            self._poses_se3 = propagated
         else:
-            self._poses_se3 = [np.dot(t, p) for p in self.poses_se3]
+            self._poses_se3 = np.matmul(t, poses)
         self._positions_xyz, self._orientations_quat_wxyz \
             = se3_poses_to_xyz_quat_wxyz(self.poses_se3)
+        if self.so3_validated and not lie.is_se3(t):
+            # E.g. Sim(3) transformations scale the rotation matrices.
+            self._so3_validated = False
+        self._unshare()
 
     def scale(self, s: float) -> None:
         """
@@ -178,11 +201,11 @@ class PosePath3D(object):
         :param s: scale factor
         """
         if hasattr(self, "_poses_se3"):
-            self._poses_se3 = [
-                lie.se3(p[:3, :3], s * p[:3, 3]) for p in self._poses_se3
-            ]
+            self._poses_se3 = self._poses_se3.copy()
+            self._poses_se3[:, :3, 3] *= s
         if hasattr(self, "_positions_xyz"):
             self._positions_xyz = s * self._positions_xyz
+        self._unshare()
 
     def align(self, traj_ref: 'PosePath3D', correct_scale: bool = False,
               correct_only_scale: bool = False,
@@ -210,6 +233,20 @@ class PosePath3D(object):
                 self.positions_xyz[:n, :].T, traj_ref.positions_xyz[:n, :].T,
                 with_scale)
 
+        self.apply_alignment((r_a, t_a, s), correct_scale, correct_only_scale)
+        return r_a, t_a, s
+
+    def apply_alignment(self, umeyama_result: geometry.UmeyamaResult,
+                        correct_scale: bool = False,
+                        correct_only_scale: bool = False) -> None:
+        """
+        apply the parameters of an Umeyama alignment, e.g. one computed
+        with geometry.umeyama_alignment_prefixes (see also: align)
+        :param umeyama_result: rotation, translation and scale
+        :param correct_scale: set to True to adjust also the scale
+        :param correct_only_scale: set to True to correct the scale, but not the pose
+        """
+        r_a, t_a, s = umeyama_result
         if not correct_only_scale:
             logger.debug("Rotation of alignment:\n{}"
                          "\nTranslation of alignment:\n{}".format(r_a, t_a))
@@ -223,8 +260,6 @@ class PosePath3D(object):
         else:
             self.transform(lie.se3(r_a, t_a))
 
-        return r_a, t_a, s
-
     def align_origin(self, traj_ref: 'PosePath3D') -> np.ndarray:
         """
         align the origin to the origin of a reference trajectory
@@ -245,14 +280,50 @@ class PosePath3D(object):
             self, ids: typing.Union[typing.Sequence[int], np.ndarray]) -> None:
         """
         reduce the elements to the ones specified in ids
+        (a contiguous ascending range of ids yields views instead of copies)
         :param ids: list of integer indices
         """
+        selection = index_or_slice(ids)
         if hasattr(self, "_positions_xyz"):
-            self._positions_xyz = self._positions_xyz[ids]
+            self._positions_xyz = self._positions_xyz[selection]
         if hasattr(self, "_orientations_quat_wxyz"):
-            self._orientations_quat_wxyz = self._orientations_quat_wxyz[ids]
+            self._orientations_quat_wxyz = \
+                self._orientations_quat_wxyz[selection]
         if hasattr(self, "_poses_se3"):
-            self._poses_se3 = [self._poses_se3[idx] for idx in ids]
+            self._poses_se3 = self._poses_se3[selection]
+        self._protect_shared()
+
+    def _protect_shared(self) -> None:
+        # The shared arrays of a shared copy (see sync.shared_copy) are
+        # read-only until it's modified, no matter if they are views or copies.
+        for name in getattr(self, "_shared_names", ()):
+            value = getattr(self, name, None)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+    def _unshare(self) -> None:
+        # Copy-on-write of a shared copy: shared arrays that weren't replaced
+        # by the modification are copied, then it behaves like a deep copy.
+        # Arrays that were read-only already (e.g. memory maps) aren't shared
+        # in this sense and are never copied.
+        shared_names = getattr(self, "_shared_names", None)
+        if not shared_names:
+            return
+        for name in shared_names:
+            value = getattr(self, name, None)
+            if isinstance(value, np.ndarray) and not value.flags.writeable:
+                setattr(self, name, value.copy())
+        self._shared_names: typing.Set[str] = set()
+
+    def validate_so3(self) -> bool:
+        """
+        validates all rotations in a single batch and remembers the result,
+        see so3_validated
+        :return: True if all rotations are valid SO(3) matrices
+        """
+        self._so3_validated = bool(
+            np.all(lie.is_so3_batch(self.poses_se3[:, :3, :3])))
+        return self._so3_validated
 
     def check(self) -> typing.Tuple[bool, dict]:
         """
@@ -264,7 +335,8 @@ class PosePath3D(object):
         same_len = self.positions_xyz.shape[0] \
             == self.orientations_quat_wxyz.shape[0] \
             == len(self.poses_se3)
-        se3_valid = all([lie.is_se3(p) for p in self.poses_se3])
+        se3_valid = bool(np.all(lie.is_se3_batch(self.poses_se3)))
+        self._so3_validated = se3_valid
         norms = np.linalg.norm(self.orientations_quat_wxyz, axis=1)
         quat_normed = np.allclose(norms, np.ones(norms.shape))
         valid = same_len and se3_valid and quat_normed
@@ -303,7 +375,8 @@ class PoseTrajectory3D(PosePath3D, object):
             self, positions_xyz: typing.Optional[np.ndarray] = None,
             orientations_quat_wxyz: typing.Optional[np.ndarray] = None,
             timestamps: typing.Optional[np.ndarray] = None,
-            poses_se3: typing.Optional[typing.Sequence[np.ndarray]] = None,
+            poses_se3: typing.Optional[
+                typing.Union[typing.Sequence[np.ndarray], np.ndarray]] = None,
             meta: typing.Optional[dict] = None):
         """
         :param timestamps: optional nx1 list of timestamps
@@ -314,7 +387,7 @@ class PoseTrajectory3D(PosePath3D, object):
         # this is a bit ugly...
         if timestamps is None:
             raise TrajectoryException("no timestamps provided")
-        self.timestamps = np.array(timestamps)
+        self.timestamps = _as_array(timestamps)
 
     def __str__(self) -> str:
         s = super(PoseTrajectory3D, self).__str__()
@@ -340,16 +413,13 @@ class PoseTrajectory3D(PosePath3D, object):
         """
         if self.num_poses < 2:
             return np.array([])
-        return np.array([
-            calc_speed(self.positions_xyz[i], self.positions_xyz[i + 1],
-                       self.timestamps[i], self.timestamps[i + 1])
-            for i in range(len(self.positions_xyz) - 1)
-        ])
+        return calc_speeds(self.positions_xyz, self.timestamps)
 
     def reduce_to_ids(
             self, ids: typing.Union[typing.Sequence[int], np.ndarray]) -> None:
         super(PoseTrajectory3D, self).reduce_to_ids(ids)
-        self.timestamps = self.timestamps[ids]
+        self.timestamps = self.timestamps[index_or_slice(ids)]
+        self._protect_shared()
 
     def reduce_to_time_range(self,
                              start_timestamp: typing.Optional[float] = None,
@@ -371,9 +441,15 @@ class PoseTrajectory3D(PosePath3D, object):
             raise TrajectoryException(
                 "start_timestamp is greater than end_timestamp "
                 "({} > {})".format(start_timestamp, end_timestamp))
-        ids = np.where(
-            np.logical_and(self.timestamps >= start_timestamp,
-                           self.timestamps <= end_timestamp))[0]
+        # Chunk-wise to bound the memory used for memory mapped timestamps,
+        # a contiguous range of ids then reduces the data to views.
+        ids = np.concatenate([
+            start + np.flatnonzero(
+                np.logical_and(chunk >= start_timestamp,
+                               chunk <= end_timestamp))
+            for start, chunk in ((i, self.timestamps[i:i + CHUNK_SIZE])
+                                 for i in range(0, self.num_poses, CHUNK_SIZE))
+        ])
         self.reduce_to_ids(ids)
 
     def check(self) -> typing.Tuple[bool, dict]:
@@ -411,10 +487,16 @@ class PoseTrajectory3D(PosePath3D, object):
         if self.num_poses < 2:
             return {}
         stats = super(PoseTrajectory3D, self).get_statistics()
-        speeds = self.speeds
-        vmax = speeds.max()
-        vmin = speeds.min()
-        vmean = speeds.mean()
+        # Chunk-wise to bound the memory used for memory mapped data,
+        # chunks overlap by one pose to include all consecutive pairs.
+        vmax, vmin, vsum = -np.inf, np.inf, 0.
+        for i in range(0, self.num_poses - 1, CHUNK_SIZE):
+            speeds = calc_speeds(self.positions_xyz[i:i + CHUNK_SIZE + 1],
+                                 self.timestamps[i:i + CHUNK_SIZE + 1])
+            vmax = max(vmax, speeds.max())
+            vmin = min(vmin, speeds.min())
+            vsum += speeds.sum()
+        vmean = vsum / (self.num_poses - 1)
         stats.update({
             "v_max (m/s)": vmax,
             "v_min (m/s)": vmin,
@@ -445,6 +527,22 @@ def calc_speed(xyz_1: np.ndarray, xyz_2: np.ndarray, t_1: float,
     return float(np.linalg.norm(xyz_2 - xyz_1) / (t_2 - t_1))
 
 
+def calc_speeds(xyz: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of calc_speed() for consecutive positions.
+    :param xyz: nx3 positions
+    :param timestamps: n timestamps
+    :return: n-1 speeds in m/s
+    """
+    dt = np.diff(timestamps)
+    bad = np.flatnonzero(dt <= 0)
+    if bad.size != 0:
+        i = bad[0]
+        raise TrajectoryException("bad timestamps: " + str(timestamps[i]) +
+                                  " & " + str(timestamps[i + 1]))
+    return np.linalg.norm(np.diff(xyz, axis=0), axis=1) / dt
+
+
 def calc_angular_speed(p_1: np.ndarray, p_2: np.ndarray, t_1: float,
                        t_2: float, degrees: bool = False) -> float:
     """
@@ -463,20 +561,57 @@ def calc_angular_speed(p_1: np.ndarray, p_2: np.ndarray, t_1: float,
     return (angle_2 - angle_1) / (t_2 - t_1)
 
 
-def xyz_quat_wxyz_to_se3_poses(
-        xyz: np.ndarray, quat: np.ndarray) -> typing.Sequence[np.ndarray]:
-    poses = [
-        lie.se3(lie.so3_from_se3(tr.quaternion_matrix(quat)), xyz)
-        for quat, xyz in zip(quat, xyz)
-    ]
+def index_or_slice(
+    ids: typing.Union[typing.Sequence[int], np.ndarray]
+) -> typing.Union[np.ndarray, slice]:
+    """
+    :param ids: list of integer indices
+    :return: an equivalent slice if ids is a contiguous ascending range
+             (indexing with it returns views), otherwise the ids as array
+    """
+    ids = np.asarray(ids)
+    if ids.size == 0:
+        return ids.astype(int)
+    if ids.ndim != 1 or ids.dtype.kind not in "iu":
+        return ids
+    if ids[0] >= 0 and ids[-1] - ids[0] == ids.size - 1 and np.all(
+            np.diff(ids) == 1):
+        return slice(int(ids[0]), int(ids[-1]) + 1)
+    return ids
+
+
+def stack_se3_poses(
+        poses: typing.Union[typing.Sequence[np.ndarray], np.ndarray]
+) -> np.ndarray:
+    """
+    :param poses: list of 4x4 matrices or nx4x4 array
+    :return: contiguous nx4x4 float array (input is not copied if possible)
+    """
+    stacked = np.ascontiguousarray(poses, dtype=float)
+    if stacked.size == 0:
+        return stacked.reshape((0, 4, 4))
+    if stacked.ndim != 3 or stacked.shape[1:] != (4, 4):
+        raise TrajectoryException(
+            "poses_se3 must be a list of 4x4 matrices or a nx4x4 array, "
+            "got shape {}".format(stacked.shape))
+    return stacked
+
+
+def xyz_quat_wxyz_to_se3_poses(xyz: np.ndarray,
+                               quat: np.ndarray) -> np.ndarray:
+    poses = np.zeros((len(xyz), 4, 4))
+    poses[:, :3, :3] = lie.quat_wxyz_to_so3_batch(quat)
+    poses[:, :3, 3] = xyz
+    poses[:, 3, 3] = 1.
     return poses
 
 
 def se3_poses_to_xyz_quat_wxyz(
-    poses: typing.Sequence[np.ndarray]
+    poses: typing.Union[typing.Sequence[np.ndarray], np.ndarray]
 ) -> typing.Tuple[np.ndarray, np.ndarray]:
-    xyz = np.array([pose[:3, 3] for pose in poses])
-    quat_wxyz = np.array([tr.quaternion_from_matrix(pose) for pose in poses])
+    stacked = stack_se3_poses(poses)
+    xyz = np.array(stacked[:, :3, 3])
+    quat_wxyz = lie.so3_to_quat_wxyz_batch(stacked)
     return xyz, quat_wxyz
 
 
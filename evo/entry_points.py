@@ -60,6 +60,13 @@ def res() -> None:
     launch(main_res, parser)
 
 
+def index() -> None:
+    from evo import main_index
+    parser = main_index.parser()
+    argcomplete.autocomplete(parser)
+    launch(main_index, parser)
+
+
 def traj() -> None:
     from evo import main_traj
     parser = main_traj.parser()
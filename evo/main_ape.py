@@ -23,11 +23,13 @@ along with evo.  If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
 import logging
+import sys
+import typing
 
 import numpy as np
 
 import evo.common_ape_rpe as common
-from evo.core import lie_algebra, sync, metrics
+from evo.core import geometry, lie_algebra, sync, metrics
 from evo.core.result import Result
 from evo.core.trajectory import PosePath3D, PoseTrajectory3D
 from evo.tools import file_interface, log
@@ -51,7 +53,7 @@ def parser() -> argparse.ArgumentParser:
         "-r", "--pose_relation", default="trans_part",
         help="pose relation on which the APE is based", choices=[
             "full", "trans_part", "rot_part", "angle_deg", "angle_rad",
-            "point_distance"
+            "point_distance", "twist"
         ])
     algo_opts.add_argument("-a", "--align",
                            help="alignment with Umeyama's method (no scale)",
@@ -62,6 +64,11 @@ def parser() -> argparse.ArgumentParser:
         "--n_to_align",
         help="the number of poses to use for Umeyama alignment, "
         "counted from the start (default: all)", default=-1, type=int)
+    algo_opts.add_argument(
+        "--n_to_align_sweep", nargs="+", type=int, default=None,
+        help="alignment sweep: calculate one result for each of the given "
+        "numbers of poses used for Umeyama alignment (overrides --n_to_align, "
+        "requires --align and/or --correct_scale, not with --align_origin)")
     algo_opts.add_argument(
         "--align_origin",
         help="align the trajectory origin to the origin of the reference "
@@ -190,12 +197,19 @@ def ape(traj_ref: PosePath3D, traj_est: PosePath3D,
         pose_relation: metrics.PoseRelation, align: bool = False,
         correct_scale: bool = False, n_to_align: int = -1,
         align_origin: bool = False, ref_name: str = "reference",
-        est_name: str = "estimate") -> Result:
+        est_name: str = "estimate",
+        umeyama_result: typing.Optional[geometry.UmeyamaResult] = None
+) -> Result:
 
     # Align the trajectories.
     only_scale = correct_scale and not align
     alignment_transformation = None
-    if align or correct_scale:
+    if (align or correct_scale) and umeyama_result is not None:
+        # Precomputed, e.g. by ape_sweep().
+        logger.debug(SEP)
+        traj_est.apply_alignment(umeyama_result, correct_scale, only_scale)
+        alignment_transformation = lie_algebra.sim3(*umeyama_result)
+    elif align or correct_scale:
         logger.debug(SEP)
         alignment_transformation = lie_algebra.sim3(
             *traj_est.align(traj_ref, correct_scale, only_scale, n=n_to_align))
@@ -206,7 +220,7 @@ def ape(traj_ref: PosePath3D, traj_est: PosePath3D,
     # Calculate APE.
     logger.debug(SEP)
     data = (traj_ref, traj_est)
-    ape_metric = metrics.APE(pose_relation)
+    ape_metric = metrics.APE(pose_relation, retain_E=False)
     ape_metric.process_data(data)
 
     title = str(ape_metric)
@@ -246,6 +260,49 @@ def ape(traj_ref: PosePath3D, traj_est: PosePath3D,
     return ape_result
 
 
+def ape_sweep(traj_ref: PosePath3D, traj_est: PosePath3D,
+              pose_relation: metrics.PoseRelation,
+              n_to_align_list: typing.Sequence[int], align: bool = False,
+              correct_scale: bool = False, align_origin: bool = False,
+              ref_name: str = "reference",
+              est_name: str = "estimate") -> typing.Iterator[Result]:
+    """
+    Calculates the APE for different numbers of poses used for the alignment.
+    The alignments for all numbers are solved at once from prefix sums.
+    Each result is yielded as soon as it's calculated, the estimate is
+    aligned as a shared copy that is only copied when it's transformed.
+    :return: generator of one result per entry of n_to_align_list
+    """
+    if not (align or correct_scale):
+        raise metrics.MetricsException(
+            "alignment sweep requires align and/or correct_scale")
+    if align_origin:
+        raise metrics.MetricsException(
+            "alignment sweep can't be combined with origin alignment")
+    if traj_ref.num_poses != traj_est.num_poses:
+        raise metrics.MetricsException(
+            "trajectories must have same number of poses")
+    logger.debug(SEP)
+    logger.debug("Solving Umeyama alignment for {} numbers of poses...".format(
+        len(n_to_align_list)))
+    n_to_align_list = [
+        n if n != -1 else traj_est.num_poses for n in n_to_align_list
+    ]
+    r_a, t_a, s = geometry.umeyama_alignment_prefixes(
+        traj_est.positions_xyz.T, traj_ref.positions_xyz.T, correct_scale,
+        n_to_align_list)
+
+    for i, n_to_align in enumerate(n_to_align_list):
+        sweep_result = ape(traj_ref=traj_ref,
+                           traj_est=sync.shared_copy(traj_est),
+                           pose_relation=pose_relation, align=align,
+                           correct_scale=correct_scale, n_to_align=n_to_align,
+                           ref_name=ref_name, est_name=est_name,
+                           umeyama_result=(r_a[i], t_a[i], s[i]))
+        sweep_result.info["n_to_align"] = n_to_align
+        yield sweep_result
+
+
 def run(args: argparse.Namespace) -> None:
     log.configure_logging(args.verbose, args.silent, args.debug,
                           local_logfile=args.logfile)
@@ -278,6 +335,34 @@ def run(args: argparse.Namespace) -> None:
 
     pose_relation = common.get_pose_relation(args)
 
+    if getattr(args, "n_to_align_sweep", None):
+        if not (args.align or args.correct_scale):
+            logger.error("--n_to_align_sweep requires --align and/or "
+                         "--correct_scale")
+            sys.exit(1)
+        if args.align_origin:
+            logger.error("--n_to_align_sweep can't be combined with "
+                         "--align_origin")
+            sys.exit(1)
+        if args.plot or args.save_plot or args.serialize_plot:
+            logger.warning("Plotting is not supported for alignment sweeps.")
+        # Each result is saved (or dropped) before the next one is computed.
+        for sweep_result in ape_sweep(traj_ref, traj_est, pose_relation,
+                                      args.n_to_align_sweep, args.align,
+                                      args.correct_scale, args.align_origin,
+                                      ref_name, est_name):
+            if args.save_results:
+                logger.debug(SEP)
+                if not SETTINGS.save_traj_in_zip:
+                    del sweep_result.trajectories[ref_name]
+                    del sweep_result.trajectories[est_name]
+                file_interface.save_res_file(
+                    common.sweep_results_path(args.save_results,
+                                              "n_to_align",
+                                              sweep_result.info["n_to_align"]),
+                    sweep_result, confirm_overwrite=not args.no_warnings)
+        return
+
     result = ape(
         traj_ref=traj_ref,
         traj_est=traj_est,
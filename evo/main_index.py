@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: UTF8 -*-
+# PYTHON_ARGCOMPLETE_OK
+"""
+main executable for indexing result files, which can be queried by evo_res
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import logging
+
+from evo.tools.settings import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def parser() -> argparse.ArgumentParser:
+    basic_desc = ("tool for indexing result files in a SQLite database, "
+                  "to query them with evo_res --index")
+    lic = "(c) evo authors"
+    main_parser = argparse.ArgumentParser(description="%s %s" %
+                                          (basic_desc, lic))
+    usability_opts = main_parser.add_argument_group("usability options")
+    main_parser.add_argument("result_files", help="result files to index",
+                             nargs='*')
+    main_parser.add_argument(
+        "--db", help="path of the index database (default from settings)",
+        default=SETTINGS.result_index_path)
+    main_parser.add_argument(
+        "--arrays", nargs='+', default=[],
+        help="names of arrays to store downsampled, e.g. error_array")
+    main_parser.add_argument(
+        "--max_array_size", type=int, default=1000,
+        help="max. number of values per stored array")
+    main_parser.add_argument(
+        "--prune", action="store_true",
+        help="remove entries of result files that don't exist anymore")
+    usability_opts.add_argument("--no_warnings",
+                                help="no warnings requiring user confirmation",
+                                action="store_true")
+    usability_opts.add_argument("-v", "--verbose", help="verbose output",
+                                action="store_true")
+    usability_opts.add_argument("--silent", help="don't print any output",
+                                action="store_true")
+    usability_opts.add_argument(
+        "--debug", help="verbose output with additional debug info",
+        action="store_true")
+    return main_parser
+
+
+def run(args: argparse.Namespace) -> None:
+    from evo.tools import log
+    from evo.tools.result_index import ResultIndex
+
+    log.configure_logging(args.verbose, args.silent, args.debug)
+    with ResultIndex(args.db) as index:
+        num_indexed, num_unchanged = index.update(args.result_files,
+                                                  args.arrays,
+                                                  args.max_array_size)
+        logger.info("Indexed {} result files, {} unchanged.".format(
+            num_indexed, num_unchanged))
+        if args.prune:
+            logger.info("Removed {} entries of missing files.".format(
+                index.prune()))
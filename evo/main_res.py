@@ -24,12 +24,13 @@ along with evo.  If not, see <http://www.gnu.org/licenses/>.
 import argparse
 import logging
 import sys
+import time
 import typing
 
 import pandas as pd
 
 from evo.core.result import merge_results, Result
-from evo.tools import file_interface, log, user, pandas_bridge
+from evo.tools import arrow_bridge, file_interface, log, user, pandas_bridge
 from evo.tools.settings import SETTINGS
 
 logger = logging.getLogger(__name__)
@@ -54,9 +55,12 @@ def parser() -> argparse.ArgumentParser:
     main_parser = argparse.ArgumentParser(description="%s %s" %
                                           (basic_desc, lic))
     output_opts = main_parser.add_argument_group("output options")
+    index_opts = main_parser.add_argument_group(
+        "index options (query the database of evo_index instead of loading "
+        "result files, which then only restrict the query)")
     usability_opts = main_parser.add_argument_group("usability options")
     main_parser.add_argument("result_files",
-                             help="one or multiple result files", nargs='+')
+                             help="one or multiple result files", nargs='*')
     main_parser.add_argument("--merge",
                              help="merge the results into a single one",
                              action="store_true")
@@ -79,10 +83,29 @@ def parser() -> argparse.ArgumentParser:
                              help="path to serialize plot (experimental)",
                              default=None)
     output_opts.add_argument(
-        "--save_table", help="path to a file to save the results in a table",
+        "--save_table", help="path to a file to save the results in a table, "
+        "complete results in columns for .parquet / .arrow / .feather files",
         default=None)
     output_opts.add_argument("--logfile", help="Local logfile path.",
                              default=None)
+    index_opts.add_argument("--index", help="query the result index",
+                            action="store_true")
+    index_opts.add_argument(
+        "--index_db", default=SETTINGS.result_index_path,
+        help="path of the index database (default from settings)")
+    index_opts.add_argument(
+        "--filter", action="append", default=[], metavar="KEY=PATTERN",
+        help="only results whose info value of KEY matches the glob PATTERN, "
+        "e.g. est_name=*ORB* (can be repeated)")
+    index_opts.add_argument(
+        "--max_age", type=float, default=None,
+        help="only results of files modified in the last MAX_AGE days")
+    index_opts.add_argument("--group_by", nargs='+', default=[],
+                            help="info keys to group the results by")
+    index_opts.add_argument(
+        "--aggregate", default=None,
+        choices=["mean", "median", "min", "max", "std", "count"],
+        help="aggregate the stats of the results (of each group)")
     usability_opts.add_argument("--no_warnings",
                                 help="no warnings requiring user confirmation",
                                 action="store_true")
@@ -99,6 +122,60 @@ def parser() -> argparse.ArgumentParser:
     return main_parser
 
 
+def query_index(args: argparse.Namespace) -> None:
+    from evo.tools.result_index import ResultIndex, ResultIndexException
+
+    filters = {}
+    for filter_str in args.filter:
+        key, sep, pattern = filter_str.partition("=")
+        if not sep:
+            raise ResultIndexException(
+                "expected a filter like KEY=PATTERN, got " + filter_str)
+        filters[key] = pattern
+    min_mtime = None
+    if args.max_age is not None:
+        min_mtime = time.time() - args.max_age * 24 * 3600
+    with ResultIndex(args.index_db) as index:
+        df = index.query(filters, min_mtime, args.result_files or None)
+    if df.empty:
+        logger.warning("No matching results in " + args.index_db)
+        return
+    logger.debug(SEP)
+    logger.debug("Found {} matching results in {}".format(
+        len(df), args.index_db))
+
+    for key in args.group_by:
+        if ("info", key) not in df.columns:
+            raise ResultIndexException("no info key {} in the results".format(
+                key))
+    stats = df["stats"]
+    if args.aggregate and args.group_by:
+        stats = stats.groupby(
+            [df["info", key].rename(key) for key in args.group_by]).agg(
+                args.aggregate)
+    elif args.aggregate:
+        stats = stats.agg(args.aggregate).to_frame(name=args.aggregate).T
+    elif args.group_by:
+        stats = stats.set_index([df["info", key] for key in args.group_by],
+                                append=True)
+    logger.info(stats.to_string(line_width=80) + "\n")
+
+    if args.save_table:
+        logger.debug(SEP)
+        if SETTINGS.table_export_data.lower() == "stats":
+            data = stats.T
+        elif SETTINGS.table_export_data.lower() == "info":
+            data = df["info"].T
+        else:
+            raise ValueError(
+                "unsupported export data specifier with --index: {}".format(
+                    SETTINGS.table_export_data))
+        pandas_bridge.save_df_as_table(data, args.save_table,
+                                       confirm_overwrite=not args.no_warnings)
+    if args.plot or args.save_plot or args.serialize_plot:
+        logger.warning("Plots are not supported with --index.")
+
+
 def run(args: argparse.Namespace) -> None:
 
     pd.options.display.width = 80
@@ -112,9 +189,48 @@ def run(args: argparse.Namespace) -> None:
         logger.debug("main_parser config:\n{}\n".format(
             pprint.pformat(arg_dict)))
 
-    df = pandas_bridge.load_results_as_dataframe(args.result_files,
-                                                 args.use_filenames,
-                                                 args.merge)
+    if args.index:
+        query_index(args)
+        return
+    if not args.result_files:
+        logger.error("No result files given (or use --index).")
+        sys.exit(1)
+
+    # The raw value arrays are only needed for plots and error_array tables,
+    # Arrow / Parquet tables are exported batch-wise from lazy results.
+    export_arrow = bool(args.save_table) and arrow_bridge.is_arrow_path(
+        args.save_table)
+    load_arrays = bool(args.plot or args.save_plot or args.serialize_plot or (
+        args.save_table and not export_arrow
+        and SETTINGS.table_export_data.lower() == "error_array"))
+    if export_arrow:
+        # Loaded once for the statistics and the export. Lazily, so that the
+        # arrays are only read batch-wise while they are exported.
+        if args.merge:
+            export_results = [file_interface.merge_res_files(
+                args.result_files)]
+            export_labels, array_headers = None, None
+        else:
+            export_results = [
+                file_interface.load_res_file(f, lazy=True)
+                for f in args.result_files
+            ]
+            export_labels = args.result_files
+            array_headers = [
+                file_interface.read_res_array_headers(f)
+                for f in args.result_files
+            ]
+        df_labels = (export_labels if args.use_filenames and export_labels
+                     else [None] * len(export_results))
+        df = pd.concat([
+            pandas_bridge.result_to_df(result_obj, label,
+                                       include_arrays=load_arrays)
+            for result_obj, label in zip(export_results, df_labels)
+        ], axis="columns")
+    else:
+        df = pandas_bridge.load_results_as_dataframe(args.result_files,
+                                                     args.use_filenames,
+                                                     args.merge, load_arrays)
 
     keys = df.columns.values.tolist()
     if SETTINGS.plot_usetex:
@@ -132,7 +248,7 @@ def run(args: argparse.Namespace) -> None:
     time_indices = ["timestamps", "seconds_from_start", "sec_from_start"]
     if args.use_rel_time:
         del time_indices[0]
-    for idx in time_indices:
+    for idx in time_indices if load_arrays else []:
         if idx not in df.loc["np_arrays"].index:
             continue
         if df.loc["np_arrays", idx].isnull().values.any():
@@ -142,7 +258,9 @@ def run(args: argparse.Namespace) -> None:
             break
 
     # build error_df (raw values) according to common_index
-    if common_index is None:
+    if not load_arrays:
+        error_df = pd.DataFrame()
+    elif common_index is None:
         # use a non-timestamp index
         error_df = pd.DataFrame(df.loc["np_arrays", "error_array"].tolist(),
                                 index=keys).T
@@ -191,7 +309,14 @@ def run(args: argparse.Namespace) -> None:
         logger.info("\n" + first_title + "\n\n")
     logger.info(df.loc["stats"].T.to_string(line_width=80) + "\n")
 
-    if args.save_table:
+    if export_arrow:
+        logger.debug(SEP)
+        # Columnar table of the complete results, one row per result.
+        arrow_bridge.write_results_file(args.save_table, export_results,
+                                        export_labels,
+                                        confirm_overwrite=not args.no_warnings,
+                                        array_headers=array_headers)
+    elif args.save_table:
         logger.debug(SEP)
         if SETTINGS.table_export_data.lower() == "error_array":
             data = error_df
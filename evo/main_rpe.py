@@ -22,7 +22,9 @@ along with evo.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import argparse
+import copy
 import logging
+import typing
 
 import numpy as np
 
@@ -51,7 +53,7 @@ def parser() -> argparse.ArgumentParser:
         "-r", "--pose_relation", default="trans_part",
         help="pose relation on which the RPE is based", choices=[
             "full", "trans_part", "rot_part", "angle_deg", "angle_rad",
-            "point_distance", "point_distance_error_ratio"
+            "point_distance", "point_distance_error_ratio", "twist"
         ])
     algo_opts.add_argument("-a", "--align",
                            help="alignment with Umeyama's method (no scale)",
@@ -68,6 +70,11 @@ def parser() -> argparse.ArgumentParser:
         "trajectory", action="store_true")
     algo_opts.add_argument("-d", "--delta", type=float, default=1,
                            help="delta between relative poses")
+    algo_opts.add_argument(
+        "--deltas", nargs="+", type=float, default=None,
+        help="delta sweep: calculate one result for each of the given deltas "
+        "and save them with --save_results, e.g. for drift analysis "
+        "(overrides --delta)")
     algo_opts.add_argument("-t", "--delta_tol", type=float, default=0.1,
                            help="relative delta tolerance for all_pairs mode")
     algo_opts.add_argument(
@@ -82,6 +89,12 @@ def parser() -> argparse.ArgumentParser:
     algo_opts.add_argument(
         "--pairs_from_reference", action="store_true",
         help="determine the pose pairs from the reference trajectory")
+    algo_opts.add_argument(
+        "--kitti_odometry", type=float, nargs="*", metavar="LENGTH",
+        help="calculate the KITTI odometry benchmark errors instead: "
+        "translational (trans_part, in %%) or rotational (angle_deg, "
+        "angle_rad, per meter) drift on segments of the given lengths in "
+        "meters (default: 100 200 ... 800), ignores the delta options")
 
     output_opts.add_argument(
         "-p",
@@ -202,15 +215,14 @@ def parser() -> argparse.ArgumentParser:
     return main_parser
 
 
-def rpe(traj_ref: PosePath3D, traj_est: PosePath3D,
-        pose_relation: metrics.PoseRelation, delta: float,
-        delta_unit: metrics.Unit, rel_delta_tol: float = 0.1,
-        all_pairs: bool = False, pairs_from_reference: bool = False,
-        align: bool = False, correct_scale: bool = False, n_to_align: int = -1,
-        align_origin: bool = False, ref_name: str = "reference",
-        est_name: str = "estimate", support_loop: bool = False) -> Result:
-
-    # Align the trajectories.
+def align_trajectories(traj_ref: PosePath3D, traj_est: PosePath3D,
+                       align: bool = False, correct_scale: bool = False,
+                       n_to_align: int = -1, align_origin: bool = False
+                       ) -> typing.Optional[np.ndarray]:
+    """
+    Aligns traj_est to traj_ref in-place as requested by the flags.
+    :return: the applied alignment transformation, if any
+    """
     only_scale = correct_scale and not align
     alignment_transformation = None
     if align or correct_scale:
@@ -220,37 +232,49 @@ def rpe(traj_ref: PosePath3D, traj_est: PosePath3D,
     elif align_origin:
         logger.debug(SEP)
         alignment_transformation = traj_est.align_origin(traj_ref)
+    return alignment_transformation
 
-    # Calculate RPE.
-    logger.debug(SEP)
-    data = (traj_ref, traj_est)
-    rpe_metric = metrics.RPE(pose_relation, delta, delta_unit, rel_delta_tol,
-                             all_pairs, pairs_from_reference)
-    rpe_metric.process_data(data)
 
-    title = str(rpe_metric)
+def alignment_title(align: bool = False, correct_scale: bool = False,
+                    n_to_align: int = -1, align_origin: bool = False) -> str:
+    """
+    :return: title suffix describing the alignment
+    """
+    only_scale = correct_scale and not align
     if align and not correct_scale:
-        title += "\n(with SE(3) Umeyama alignment)"
+        title = "\n(with SE(3) Umeyama alignment)"
     elif align and correct_scale:
-        title += "\n(with Sim(3) Umeyama alignment)"
+        title = "\n(with Sim(3) Umeyama alignment)"
     elif only_scale:
-        title += "\n(scale corrected)"
+        title = "\n(scale corrected)"
     elif align_origin:
-        title += "\n(with origin alignment)"
+        title = "\n(with origin alignment)"
     else:
-        title += "\n(not aligned)"
+        title = "\n(not aligned)"
     if (align or correct_scale) and n_to_align != -1:
         title += " (aligned poses: {})".format(n_to_align)
-
+    return title
+
+
+def rpe_result(rpe_metric: metrics.RPE, traj_ref: PosePath3D,
+               traj_est: PosePath3D,
+               alignment_transformation: typing.Optional[np.ndarray] = None,
+               align: bool = False, correct_scale: bool = False,
+               n_to_align: int = -1, align_origin: bool = False,
+               ref_name: str = "reference", est_name: str = "estimate",
+               support_loop: bool = False) -> Result:
+    """
+    Wraps a processed RPE metric and the trajectories in a Result.
+    """
     rpe_result = rpe_metric.get_result(ref_name, est_name)
-    rpe_result.info["title"] = title
+    rpe_result.info["title"] = str(rpe_metric) + alignment_title(
+        align, correct_scale, n_to_align, align_origin)
     logger.debug(SEP)
     logger.info(rpe_result.pretty_str())
 
     # Restrict trajectories to delta ids for further processing steps.
     if support_loop:
         # Avoid overwriting if called repeatedly e.g. in Jupyter notebook.
-        import copy
         traj_ref = copy.deepcopy(traj_ref)
         traj_est = copy.deepcopy(traj_est)
     # Note: the pose at index 0 is added for plotting purposes, although it has
@@ -280,6 +304,101 @@ def rpe(traj_ref: PosePath3D, traj_est: PosePath3D,
     return rpe_result
 
 
+def rpe(traj_ref: PosePath3D, traj_est: PosePath3D,
+        pose_relation: metrics.PoseRelation, delta: float,
+        delta_unit: metrics.Unit, rel_delta_tol: float = 0.1,
+        all_pairs: bool = False, pairs_from_reference: bool = False,
+        align: bool = False, correct_scale: bool = False, n_to_align: int = -1,
+        align_origin: bool = False, ref_name: str = "reference",
+        est_name: str = "estimate", support_loop: bool = False) -> Result:
+
+    # Align the trajectories.
+    alignment_transformation = align_trajectories(traj_ref, traj_est, align,
+                                                  correct_scale, n_to_align,
+                                                  align_origin)
+
+    # Calculate RPE.
+    logger.debug(SEP)
+    data = (traj_ref, traj_est)
+    rpe_metric = metrics.RPE(pose_relation, delta, delta_unit, rel_delta_tol,
+                             all_pairs, pairs_from_reference, retain_E=False)
+    rpe_metric.process_data(data)
+
+    return rpe_result(rpe_metric, traj_ref, traj_est,
+                      alignment_transformation, align, correct_scale,
+                      n_to_align, align_origin, ref_name, est_name,
+                      support_loop)
+
+
+def rpe_sweep(traj_ref: PosePath3D, traj_est: PosePath3D,
+              pose_relation: metrics.PoseRelation,
+              deltas: typing.Sequence[float], delta_unit: metrics.Unit,
+              rel_delta_tol: float = 0.1, all_pairs: bool = False,
+              pairs_from_reference: bool = False, align: bool = False,
+              correct_scale: bool = False, n_to_align: int = -1,
+              align_origin: bool = False, ref_name: str = "reference",
+              est_name: str = "estimate") -> typing.Iterator[Result]:
+    """
+    Calculates the RPE for multiple deltas. The trajectories are aligned
+    once and the precomputation is shared, see metrics.rpe_for_deltas().
+    The results hold shared copies of the aligned trajectories, reduced to
+    the poses of their delta.
+    :return: generator of one result per delta, in the given order
+    """
+    alignment_transformation = align_trajectories(traj_ref, traj_est, align,
+                                                  correct_scale, n_to_align,
+                                                  align_origin)
+    logger.debug(SEP)
+    rpe_metrics = metrics.rpe_for_deltas((traj_ref, traj_est), deltas,
+                                         pose_relation, delta_unit,
+                                         rel_delta_tol, all_pairs,
+                                         pairs_from_reference)
+    for rpe_metric in rpe_metrics:
+        sweep_result = rpe_result(rpe_metric, sync.shared_copy(traj_ref),
+                                  sync.shared_copy(traj_est),
+                                  alignment_transformation, align,
+                                  correct_scale, n_to_align, align_origin,
+                                  ref_name, est_name)
+        sweep_result.info["delta"] = rpe_metric.delta
+        yield sweep_result
+
+
+def kitti_odometry(traj_ref: PosePath3D, traj_est: PosePath3D,
+                   pose_relation: metrics.PoseRelation,
+                   lengths: typing.Optional[typing.Sequence[float]] = None,
+                   align: bool = False, correct_scale: bool = False,
+                   n_to_align: int = -1, align_origin: bool = False,
+                   ref_name: str = "reference",
+                   est_name: str = "estimate") -> Result:
+    """
+    Calculates the KITTI odometry benchmark errors, see
+    metrics.KittiOdometry.
+    :param lengths: segment lengths in meters (default: 100, 200, ..., 800)
+    """
+    alignment_transformation = align_trajectories(traj_ref, traj_est, align,
+                                                  correct_scale, n_to_align,
+                                                  align_origin)
+    logger.debug(SEP)
+    if lengths:
+        kitti_metric = metrics.KittiOdometry(pose_relation, lengths)
+    else:
+        kitti_metric = metrics.KittiOdometry(pose_relation)
+    kitti_metric.process_data((traj_ref, traj_est))
+
+    kitti_result = kitti_metric.get_result(ref_name, est_name)
+    kitti_result.info["title"] = str(kitti_metric) + alignment_title(
+        align, correct_scale, n_to_align, align_origin)
+    logger.debug(SEP)
+    logger.info(kitti_result.pretty_str())
+
+    kitti_result.add_trajectory(ref_name, traj_ref)
+    kitti_result.add_trajectory(est_name, traj_est)
+    if alignment_transformation is not None:
+        kitti_result.add_np_array("alignment_transformation_sim3",
+                                  alignment_transformation)
+    return kitti_result
+
+
 def run(args: argparse.Namespace) -> None:
 
     log.configure_logging(args.verbose, args.silent, args.debug,
@@ -296,7 +415,6 @@ def run(args: argparse.Namespace) -> None:
 
     traj_ref_full = None
     if args.plot_full_ref:
-        import copy
         traj_ref_full = copy.deepcopy(traj_ref)
 
     if isinstance(traj_ref, PoseTrajectory3D) and isinstance(
@@ -313,6 +431,44 @@ def run(args: argparse.Namespace) -> None:
             traj_ref, traj_est, args.t_max_diff, args.t_offset,
             first_name=ref_name, snd_name=est_name)
 
+    if getattr(args, "kitti_odometry", None) is not None:
+        if args.plot or args.save_plot or args.serialize_plot:
+            logger.warning(
+                "Plotting is not supported for the KITTI odometry metric.")
+        result = kitti_odometry(traj_ref, traj_est, pose_relation,
+                                args.kitti_odometry, args.align,
+                                args.correct_scale, args.n_to_align,
+                                args.align_origin, ref_name, est_name)
+        if args.save_results:
+            logger.debug(SEP)
+            if not SETTINGS.save_traj_in_zip:
+                del result.trajectories[ref_name]
+                del result.trajectories[est_name]
+            file_interface.save_res_file(
+                args.save_results, result,
+                confirm_overwrite=not args.no_warnings)
+        return
+
+    if getattr(args, "deltas", None):
+        if args.plot or args.save_plot or args.serialize_plot:
+            logger.warning("Plotting is not supported for delta sweeps.")
+        # Each result is saved (or dropped) before the next one is wrapped.
+        for sweep_result in rpe_sweep(
+                traj_ref, traj_est, pose_relation, args.deltas, delta_unit,
+                args.delta_tol, args.all_pairs, args.pairs_from_reference,
+                args.align, args.correct_scale, args.n_to_align,
+                args.align_origin, ref_name, est_name):
+            if args.save_results:
+                logger.debug(SEP)
+                if not SETTINGS.save_traj_in_zip:
+                    del sweep_result.trajectories[ref_name]
+                    del sweep_result.trajectories[est_name]
+                file_interface.save_res_file(
+                    common.sweep_results_path(args.save_results, "delta",
+                                              sweep_result.info["delta"]),
+                    sweep_result, confirm_overwrite=not args.no_warnings)
+        return
+
     result = rpe(
         traj_ref=traj_ref,
         traj_est=traj_est,
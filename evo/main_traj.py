@@ -113,6 +113,9 @@ def parser() -> argparse.ArgumentParser:
     output_opts.add_argument("--save_as_kitti",
                              help="save poses in KITTI format (as *.kitti)",
                              action="store_true")
+    output_opts.add_argument(
+        "--save_as_parquet", action="store_true",
+        help="save trajectories as Apache Parquet tables (as *.parquet)")
     output_opts.add_argument("--save_as_bag",
                              help="save trajectories in ROS bag as <date>.bag",
                              action="store_true")
@@ -355,7 +358,8 @@ def run(args):
                     format(name))
             logger.info("Adding time offset to {}: {} (s)".format(
                 name, args.t_offset))
-            traj.timestamps += args.t_offset
+            # Not in-place, timestamps can be read-only memory maps.
+            traj.timestamps = traj.timestamps + args.t_offset
 
     if args.n_to_align != -1 and not (args.align or args.correct_scale):
         die("--n_to_align is useless without --align or/and --correct_scale")
@@ -538,6 +542,17 @@ def run(args):
             dest = to_filestem(args.ref, args) + ".kitti"
             file_interface.write_kitti_poses_file(
                 dest, ref_traj, confirm_overwrite=not args.no_warnings)
+    if args.save_as_parquet:
+        from evo.tools import arrow_bridge
+        logger.info(SEP)
+        for name, traj in trajectories.items():
+            dest = to_filestem(name, args) + ".parquet"
+            arrow_bridge.write_trajectory_file(
+                dest, traj, confirm_overwrite=not args.no_warnings)
+        if args.ref:
+            dest = to_filestem(args.ref, args) + ".parquet"
+            arrow_bridge.write_trajectory_file(
+                dest, ref_traj, confirm_overwrite=not args.no_warnings)
     if args.save_as_bag or args.save_as_bag2:
         from rosbags.rosbag1 import Writer as Rosbag1Writer
         from rosbags.rosbag2 import Writer as Rosbag2Writer
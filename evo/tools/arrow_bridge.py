@@ -0,0 +1,427 @@
+# -*- coding: UTF8 -*-
+"""
+columnar export of trajectories and results to Apache Arrow / Parquet
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import logging
+import os
+import typing
+
+import numpy as np
+
+from evo import EvoException
+from evo.core import result
+from evo.core.trajectory import PosePath3D, PoseTrajectory3D
+from evo.tools import file_interface, user
+
+logger = logging.getLogger(__name__)
+
+# Parquet files or Arrow IPC (Feather V2) files.
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = PARQUET_SUFFIXES + (".arrow", ".feather", ".ipc")
+
+POSITION_COLUMNS = ("x", "y", "z")
+ORIENTATION_COLUMNS = ("qw", "qx", "qy", "qz")
+
+# Field metadata: inner shape of array columns, JSON encoded info columns.
+INNER_SHAPE_KEY = b"evo.inner_shape"
+JSON_KEY = b"evo.json"
+# Approx. size of the array data in a batch of rows that is written at once.
+BATCH_BYTES = 1 << 26
+
+
+class ArrowBridgeException(EvoException):
+    pass
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ArrowBridgeException(
+            "pyarrow is required for Arrow / Parquet files, "
+            "install it with: pip install pyarrow")
+    return pyarrow
+
+
+def is_arrow_path(path: str) -> bool:
+    """
+    :param path: a file path
+    :return: True if the path has an Arrow or Parquet file suffix
+    """
+    return str(path).lower().endswith(ARROW_SUFFIXES)
+
+
+def write_table(table, path: str, confirm_overwrite: bool = False) -> None:
+    """
+    :param table: pyarrow.Table
+    :param path: .parquet file or Arrow IPC file (.arrow, .feather, .ipc)
+    :param confirm_overwrite: whether to require user interaction
+           to overwrite existing files
+    """
+    if confirm_overwrite and not user.check_and_confirm_overwrite(path):
+        return
+    _import_pyarrow()
+    if str(path).lower().endswith(PARQUET_SUFFIXES):
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, path)
+    else:
+        import pyarrow.feather
+        pyarrow.feather.write_feather(table, path)
+    logger.debug("Table with {} rows saved to: {}".format(
+        table.num_rows, path))
+
+
+def read_table(path: str, columns: typing.Optional[typing.List[str]] = None):
+    """
+    :param path: .parquet file or Arrow IPC file (.arrow, .feather, .ipc)
+    :param columns: only read these columns
+    :return: pyarrow.Table, Arrow IPC files are memory mapped
+    """
+    _import_pyarrow()
+    if not os.path.isfile(path):
+        raise ArrowBridgeException("file doesn't exist: " + path)
+    if str(path).lower().endswith(PARQUET_SUFFIXES):
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(path, columns=columns)
+    import pyarrow.feather
+    return pyarrow.feather.read_table(path, columns=columns, memory_map=True)
+
+
+def df_to_table(df):
+    """
+    :param df: pandas.DataFrame, e.g. of pandas_bridge
+    :return: pyarrow.Table with the columns of the dataframe as strings
+    """
+    pa = _import_pyarrow()
+    df = df.rename(columns=str)
+    return pa.Table.from_pandas(df)
+
+
+def trajectory_to_table(traj: PosePath3D):
+    """
+    :param traj: trajectory.PosePath3D or trajectory.PoseTrajectory3D
+    :return: pyarrow.Table with the (timestamp) x y z qw qx qy qz columns,
+             the timestamps are not copied, the positions and orientations
+             are copied once into a column-major block each
+    """
+    pa = _import_pyarrow()
+    columns = {}
+    if isinstance(traj, PoseTrajectory3D):
+        columns["timestamp"] = pa.array(traj.timestamps)
+    # Columns of the n x 3 / n x 4 arrays are strided, pa.array would copy
+    # each of them. The rows of the transposed blocks are used as they are.
+    for names, block in ((POSITION_COLUMNS, traj.positions_xyz),
+                         (ORIENTATION_COLUMNS, traj.orientations_quat_wxyz)):
+        for name, column in zip(names, np.ascontiguousarray(block.T)):
+            columns[name] = pa.array(column)
+    return pa.table(columns)
+
+
+def table_to_trajectory(table) -> PosePath3D:
+    """
+    :param table: pyarrow.Table, see trajectory_to_table()
+    :return: trajectory.PoseTrajectory3D if the table has a timestamp column,
+             otherwise trajectory.PosePath3D
+    """
+    missing = set(POSITION_COLUMNS + ORIENTATION_COLUMNS) - set(
+        table.column_names)
+    if missing:
+        raise ArrowBridgeException(
+            "missing trajectory columns: {}".format(sorted(missing)))
+
+    def stack(names: typing.Sequence[str]) -> np.ndarray:
+        return np.column_stack([
+            table.column(name).to_numpy().astype(np.float64, copy=False)
+            for name in names
+        ])
+
+    xyz = stack(POSITION_COLUMNS)
+    quat = stack(ORIENTATION_COLUMNS)
+    if "timestamp" in table.column_names:
+        return PoseTrajectory3D(xyz, quat, stack(["timestamp"])[:, 0])
+    return PosePath3D(xyz, quat)
+
+
+def write_trajectory_file(path: str, traj: PosePath3D,
+                          confirm_overwrite: bool = False) -> None:
+    """
+    :param path: .parquet file or Arrow IPC file (.arrow, .feather, .ipc)
+    :param traj: trajectory.PosePath3D or trajectory.PoseTrajectory3D
+    :param confirm_overwrite: whether to require user interaction
+           to overwrite existing files
+    """
+    write_table(trajectory_to_table(traj), path, confirm_overwrite)
+    logger.info("Trajectory saved to: " + path)
+
+
+def read_trajectory_file(path: str) -> PosePath3D:
+    """
+    :param path: .parquet file or Arrow IPC file (.arrow, .feather, .ipc)
+    :return: trajectory.PoseTrajectory3D or trajectory.PosePath3D,
+             see table_to_trajectory()
+    """
+    traj = table_to_trajectory(read_table(path))
+    logger.debug("Loaded {} poses from: {}".format(traj.num_poses, path))
+    return traj
+
+
+def _info_column(pa, values: typing.List[typing.Any]):
+    # Native column if the values have a common scalar type,
+    # otherwise JSON strings that are decoded when reading.
+    present = [v for v in values if v is not None]
+    if all(isinstance(v, (str, bool, int, float)) for v in present) \
+            and len(set(type(v) for v in present)) <= 1:
+        return pa.array(values), None
+    return pa.array([None if v is None else json.dumps(v)
+                     for v in values]), {JSON_KEY: b"1"}
+
+
+def _array_field(name: str, headers: typing.Sequence[result.ArrayHeader]
+                 ) -> typing.Tuple[np.dtype, dict]:
+    # Common dtype and field metadata of an array column. The inner shape
+    # (e.g. 6 for n x 6 twists) has to be the same in all results.
+    inner_shapes = {tuple(shape[1:]) for shape, _ in headers}
+    if len(inner_shapes) > 1:
+        raise ArrowBridgeException(
+            "arrays of different inner shapes can't be in one column: "
+            "{} {}".format(name, sorted(inner_shapes)))
+    dtype = np.result_type(*[dtype for _, dtype in headers])
+    inner_shape = list(next(iter(inner_shapes))) if inner_shapes else []
+    return dtype, {INNER_SHAPE_KEY: json.dumps(inner_shape).encode()}
+
+
+def _array_column(pa, arrays: typing.List[typing.Optional[np.ndarray]],
+                  dtype: np.dtype):
+    # One list per result, with the flattened array (or null if missing).
+    present = [a for a in arrays if a is not None]
+    sizes = [0 if a is None else a.size for a in arrays]
+    offsets = pa.array(np.concatenate(([0], np.cumsum(sizes))),
+                       type=pa.int64())
+    if len(present) == 1:
+        # Not copied if the array is contiguous.
+        values = present[0].ravel().astype(dtype, copy=False)
+    elif present:
+        values = np.concatenate([a.ravel() for a in present]).astype(
+            dtype, copy=False)
+    else:
+        values = np.empty(0, dtype)
+    mask = pa.array([a is None for a in arrays]) if len(present) != len(
+        arrays) else None
+    return pa.LargeListArray.from_arrays(offsets, pa.array(values),
+                                         mask=mask)
+
+
+def _get_array(result_obj: result.Result, name: str) -> np.ndarray:
+    # Lazily loaded arrays are not kept in the result after the export.
+    arrays = result_obj.np_arrays
+    if isinstance(arrays, file_interface.LazyDict):
+        return np.asarray(arrays.get_uncached(name))
+    return np.asarray(arrays[name])
+
+
+class _ResultsLayout(object):
+    """
+    Schema of results_to_table() and the complete label, info and stats
+    columns, which are small. The array columns are built per batch of rows.
+    """
+    def __init__(self, pa, results: typing.Sequence[result.Result],
+                 labels: typing.Optional[typing.Sequence[str]] = None,
+                 array_headers: typing.Optional[typing.Sequence[typing.Dict[
+                     str, result.ArrayHeader]]] = None):
+        fields, self.columns = [], []
+        if labels is not None:
+            fields.append(pa.field("label", pa.string()))
+            self.columns.append(pa.array(list(labels), type=pa.string()))
+        for attribute in ("info", "stats"):
+            keys: typing.List[str] = []
+            for result_obj in results:
+                keys.extend(k for k in getattr(result_obj, attribute)
+                            if k not in keys)
+            for key in keys:
+                values = [
+                    getattr(result_obj, attribute).get(key)
+                    for result_obj in results
+                ]
+                if attribute == "info":
+                    column, metadata = _info_column(pa, values)
+                else:
+                    column, metadata = pa.array(values,
+                                                type=pa.float64()), None
+                fields.append(
+                    pa.field("{}.{}".format(attribute, key), column.type,
+                             metadata=metadata))
+                self.columns.append(column)
+        if array_headers is None:
+            # Taken from the arrays, lazily loaded ones are not kept.
+            array_headers = []
+            for result_obj in results:
+                headers = {}
+                for name in result_obj.np_arrays:
+                    array = _get_array(result_obj, name)
+                    headers[name] = (array.shape, array.dtype)
+                array_headers.append(headers)
+        self.array_headers = array_headers
+        names: typing.List[str] = []
+        for headers in array_headers:
+            names.extend(name for name in headers if name not in names)
+        self.array_names, self.array_dtypes = names, []
+        for name in names:
+            dtype, metadata = _array_field(
+                name, [headers[name] for headers in array_headers
+                       if name in headers])
+            fields.append(
+                pa.field("np_arrays.{}".format(name),
+                         pa.large_list(pa.from_numpy_dtype(dtype)),
+                         metadata=metadata))
+            self.array_dtypes.append(dtype)
+        self.schema = pa.schema(fields)
+
+    def record_batch(self, pa, results: typing.Sequence[result.Result],
+                     start: int):
+        """
+        :param results: results of the rows [start, start + len(results))
+        :return: pyarrow.RecordBatch of these rows
+        """
+        columns = [
+            column.slice(start, len(results)) for column in self.columns
+        ]
+        for name, dtype in zip(self.array_names, self.array_dtypes):
+            columns.append(
+                _array_column(pa, [
+                    _get_array(result_obj, name)
+                    if name in result_obj.np_arrays else None
+                    for result_obj in results
+                ], dtype))
+        return pa.RecordBatch.from_arrays(columns, schema=self.schema)
+
+
+def results_to_table(results: typing.Iterable[result.Result],
+                     labels: typing.Optional[typing.Sequence[str]] = None):
+    """
+    Converts results to a table with one row per result and the columns
+    "info.<key>", "stats.<key>" and "np_arrays.<name>" (flattened arrays as
+    lists). Keys that a result doesn't have are null in its row.
+    :param results: evo.core.result.Result instances
+    :param labels: optional labels of the results, e.g. the file names,
+                   added as "label" column
+    :return: pyarrow.Table
+    """
+    pa = _import_pyarrow()
+    results = list(results)
+    layout = _ResultsLayout(pa, results, labels)
+    return pa.Table.from_batches([layout.record_batch(pa, results, 0)],
+                                 schema=layout.schema)
+
+
+def table_to_results(table) -> typing.List[result.Result]:
+    """
+    :param table: pyarrow.Table, see results_to_table()
+    :return: evo.core.result.Result instances, the arrays are read-only views
+             of the table's memory if possible
+    """
+    results = [result.Result() for _ in range(table.num_rows)]
+    for field in table.schema:
+        attribute, sep, key = field.name.partition(".")
+        if not sep or attribute not in ("info", "stats", "np_arrays"):
+            continue
+        column = table.column(field.name)
+        # combine_chunks() would also copy a single chunk.
+        column = column.chunk(0) if column.num_chunks == 1 \
+            else column.combine_chunks()
+        metadata = field.metadata or {}
+        if attribute == "np_arrays":
+            inner_shape = tuple(json.loads(metadata[INNER_SHAPE_KEY]))
+            offsets = column.offsets.to_numpy()
+            values = column.values.to_numpy(zero_copy_only=False)
+            for i, result_obj in enumerate(results):
+                if column[i].is_valid:
+                    result_obj.add_np_array(
+                        key, values[offsets[i]:offsets[i + 1]].reshape(
+                            (-1, ) + inner_shape))
+            continue
+        for result_obj, value in zip(results, column.to_pylist()):
+            if value is None:
+                continue
+            if JSON_KEY in metadata:
+                value = json.loads(value)
+            getattr(result_obj, attribute)[key] = value
+    return results
+
+
+def write_results_file(
+        path: str, results: typing.Sequence[result.Result],
+        labels: typing.Optional[typing.Sequence[str]] = None,
+        confirm_overwrite: bool = False,
+        array_headers: typing.Optional[typing.Sequence[typing.Dict[
+            str, result.ArrayHeader]]] = None) -> None:
+    """
+    Writes results_to_table(results, labels) in batches of rows, the arrays
+    of a batch are only accessed while it's written. Lazily loaded results
+    (file_interface.load_res_file(..., lazy=True)) thus don't keep their
+    arrays in memory.
+    :param path: .parquet file or Arrow IPC file (.arrow, .feather, .ipc)
+    :param results: evo.core.result.Result instances
+    :param labels: optional labels of the results, see results_to_table()
+    :param confirm_overwrite: whether to require user interaction
+           to overwrite existing files
+    :param array_headers: {name: (shape, dtype)} of the arrays of each
+                          result if known in advance, e.g. from
+                          file_interface.read_res_array_headers(), otherwise
+                          they are taken from the arrays
+    """
+    if confirm_overwrite and not user.check_and_confirm_overwrite(path):
+        return
+    pa = _import_pyarrow()
+    layout = _ResultsLayout(pa, results, labels, array_headers)
+    if str(path).lower().endswith(PARQUET_SUFFIXES):
+        import pyarrow.parquet
+        writer = pyarrow.parquet.ParquetWriter(path, layout.schema)
+    else:
+        import pyarrow.ipc
+        writer = pyarrow.ipc.new_file(path, layout.schema)
+    with writer:
+        start = 0
+        while start < len(results):
+            # Rows up to about BATCH_BYTES of array data, at least one.
+            stop = start + 1
+            num_bytes = _headers_nbytes(layout.array_headers[start])
+            while stop < len(results) and num_bytes < BATCH_BYTES:
+                num_bytes += _headers_nbytes(layout.array_headers[stop])
+                stop += 1
+            writer.write_batch(
+                layout.record_batch(pa, results[start:stop], start))
+            start = stop
+    logger.debug("Table with {} rows saved to: {}".format(len(results), path))
+    logger.info("Results saved to: " + path)
+
+
+def _headers_nbytes(headers: typing.Dict[str, result.ArrayHeader]) -> int:
+    return sum(
+        int(np.prod(shape)) * np.dtype(dtype).itemsize
+        for shape, dtype in headers.values())
+
+
+def read_results_file(path: str) -> typing.List[result.Result]:
+    """
+    :param path: .parquet file or Arrow IPC file (.arrow, .feather, .ipc)
+    :return: evo.core.result.Result instances, see table_to_results()
+    """
+    return table_to_results(read_table(path))
@@ -0,0 +1,198 @@
+# -*- coding: UTF8 -*-
+"""
+Binary cache of arrays parsed from trajectory files
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import typing
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    :param file_path: path of the file
+    :param block_size: number of bytes that are hashed at once
+    :return: hex digest of the file content
+    """
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileCache(object):
+    """
+    Stores arrays parsed from a source file as .npy files in a directory.
+    An entry is identified by the source path and the kind of parsed data
+    and is only valid while the size, mtime and content hash of the source
+    file are unchanged. The content is only hashed again if the mtime
+    changed, e.g. if the file was touched or copied without changes.
+    The least recently used entries are evicted if the total size exceeds
+    the limit.
+    """
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+
+    def _entry_paths(self, file_path: str,
+                     kind: str) -> typing.Tuple[str, str]:
+        key = hashlib.sha1("{}:{}".format(
+            kind, os.path.realpath(file_path)).encode()).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".npy", base + ".json"
+
+    @staticmethod
+    def _source_info(file_path: str) -> dict:
+        stat = os.stat(file_path)
+        return {
+            "path": os.path.realpath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+
+    def load(self, file_path: str, kind: str) -> typing.Optional[np.ndarray]:
+        """
+        :param file_path: path of the source file
+        :param kind: identifier of the parsed data, e.g. the file format
+        :return: read-only memory mapped array if there is a valid entry,
+                 otherwise None
+        """
+        npy_path, meta_path = self._entry_paths(file_path, kind)
+        if not os.path.isfile(meta_path):
+            return None
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+        source_info = self._source_info(file_path)
+        if meta.get("path") != source_info["path"] \
+                or meta.get("size") != source_info["size"]:
+            logger.debug("Outdated cache entry of " + file_path)
+            return None
+        if meta.get("mtime_ns") != source_info["mtime_ns"]:
+            # The stat triple is trusted if it matches, otherwise the
+            # content decides and the new mtime is stored if it's unchanged.
+            if meta.get("content_hash") != content_hash(file_path):
+                logger.debug("Outdated cache entry of " + file_path)
+                return None
+            meta.update(source_info)
+            self._write_atomic(meta_path,
+                               lambda f: f.write(json.dumps(meta).encode()))
+        array = np.load(npy_path, mmap_mode='r')
+        # Mark the entry as recently used for the LRU eviction.
+        os.utime(meta_path)
+        logger.debug("Loaded {} from cache entry {}".format(
+            file_path, npy_path))
+        return array
+
+    def store(self, file_path: str, kind: str, array: np.ndarray) -> None:
+        """
+        Stores the array parsed from the source file and evicts old entries.
+        :param file_path: path of the source file
+        :param kind: identifier of the parsed data, e.g. the file format
+        :param array: the parsed array
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        npy_path, meta_path = self._entry_paths(file_path, kind)
+        meta = self._source_info(file_path)
+        meta["content_hash"] = content_hash(file_path)
+        meta["kind"] = kind
+        self._write_atomic(npy_path, lambda f: np.save(f, array))
+        self._write_atomic(meta_path,
+                           lambda f: f.write(json.dumps(meta).encode()))
+        self.evict()
+
+    def _write_atomic(self, path: str,
+                      write: typing.Callable[[typing.BinaryIO], typing.Any]
+                      ) -> None:
+        # Write to a temporary file first, other processes might read the
+        # same entry at the same time.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def entries(self) -> typing.List[typing.Tuple[str, str]]:
+        """
+        :return: (npy_path, meta_path) of all entries, least recently used
+                 entries first
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        meta_paths = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir) if name.endswith(".json")
+        ]
+        meta_paths.sort(key=os.path.getmtime)
+        return [(p[:-len(".json")] + ".npy", p) for p in meta_paths]
+
+    def size_bytes(self) -> int:
+        """
+        :return: total size of all entries
+        """
+        return sum(
+            os.path.getsize(p) for entry in self.entries() for p in entry
+            if os.path.isfile(p))
+
+    def evict(self) -> None:
+        """
+        Removes least recently used entries until the total size is below
+        the maximum size.
+        """
+        entries = self.entries()
+        sizes = [
+            sum(os.path.getsize(p) for p in entry if os.path.isfile(p))
+            for entry in entries
+        ]
+        total = sum(sizes)
+        for entry, size in zip(entries, sizes):
+            if total <= self.max_size_bytes:
+                break
+            logger.debug("Evicting cache entry " + entry[0])
+            self._remove_entry(entry)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        for entry in self.entries():
+            self._remove_entry(entry)
+
+    @staticmethod
+    def _remove_entry(entry: typing.Tuple[str, str]) -> None:
+        # Metadata first, an entry without it is invalid.
+        for path in reversed(entry):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # E.g. on Windows if the file is still memory mapped.
+                logger.debug("Failed to remove {}: {}".format(path, e))
@@ -20,11 +20,16 @@ along with evo.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import binascii
+import collections.abc
 import csv
+import functools
 import io
+import itertools
 import json
 import logging
 import os
+import struct
+import time
 import typing
 import zipfile
 
@@ -40,9 +45,27 @@ import evo.core.transformations as tr
 from evo.core import result
 from evo.core.trajectory import PosePath3D, PoseTrajectory3D
 from evo.tools import user, tf_id
+from evo.tools.file_cache import FileCache
 
 logger = logging.getLogger(__name__)
 
+# Version 1: trajectories as TUM / KITTI text.
+# Version 2: trajectories as binary arrays (see write_binary_trajectory_file)
+#            and uncompressed, aligned arrays that can be memory mapped.
+#            Older evo versions don't load the trajectories of version 2.
+# Both can be read, the saved version is the save_res_format_version setting.
+RESULT_FORMAT_VERSION = 2
+# Header ID of the zip extra field used for padding, same as zipalign.
+ZIP_ALIGNMENT_EXTRA_ID = 0xD935
+ZIP_ALIGNMENT = 64
+ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+TUM_FORMAT_ERROR = ("TUM trajectory files must have 8 entries per row "
+                    "and no trailing delimiter at the end of the rows (space)")
+EUROC_FORMAT_ERROR = (
+    "EuRoC format ground truth must have at least 8 entries per row "
+    "and no trailing delimiter at the end of the rows (comma)")
+
 SUPPORTED_ROS_MSGS = {
     "geometry_msgs/msg/PoseStamped",
     "geometry_msgs/msg/PoseWithCovarianceStamped",
@@ -94,29 +117,153 @@ def csv_read_matrix(file_path, delim=',', comment_str="#"):
     return mat
 
 
-def read_tum_trajectory_file(file_path) -> PoseTrajectory3D:
+def _iter_float_lines(lines, delim: str, comment_str: str,
+                      chunk_size: int) -> typing.Iterator[np.ndarray]:
+    lines = (line for line in lines if not line.startswith(comment_str))
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        # Parsed by numpy's C reader, strict w.r.t. empty fields and the
+        # number of columns (e.g. trailing delimiters raise a ValueError).
+        yield np.loadtxt(chunk, dtype=float, delimiter=delim, comments=None,
+                         ndmin=2)
+
+
+def csv_iter_float_matrix(file_path, delim=',', comment_str="#",
+                          chunk_size=100000) -> typing.Iterator[np.ndarray]:
     """
-    parses trajectory file in TUM format (timestamp tx ty tz qx qy qz qw)
-    :param file_path: the trajectory file path (or file handle)
-    :return: trajectory.PoseTrajectory3D object
+    generator version of csv_read_float_matrix that yields the matrix in
+    chunks of rows, e.g. for files that don't fit into memory
+    :param file_path: path of csv file (or file handle)
+    :param delim: delimiter character
+    :param comment_str: string indicating a comment line to ignore
+    :param chunk_size: max. number of rows per chunk
+    :return: generator of 2D float64 arrays, ValueError for non-numeric
+             entries or rows with a different number of entries in a chunk
     """
-    raw_mat = csv_read_matrix(file_path, delim=" ", comment_str="#")
-    error_msg = ("TUM trajectory files must have 8 entries per row "
-                 "and no trailing delimiter at the end of the rows (space)")
-    if not raw_mat or (len(raw_mat) > 0 and len(raw_mat[0]) != 8):
-        raise FileInterfaceException(error_msg)
+    if hasattr(file_path, 'read'):  # if file handle
+        yield from _iter_float_lines(file_path, delim, comment_str,
+                                     chunk_size)
+        return
+    if not os.path.isfile(file_path):
+        raise FileInterfaceException("csv file " + str(file_path) +
+                                     " does not exist")
+    skip_3_bytes = has_utf8_bom(file_path)
+    with open(file_path) as f:
+        if skip_3_bytes:
+            f.seek(3)
+        yield from _iter_float_lines(f, delim, comment_str, chunk_size)
+
+
+def csv_read_float_matrix(file_path, delim=',', comment_str="#",
+                          chunk_size=100000) -> np.ndarray:
+    """
+    directly parse a csv-like file with numeric entries into a float matrix,
+    without the intermediate string lists of csv_read_matrix
+    :param file_path: path of csv file (or file handle)
+    :param delim: delimiter character
+    :param comment_str: string indicating a comment line to ignore
+    :param chunk_size: number of lines that are parsed at once
+    :return: 2D float64 array, ValueError for non-numeric entries or rows
+             with a different number of entries
+    """
+    chunks = list(
+        csv_iter_float_matrix(file_path, delim, comment_str, chunk_size))
+    if not chunks:
+        return np.empty((0, 0))
+    # ValueError if the number of columns differs between the chunks.
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def _file_cache() -> typing.Optional[FileCache]:
+    from evo.tools.settings import SETTINGS
+    if not SETTINGS.file_cache_enabled:
+        return None
+    return FileCache(os.path.expanduser(SETTINGS.file_cache_dir),
+                     int(SETTINGS.file_cache_max_size * 1024**2))
+
+
+def _read_cached(file_path, kind: str,
+                 parse: typing.Callable[[typing.Any], np.ndarray]
+                 ) -> np.ndarray:
+    """
+    Uses the file cache for parsing the file if it's enabled in the settings.
+    :param file_path: path of the file (or file handle, not cached)
+    :param kind: identifier of the parsed data, e.g. the file format
+    :param parse: function that parses the file into an array
+    :return: the parsed array, memory mapped if it was loaded from the cache
+    """
+    if hasattr(file_path, 'read') or not os.path.isfile(file_path):
+        return parse(file_path)
+    cache = _file_cache()
+    if cache is None:
+        return parse(file_path)
+    try:
+        array = cache.load(file_path, kind)
+        if array is not None:
+            return array
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring invalid cache entry of {}: {}".format(
+            file_path, e))
+    array = parse(file_path)
+    try:
+        cache.store(file_path, kind, array)
+    except OSError as e:
+        logger.warning("Failed to cache {}: {}".format(file_path, e))
+    return array
+
+
+def _parse_tum_matrix(file_path) -> np.ndarray:
     try:
-        mat = np.array(raw_mat).astype(float)
+        mat = csv_read_float_matrix(file_path, delim=" ", comment_str="#")
     except ValueError:
-        raise FileInterfaceException(error_msg)
+        raise FileInterfaceException(TUM_FORMAT_ERROR)
+    if mat.shape[0] == 0 or mat.shape[1] != 8:
+        raise FileInterfaceException(TUM_FORMAT_ERROR)
+    return mat
+
+
+def _tum_matrix_to_trajectory(mat: np.ndarray) -> PoseTrajectory3D:
     stamps = mat[:, 0]  # n x 1
     xyz = mat[:, 1:4]  # n x 3
     quat = mat[:, 4:]  # n x 4
     quat = np.roll(quat, 1, axis=1)  # shift 1 column -> w in front column
+    return PoseTrajectory3D(xyz, quat, stamps)
+
+
+def read_tum_trajectory_file(file_path) -> PoseTrajectory3D:
+    """
+    parses trajectory file in TUM format (timestamp tx ty tz qx qy qz qw)
+    :param file_path: the trajectory file path (or file handle)
+    :return: trajectory.PoseTrajectory3D object
+    """
+    mat = _read_cached(file_path, "tum", _parse_tum_matrix)
     if not hasattr(file_path, 'read'):  # if not file handle
         logger.debug("Loaded {} stamps and poses from: {}".format(
-            len(stamps), file_path))
-    return PoseTrajectory3D(xyz, quat, stamps)
+            len(mat), file_path))
+    return _tum_matrix_to_trajectory(mat)
+
+
+def iter_tum_trajectory_file(
+        file_path,
+        chunk_size: int = 100000) -> typing.Iterator[PoseTrajectory3D]:
+    """
+    parses trajectory file in TUM format in chunks of poses, e.g. for
+    trajectories that don't fit into memory
+    :param file_path: the trajectory file path (or file handle)
+    :param chunk_size: max. number of poses per chunk
+    :return: generator of trajectory.PoseTrajectory3D objects
+    """
+    try:
+        for mat in csv_iter_float_matrix(file_path, delim=" ",
+                                         comment_str="#",
+                                         chunk_size=chunk_size):
+            if mat.shape[1] != 8:
+                raise FileInterfaceException(TUM_FORMAT_ERROR)
+            yield _tum_matrix_to_trajectory(mat)
+    except ValueError:
+        raise FileInterfaceException(TUM_FORMAT_ERROR)
 
 
 def write_tum_trajectory_file(file_path, traj: PoseTrajectory3D,
@@ -143,27 +290,27 @@ def write_tum_trajectory_file(file_path, traj: PoseTrajectory3D,
         logger.info("Trajectory saved to: " + file_path)
 
 
+def _parse_kitti_poses(file_path) -> np.ndarray:
+    error_msg = ("KITTI pose files must have 12 entries per row "
+                 "and no trailing delimiter at the end of the rows (space)")
+    try:
+        mat = csv_read_float_matrix(file_path, delim=" ", comment_str="#")
+    except ValueError:
+        raise FileInterfaceException(error_msg)
+    if mat.shape[0] == 0 or mat.shape[1] != 12:
+        raise FileInterfaceException(error_msg)
+    # Append the homogeneous row [0, 0, 0, 1] to each pose.
+    return np.hstack((mat, np.tile([0., 0., 0., 1.], (len(mat), 1)))).reshape(
+        (-1, 4, 4))
+
+
 def read_kitti_poses_file(file_path) -> PosePath3D:
     """
     parses pose file in KITTI format (first 3 rows of SE(3) matrix per line)
     :param file_path: the trajectory file path (or file handle)
     :return: trajectory.PosePath3D
     """
-    raw_mat = csv_read_matrix(file_path, delim=" ", comment_str="#")
-    error_msg = ("KITTI pose files must have 12 entries per row "
-                 "and no trailing delimiter at the end of the rows (space)")
-    if not raw_mat or (len(raw_mat) > 0 and len(raw_mat[0]) != 12):
-        raise FileInterfaceException(error_msg)
-    try:
-        mat = np.array(raw_mat).astype(float)
-    except ValueError:
-        raise FileInterfaceException(error_msg)
-    # yapf: disable
-    poses = [np.array([[r[0], r[1], r[2], r[3]],
-                       [r[4], r[5], r[6], r[7]],
-                       [r[8], r[9], r[10], r[11]],
-                       [0, 0, 0, 1]]) for r in mat]
-    # yapf: enable
+    poses = _read_cached(file_path, "kitti", _parse_kitti_poses)
     if not hasattr(file_path, 'read'):  # if not file handle
         logger.debug("Loaded {} poses from: {}".format(len(poses), file_path))
     return PosePath3D(poses_se3=poses)
@@ -181,34 +328,122 @@ def write_kitti_poses_file(file_path, traj: PosePath3D,
         if not user.check_and_confirm_overwrite(file_path):
             return
     # first 3 rows  of SE(3) matrix flattened
-    poses_flat = [p.flatten()[:-4] for p in traj.poses_se3]
+    poses_flat = traj.poses_se3[:, :3, :].reshape((-1, 12))
     np.savetxt(file_path, poses_flat, delimiter=' ')
     if isinstance(file_path, str):
         logger.info("Poses saved to: " + file_path)
 
 
+def _parse_euroc_matrix(file_path) -> np.ndarray:
+    try:
+        mat = csv_read_float_matrix(file_path, delim=",", comment_str="#")
+    except ValueError:
+        raise FileInterfaceException(EUROC_FORMAT_ERROR)
+    if mat.shape[0] == 0 or mat.shape[1] < 8:
+        raise FileInterfaceException(EUROC_FORMAT_ERROR)
+    # Only stamps and poses are used, the remaining states are dropped.
+    return np.ascontiguousarray(mat[:, :8])
+
+
+def _euroc_matrix_to_trajectory(mat: np.ndarray) -> PoseTrajectory3D:
+    stamps = np.divide(mat[:, 0], 1e9)  # n x 1  -  nanoseconds to seconds
+    xyz = mat[:, 1:4]  # n x 3
+    quat = mat[:, 4:8]  # n x 4
+    return PoseTrajectory3D(xyz, quat, stamps)
+
+
 def read_euroc_csv_trajectory(file_path) -> PoseTrajectory3D:
     """
     parses ground truth trajectory from EuRoC MAV state estimate .csv
     :param file_path: <sequence>/mav0/state_groundtruth_estimate0/data.csv
     :return: trajectory.PoseTrajectory3D object
     """
-    raw_mat = csv_read_matrix(file_path, delim=",", comment_str="#")
-    error_msg = (
-        "EuRoC format ground truth must have at least 8 entries per row "
-        "and no trailing delimiter at the end of the rows (comma)")
-    if not raw_mat or (len(raw_mat) > 0 and len(raw_mat[0]) < 8):
-        raise FileInterfaceException(error_msg)
+    mat = _read_cached(file_path, "euroc", _parse_euroc_matrix)
+    logger.debug("Loaded {} stamps and poses from: {}".format(
+        len(mat), file_path))
+    return _euroc_matrix_to_trajectory(mat)
+
+
+def iter_euroc_csv_trajectory(
+        file_path,
+        chunk_size: int = 100000) -> typing.Iterator[PoseTrajectory3D]:
+    """
+    parses ground truth trajectory from EuRoC MAV state estimate .csv in
+    chunks of poses, e.g. for trajectories that don't fit into memory
+    :param file_path: <sequence>/mav0/state_groundtruth_estimate0/data.csv
+    :param chunk_size: max. number of poses per chunk
+    :return: generator of trajectory.PoseTrajectory3D objects
+    """
     try:
-        mat = np.array(raw_mat).astype(float)
+        for mat in csv_iter_float_matrix(file_path, delim=",",
+                                         comment_str="#",
+                                         chunk_size=chunk_size):
+            if mat.shape[1] < 8:
+                raise FileInterfaceException(EUROC_FORMAT_ERROR)
+            yield _euroc_matrix_to_trajectory(mat)
     except ValueError:
-        raise FileInterfaceException(error_msg)
-    stamps = np.divide(mat[:, 0], 1e9)  # n x 1  -  nanoseconds to seconds
-    xyz = mat[:, 1:4]  # n x 3
-    quat = mat[:, 4:8]  # n x 4
-    logger.debug("Loaded {} stamps and poses from: {}".format(
-        len(stamps), file_path))
-    return PoseTrajectory3D(xyz, quat, stamps)
+        raise FileInterfaceException(EUROC_FORMAT_ERROR)
+
+
+def _trajectory_columns(traj: PosePath3D) -> typing.List[np.ndarray]:
+    columns = [traj.positions_xyz, traj.orientations_quat_wxyz]
+    if isinstance(traj, PoseTrajectory3D):
+        columns.insert(0, traj.timestamps[:, np.newaxis])
+    return columns
+
+
+def _matrix_to_trajectory(mat: np.ndarray) -> PosePath3D:
+    if mat.ndim != 2 or mat.shape[1] not in (7, 8) or mat.shape[0] == 0:
+        raise FileInterfaceException(
+            "evo binary trajectory files must contain a non-empty array "
+            "with 7 or 8 columns, got shape {}".format(mat.shape))
+    if mat.shape[1] == 7:
+        return PosePath3D(mat[:, :3], mat[:, 3:])
+    return PoseTrajectory3D(mat[:, 1:4], mat[:, 4:], mat[:, 0])
+
+
+def write_binary_trajectory_file(file_path: str, traj: PosePath3D,
+                                 chunk_size: int = 1 << 20) -> None:
+    """
+    Writes a trajectory in the native evo binary format: a .npy float64
+    array with the rows (timestamp) x y z qw qx qy qz, i.e. 8 columns for
+    trajectories with timestamps and 7 columns for paths.
+    :param file_path: desired .npy file for the trajectory
+    :param traj: trajectory.PosePath3D or trajectory.PoseTrajectory3D
+    :param chunk_size: number of poses that are written at once
+    """
+    columns = _trajectory_columns(traj)
+    mat = np.lib.format.open_memmap(
+        file_path, mode="w+", dtype=np.float64,
+        shape=(traj.num_poses, sum(c.shape[1] for c in columns)))
+    for i in range(0, traj.num_poses, chunk_size):
+        mat[i:i + chunk_size] = np.hstack(
+            [c[i:i + chunk_size] for c in columns])
+    mat.flush()
+    del mat
+    logger.info("Trajectory saved to: " + file_path)
+
+
+def read_binary_trajectory_file(file_path: str,
+                                mmap: bool = True) -> PosePath3D:
+    """
+    Reads a trajectory in the native evo binary format,
+    see write_binary_trajectory_file().
+    :param file_path: the .npy trajectory file
+    :param mmap: use read-only memory mapped arrays instead of loading the
+                 file, e.g. for trajectories that don't fit into memory
+    :return: trajectory.PoseTrajectory3D with 8 columns in the file,
+             trajectory.PosePath3D with 7 columns
+    """
+    if not os.path.isfile(file_path):
+        raise FileInterfaceException("file doesn't exist: " + file_path)
+    try:
+        mat = np.load(file_path, mmap_mode='r' if mmap else None)
+    except ValueError as e:
+        raise FileInterfaceException("not a .npy file: {}".format(e))
+    traj = _matrix_to_trajectory(mat)
+    logger.debug("Loaded {} poses from: {}".format(len(mat), file_path))
+    return traj
 
 
 def _get_xyz_quat_from_transform_stamped(
@@ -369,15 +604,108 @@ def _get_xyz_quat_from_pose_or_odometry_msg(
 #     logger.info("Saved geometry_msgs/PoseStamped topic: " + topic_name)
 
 
+class LazyDict(collections.abc.MutableMapping):
+    """
+    dict whose values are loaded on first access, e.g. the arrays and
+    trajectories of a lazily loaded result file
+    """
+    _NOT_LOADED = object()
+
+    def __init__(self, loaders: typing.Dict[str, typing.Callable]):
+        """
+        :param loaders: {key: function without arguments returning the value}
+        """
+        self._loaders = dict(loaders)
+        self._data = {key: self._NOT_LOADED for key in loaders}
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if value is self._NOT_LOADED:
+            value = self._loaders.pop(key)()
+            self._data[key] = value
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        self._loaders.pop(key, None)
+        self._data[key] = value
+
+    def __delitem__(self, key) -> None:
+        self._loaders.pop(key, None)
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __contains__(self, key) -> bool:
+        # Without loading the value, unlike the Mapping default.
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return "{}({})".format(self.__class__.__name__, list(self._data))
+
+    def is_loaded(self, key) -> bool:
+        return self._data[key] is not self._NOT_LOADED
+
+    def get_uncached(self, key):
+        """
+        :return: the value, which is not kept if it wasn't loaded before,
+                 e.g. to process many lazy results one at a time
+        """
+        value = self._data[key]
+        return self._loaders[key]() if value is self._NOT_LOADED else value
+
+
+def _write_aligned_zip_member(archive: zipfile.ZipFile, name: str,
+                              data: bytes) -> None:
+    # Pad the extra field of the local header so that the member data
+    # starts at a multiple of ZIP_ALIGNMENT. Together with the padded .npy
+    # header, the array data is then aligned for memory mapping.
+    if archive.fp is None:
+        raise FileInterfaceException("can't write to a closed zip archive")
+    zinfo = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+    zinfo.compress_type = zipfile.ZIP_STORED
+    zinfo.external_attr = 0o600 << 16
+    # The header size is measured with an empty padding field, the same way
+    # zipfile writes the header (incl. a zip64 field for large members).
+    # The sizes and CRC don't change its size, writestr() sets them.
+    zinfo.CRC = 0
+    zinfo.file_size = zinfo.compress_size = len(data)
+    zinfo.extra = struct.pack("<HH", ZIP_ALIGNMENT_EXTRA_ID, 0)
+    zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    header_size = len(zinfo.FileHeader(zip64))
+    padding = -(archive.fp.tell() + header_size) % ZIP_ALIGNMENT
+    zinfo.extra = struct.pack("<HH", ZIP_ALIGNMENT_EXTRA_ID,
+                              padding) + bytes(padding)
+    archive.writestr(zinfo, data)
+
+
+def _npy_bytes(array: np.ndarray) -> bytes:
+    with io.BytesIO() as array_buffer:
+        np.save(array_buffer, array)
+        return array_buffer.getvalue()
+
+
 def save_res_file(zip_path, result_obj: result.Result,
-                  confirm_overwrite: bool = False) -> None:
+                  confirm_overwrite: bool = False,
+                  format_version: typing.Optional[int] = None) -> None:
     """
     save results to a zip file that can be deserialized with load_res_file()
     :param zip_path: path to zip file (or file handle)
     :param result_obj: evo.core.result.Result instance
     :param confirm_overwrite: whether to require user interaction
            to overwrite existing files
+    :param format_version: 1 or 2, see RESULT_FORMAT_VERSION
+                           (default: save_res_format_version setting)
     """
+    if format_version is None:
+        from evo.tools.settings import SETTINGS
+        format_version = SETTINGS.save_res_format_version
+    if format_version not in (1, 2):
+        raise FileInterfaceException(
+            "unsupported result format version {}".format(format_version))
     if isinstance(zip_path, str):
         logger.debug("Saving results to " + zip_path + "...")
     if confirm_overwrite and not user.check_and_confirm_overwrite(zip_path):
@@ -385,12 +713,22 @@ def save_res_file(zip_path, result_obj: result.Result,
     with zipfile.ZipFile(zip_path, 'w') as archive:
         archive.writestr("info.json", json.dumps(result_obj.info))
         archive.writestr("stats.json", json.dumps(result_obj.stats))
+        if format_version == 2:
+            archive.writestr("format.json",
+                             json.dumps({"version": format_version}))
+            for name, array in result_obj.np_arrays.items():
+                _write_aligned_zip_member(archive, "{}.npy".format(name),
+                                          _npy_bytes(array))
+            for name, traj in result_obj.trajectories.items():
+                if not isinstance(traj, PosePath3D):
+                    raise FileInterfaceException(
+                        "unknown format of trajectory {}".format(name))
+                _write_aligned_zip_member(
+                    archive, "{}.traj".format(name),
+                    _npy_bytes(np.hstack(_trajectory_columns(traj))))
+            return
         for name, array in result_obj.np_arrays.items():
-            array_buffer = io.BytesIO()
-            np.save(array_buffer, array)
-            array_buffer.seek(0)
-            archive.writestr("{}.npy".format(name), array_buffer.read())
-            array_buffer.close()
+            archive.writestr("{}.npy".format(name), _npy_bytes(array))
         for name, traj in result_obj.trajectories.items():
             traj_buffer = io.StringIO()
             if isinstance(traj, PoseTrajectory3D):
@@ -408,11 +746,85 @@ def save_res_file(zip_path, result_obj: result.Result,
             traj_buffer.close()
 
 
-def load_res_file(zip_path, load_trajectories: bool = False) -> result.Result:
+def _read_npy_header(
+        f: typing.IO[bytes]) -> typing.Optional[typing.Tuple[tuple, bool,
+                                                              np.dtype]]:
+    # (shape, fortran_order, dtype) of the .npy data at the position of f,
+    # None if it's not a supported .npy file.
+    try:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            return np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            return np.lib.format.read_array_header_2_0(f)
+    except ValueError:
+        pass
+    return None
+
+
+def _memmap_zip_member(zip_path: str,
+                       zinfo: zipfile.ZipInfo) -> typing.Optional[np.ndarray]:
+    # Only possible for uncompressed .npy members, None otherwise.
+    if zinfo.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(zip_path, 'rb') as f:
+        f.seek(zinfo.header_offset)
+        local_header = f.read(30)
+        if local_header[:4] != ZIP_LOCAL_HEADER_SIGNATURE:
+            return None
+        name_length, extra_length = struct.unpack("<HH", local_header[26:])
+        f.seek(zinfo.header_offset + 30 + name_length + extra_length)
+        header = _read_npy_header(f)
+        if header is None:
+            return None
+        shape, fortran_order, dtype = header
+        offset = f.tell()
+    if dtype.hasobject or int(np.prod(shape)) == 0:
+        return None
+    return np.memmap(zip_path, dtype=dtype, mode='r', offset=offset,
+                     shape=shape, order='F' if fortran_order else 'C')
+
+
+def _read_res_member(archive: zipfile.ZipFile, filename: str,
+                     mmap_path: typing.Optional[str] = None):
+    if filename.endswith((".tum", ".kitti")):
+        with io.TextIOWrapper(archive.open(filename,
+                                           mode='r')) as traj_buffer:
+            if filename.endswith(".tum"):
+                return read_tum_trajectory_file(traj_buffer)
+            return read_kitti_poses_file(traj_buffer)
+    array = None
+    if mmap_path is not None:
+        array = _memmap_zip_member(mmap_path, archive.getinfo(filename))
+    if array is None:
+        # Compatibility: previous evo versions wrote .npz, although it was
+        # .npy. In any case, np.load() supports both file formats.
+        with io.BytesIO(archive.read(filename)) as array_buffer:
+            array = np.load(array_buffer)
+    if filename.endswith(".traj"):
+        return _matrix_to_trajectory(array)
+    return array
+
+
+def _load_res_member(zip_path, filename: str):
+    # Loads a member of a lazily loaded result file, memory mapped if
+    # zip_path is a path.
+    with zipfile.ZipFile(zip_path, mode='r') as archive:
+        return _read_res_member(
+            archive, filename,
+            mmap_path=zip_path if isinstance(zip_path, str) else None)
+
+
+def load_res_file(zip_path, load_trajectories: bool = False,
+                  load_arrays: bool = True,
+                  lazy: bool = False) -> result.Result:
     """
     load contents of a result .zip file saved with save_res_file(...)
     :param zip_path: path to zip file
     :param load_trajectories: set to True to load also the (backup) trajectories
+    :param load_arrays: set to False to load only the info and stats
+    :param lazy: set to True to load arrays and trajectories only when they
+                 are accessed (see LazyDict), memory mapped if possible
     :return: evo.core.result.Result instance
     """
     logger.debug("Loading result from {} ...".format(zip_path))
@@ -426,32 +838,79 @@ def load_res_file(zip_path, load_trajectories: bool = False) -> result.Result:
         result_obj.stats = json.loads(
             archive.read("stats.json").decode("utf-8"))
 
-        # Compatibility: previous evo versions wrote .npz, although it was .npy
-        # In any case, np.load() supports both file formats.
-        np_files = [f for f in file_list if f.endswith((".npy", ".npz"))]
-        for filename in np_files:
-            with io.BytesIO(archive.read(filename)) as array_buffer:
-                array = np.load(array_buffer)
-                name = os.path.splitext(os.path.basename(filename))[0]
-                result_obj.add_np_array(name, array)
+        members: typing.Dict[str, typing.Tuple[str, ...]] = {}
+        if load_arrays:
+            members["np_arrays"] = (".npy", ".npz")
         if load_trajectories:
-            tum_files = [f for f in file_list if f.endswith(".tum")]
-            for filename in tum_files:
-                with io.TextIOWrapper(archive.open(filename,
-                                                   mode='r')) as traj_buffer:
-                    traj = read_tum_trajectory_file(traj_buffer)
-                    name = os.path.splitext(os.path.basename(filename))[0]
-                    result_obj.add_trajectory(name, traj)
-            kitti_files = [f for f in file_list if f.endswith(".kitti")]
-            for filename in kitti_files:
-                with io.TextIOWrapper(archive.open(filename,
-                                                   mode='r')) as path_buffer:
-                    path = read_kitti_poses_file(path_buffer)
-                    name = os.path.splitext(os.path.basename(filename))[0]
-                    result_obj.add_trajectory(name, path)
+            members["trajectories"] = (".traj", ".tum", ".kitti")
+        for attribute, suffixes in members.items():
+            filenames = {
+                os.path.splitext(os.path.basename(filename))[0]: filename
+                for filename in file_list if filename.endswith(suffixes)
+            }
+            if not lazy:
+                setattr(result_obj, attribute, {
+                    name: _read_res_member(archive, filename)
+                    for name, filename in filenames.items()
+                })
+                continue
+            path = os.path.abspath(zip_path) if isinstance(
+                zip_path, str) else zip_path
+            setattr(
+                result_obj, attribute,
+                LazyDict({
+                    name: functools.partial(_load_res_member, path, filename)
+                    for name, filename in filenames.items()
+                }))
     return result_obj
 
 
+def read_res_array_headers(
+        zip_path) -> typing.Dict[str, result.ArrayHeader]:
+    """
+    reads only the shapes and dtypes of the arrays of a result .zip file
+    :param zip_path: path to zip file
+    :return: {name: (shape, dtype)}
+    """
+    headers = {}
+    with zipfile.ZipFile(zip_path, mode='r') as archive:
+        for filename in archive.namelist():
+            if not filename.endswith((".npy", ".npz")):
+                continue
+            with archive.open(filename) as member:
+                header = _read_npy_header(member)
+            if header is None:
+                array = _read_res_member(archive, filename)
+                header = (array.shape, False, array.dtype)
+            name = os.path.splitext(os.path.basename(filename))[0]
+            headers[name] = (header[0], header[2])
+    return headers
+
+
+def merge_res_files(result_files: typing.Sequence[str],
+                    load_arrays: bool = True) -> result.Result:
+    """
+    merges result .zip files with result.ResultMerger, loading only one
+    result at a time into memory
+    :param result_files: paths to the zip files
+    :param load_arrays: set to False to merge only the info and stats
+    :return: the merged evo.core.result.Result instance
+    """
+    array_headers: typing.Optional[typing.Dict[
+        str, typing.List[result.ArrayHeader]]] = None
+    if load_arrays and len(result_files) > 1:
+        # First pass: the shapes determine the merge strategy and the size
+        # of the merged arrays.
+        array_headers = {}
+        for result_file in result_files:
+            for name, header in read_res_array_headers(result_file).items():
+                array_headers.setdefault(name, []).append(header)
+    merger = result.ResultMerger(array_headers)
+    for result_file in result_files:
+        merger.add(load_res_file(result_file, load_arrays=load_arrays))
+    return merger.get_result()
+
+
 def load_transform_json(json_path) -> np.ndarray:
     """
     load a transformation stored in xyz + quaternion format in a .json file
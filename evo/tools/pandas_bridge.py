@@ -19,6 +19,8 @@ You should have received a copy of the GNU General Public License
 along with evo.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import concurrent.futures
+import itertools
 import logging
 import os
 import typing
@@ -27,11 +29,15 @@ import numpy as np
 import pandas as pd
 
 from evo.core import trajectory, result
-from evo.tools import file_interface, user
+from evo.tools import arrow_bridge, file_interface, user
 from evo.tools.settings import SETTINGS
 
 logger = logging.getLogger(__name__)
 
+# Below this number of files, starting worker processes takes longer than
+# loading the files.
+MIN_FILES_FOR_PARALLEL_LOADING = 32
+
 
 def trajectory_to_df(traj: trajectory.PosePath3D) -> pd.DataFrame:
     if not isinstance(traj, trajectory.PosePath3D):
@@ -71,7 +77,8 @@ def trajectories_stats_to_df(
 
 
 def result_to_df(result_obj: result.Result,
-                 label: typing.Optional[str] = None) -> pd.DataFrame:
+                 label: typing.Optional[str] = None,
+                 include_arrays: bool = True) -> pd.DataFrame:
     if not isinstance(result_obj, result.Result):
         raise TypeError("result.Result or derived required")
     data = {
@@ -80,7 +87,9 @@ def result_to_df(result_obj: result.Result,
         "np_arrays": {},
         "trajectories": {}
     }
-    for name, array in result_obj.np_arrays.items():
+    # Lazily loaded arrays are only loaded if included.
+    for name, array in (result_obj.np_arrays.items()
+                        if include_arrays else []):
         data["np_arrays"][name] = array
     if label is None and "est_name" in data["info"]:
         label = os.path.basename(data["info"]["est_name"])
@@ -100,7 +109,9 @@ def save_df_as_table(df: pd.DataFrame, path: str,
         return
     if transpose:
         df = df.T
-    if format_str == "excel":
+    if arrow_bridge.is_arrow_path(path):
+        arrow_bridge.write_table(arrow_bridge.df_to_table(df), path)
+    elif format_str == "excel":
         # requires xlwt and/or openpyxl to be installed
         with pd.ExcelWriter(path) as writer:
             df.to_excel(writer)
@@ -109,23 +120,47 @@ def save_df_as_table(df: pd.DataFrame, path: str,
     logger.debug("{} table saved to: {}".format(format_str, path))
 
 
+def _load_result_df(result_file: str, use_filenames: bool,
+                    load_arrays: bool) -> pd.DataFrame:
+    result_obj = file_interface.load_res_file(result_file,
+                                              load_arrays=load_arrays)
+    return result_to_df(result_obj, result_file if use_filenames else None)
+
+
 def load_results_as_dataframe(result_files: typing.Iterable[str],
                               use_filenames: bool = False,
-                              merge: bool = False) -> pd.DataFrame:
+                              merge: bool = False, load_arrays: bool = True,
+                              workers: typing.Optional[int] = None
+                              ) -> pd.DataFrame:
     """
     Load multiple result files into a MultiIndex dataframe.
     :param result_files: result files to load
     :param use_filenames: use the result filename as label instead of
                           the 'est_name' label from the result's info
     :param merge: merge all results into an average result
+    :param load_arrays: set to False to load only info and stats, i.e. the
+                        dataframe has no "np_arrays" rows
+    :param workers: max. number of processes loading files in parallel
+                    (default: chosen by concurrent.futures), 1 to disable
     """
     if merge:
-        results = [file_interface.load_res_file(f) for f in result_files]
-        return result_to_df(result.merge_results(results))
-
-    df = pd.DataFrame()
-    for result_file in result_files:
-        result_obj = file_interface.load_res_file(result_file)
-        name = result_file if use_filenames else None
-        df = pd.concat([df, result_to_df(result_obj, name)], axis="columns")
-    return df
+        return result_to_df(
+            file_interface.merge_res_files(list(result_files), load_arrays))
+
+    result_files = list(result_files)
+    load_args = (itertools.repeat(use_filenames),
+                 itertools.repeat(load_arrays))
+    if workers == 1 or len(result_files) < MIN_FILES_FOR_PARALLEL_LOADING:
+        dfs = list(map(_load_result_df, result_files, *load_args))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            # Chunks reduce the inter-process communication overhead.
+            chunksize = max(1, len(result_files) //
+                            (4 * (workers or os.cpu_count() or 1)))
+            dfs = list(
+                executor.map(_load_result_df, result_files, *load_args,
+                             chunksize=chunksize))
+    if not dfs:
+        return pd.DataFrame()
+    # A single concat, repeated concats would copy the frame every time.
+    return pd.concat(dfs, axis="columns")
@@ -444,17 +444,16 @@ def draw_coordinate_axes(ax: plt.Figure, traj: trajectory.PosePath3D,
     if marker_scale <= 0:
         return
 
-    unit_x = np.array([1 * marker_scale, 0, 0, 1])
-    unit_y = np.array([0, 1 * marker_scale, 0, 1])
-    unit_z = np.array([0, 0, 1 * marker_scale, 1])
-
     # Transform start/end vertices of each axis to global frame.
-    x_vertices = np.array([[p[:3, 3], p.dot(unit_x)[:3]]
-                           for p in traj.poses_se3])
-    y_vertices = np.array([[p[:3, 3], p.dot(unit_y)[:3]]
-                           for p in traj.poses_se3])
-    z_vertices = np.array([[p[:3, 3], p.dot(unit_z)[:3]]
-                           for p in traj.poses_se3])
+    # For a pose p, p * (scale * unit_axis) is origin + scale * column(axis).
+    poses = traj.poses_se3
+    origins = poses[:, :3, 3]
+    x_vertices = np.stack((origins, origins + marker_scale * poses[:, :3, 0]),
+                          axis=1)
+    y_vertices = np.stack((origins, origins + marker_scale * poses[:, :3, 1]),
+                          axis=1)
+    z_vertices = np.stack((origins, origins + marker_scale * poses[:, :3, 2]),
+                          axis=1)
 
     n = traj.num_poses
     # Concatenate all line segment vertices in order x, y, z.
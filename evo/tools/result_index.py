@@ -0,0 +1,256 @@
+# -*- coding: UTF8 -*-
+"""
+SQLite index of result files, to query many results without loading them
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import typing
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from evo import EvoException
+from evo.tools import file_interface
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS info (
+    result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (result_id, key)
+);
+CREATE TABLE IF NOT EXISTS stats (
+    result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (result_id, key)
+);
+CREATE TABLE IF NOT EXISTS arrays (
+    result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    original_size INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (result_id, name)
+);
+CREATE INDEX IF NOT EXISTS info_key_value ON info (key, value);
+CREATE INDEX IF NOT EXISTS results_mtime ON results (mtime_ns);
+"""
+
+
+class ResultIndexException(EvoException):
+    pass
+
+
+def downsample(array: np.ndarray, max_size: int) -> np.ndarray:
+    """
+    :param array: array to downsample (flattened)
+    :param max_size: max. number of values
+    :return: max_size evenly spaced values of the array, including the first
+             and the last one, or the array if it's not larger than max_size
+    """
+    array = np.asarray(array).ravel()
+    if array.size <= max_size:
+        return array
+    return array[np.linspace(0, array.size - 1, max_size).astype(int)]
+
+
+def _info_value(value) -> str:
+    # Stored as text to allow glob patterns, non-strings as JSON.
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+class ResultIndex(object):
+    """
+    Index of the info, stats and optionally downsampled arrays of result
+    files in a SQLite database. Entries are updated incrementally, i.e. only
+    if the modification time or size of the result file changed.
+    """
+    def __init__(self, db_path: str):
+        """
+        :param db_path: path of the SQLite database, created if needed
+        """
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.connection.close()
+            raise ResultIndexException(
+                "unsupported index schema version {} in {}".format(
+                    version, db_path))
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(
+                "PRAGMA user_version = {}".format(SCHEMA_VERSION))
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ResultIndex":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def update(self, result_files: typing.Iterable[str],
+               array_names: typing.Sequence[str] = (),
+               max_array_size: int = 1000) -> typing.Tuple[int, int]:
+        """
+        Adds new result files and updates the entries of changed ones.
+        :param result_files: paths of result .zip files
+        :param array_names: names of arrays to store, e.g. "error_array"
+        :param max_array_size: arrays are downsampled to this number of values
+        :return: number of indexed files, number of unchanged files
+        """
+        num_indexed, num_unchanged = 0, 0
+        for result_file in result_files:
+            path = os.path.abspath(result_file)
+            stat = os.stat(path)
+            row = self.connection.execute(
+                "SELECT id, mtime_ns, size FROM results WHERE path = ?",
+                (path, )).fetchone()
+            if row is not None and row[1:] == (stat.st_mtime_ns,
+                                               stat.st_size):
+                num_unchanged += 1
+                continue
+            try:
+                result_obj = file_interface.load_res_file(
+                    path, load_arrays=bool(array_names), lazy=True)
+            except (file_interface.FileInterfaceException,
+                    zipfile.BadZipFile) as e:
+                logger.warning("Skipping {}: {}".format(path, e))
+                continue
+            with self.connection:
+                if row is not None:
+                    self.connection.execute(
+                        "DELETE FROM results WHERE id = ?", (row[0], ))
+                result_id = self.connection.execute(
+                    "INSERT INTO results (path, mtime_ns, size) "
+                    "VALUES (?, ?, ?)",
+                    (path, stat.st_mtime_ns, stat.st_size)).lastrowid
+                self.connection.executemany(
+                    "INSERT INTO info VALUES (?, ?, ?)",
+                    ((result_id, key, _info_value(value))
+                     for key, value in result_obj.info.items()))
+                self.connection.executemany(
+                    "INSERT INTO stats VALUES (?, ?, ?)",
+                    ((result_id, key, float(value))
+                     for key, value in result_obj.stats.items()))
+                for name in array_names:
+                    if name not in result_obj.np_arrays:
+                        continue
+                    array = result_obj.np_arrays[name]
+                    data = downsample(array, max_array_size).astype(
+                        np.float64).tobytes()
+                    self.connection.execute(
+                        "INSERT INTO arrays VALUES (?, ?, ?, ?)",
+                        (result_id, name, array.size, data))
+            num_indexed += 1
+        logger.debug("Indexed {} result files in {}, {} unchanged".format(
+            num_indexed, self.db_path, num_unchanged))
+        return num_indexed, num_unchanged
+
+    def prune(self) -> int:
+        """
+        Removes the entries of result files that don't exist anymore.
+        :return: number of removed entries
+        """
+        missing = [(result_id, ) for result_id, path in self.connection.
+                   execute("SELECT id, path FROM results")
+                   if not os.path.isfile(path)]
+        with self.connection:
+            self.connection.executemany("DELETE FROM results WHERE id = ?",
+                                        missing)
+        return len(missing)
+
+    def query(self, filters: typing.Optional[typing.Dict[str, str]] = None,
+              min_mtime: typing.Optional[float] = None,
+              paths: typing.Optional[typing.Iterable[str]] = None
+              ) -> pd.DataFrame:
+        """
+        :param filters: {info key: glob pattern of the value} that must all
+                        match, e.g. {"est_name": "*ORB*"}
+        :param min_mtime: only results whose file was modified after this
+                          time (seconds since epoch)
+        :param paths: only results of these files
+        :return: dataframe with one row per result, indexed by path, with
+                 the ("info", key) and ("stats", key) columns
+        """
+        conditions: typing.List[str] = []
+        parameters: typing.List[typing.Any] = []
+        for key, pattern in (filters or {}).items():
+            conditions.append("id IN (SELECT result_id FROM info "
+                              "WHERE key = ? AND value GLOB ?)")
+            parameters.extend((key, pattern))
+        if min_mtime is not None:
+            conditions.append("mtime_ns >= ?")
+            parameters.append(int(min_mtime * 1e9))
+        results_query = "SELECT id, path FROM results" + (
+            " WHERE " + " AND ".join(conditions) if conditions else "")
+        results = pd.DataFrame(
+            self.connection.execute(results_query, parameters).fetchall(),
+            columns=["id", "path"])
+        if paths is not None:
+            paths = {os.path.abspath(path) for path in paths}
+            results = results[results["path"].isin(paths)]
+
+        frames = {}
+        for table in ("info", "stats"):
+            # The subquery is faster than passing thousands of ids.
+            rows = self.connection.execute(
+                "SELECT result_id, key, value FROM {} WHERE result_id IN "
+                "(SELECT id FROM ({}))".format(table, results_query),
+                parameters).fetchall()
+            values = pd.DataFrame(rows, columns=["id", "key", "value"])
+            frames[table] = values.pivot(index="id", columns="key",
+                                         values="value").reindex(
+                                             results["id"])
+        df = pd.concat(frames, axis="columns")
+        df.columns.names = [None, None]
+        df.index = pd.Index(results["path"].values, name="path")
+        return df
+
+    def load_array(self, path: str,
+                   name: str) -> typing.Optional[np.ndarray]:
+        """
+        :param path: path of an indexed result file
+        :param name: name of the array
+        :return: the downsampled array, None if it was not stored
+        """
+        row = self.connection.execute(
+            "SELECT data FROM arrays JOIN results ON result_id = id "
+            "WHERE path = ? AND name = ?",
+            (os.path.abspath(path), name)).fetchone()
+        return None if row is None else np.frombuffer(row[0], np.float64)
@@ -41,13 +41,14 @@ class TrajectoryConverter:
 
     def adjust_agent_trajectory(self):
         first_timestamp = self.agent_traj.timestamps[0]
-        self.agent_traj.timestamps -= first_timestamp
-        self.agent_traj.timestamps += self.agent_start_time
+        self.agent_traj.timestamps = (self.agent_traj.timestamps -
+                                      first_timestamp + self.agent_start_time)
         write_tum_trajectory_file(self.base_path + "KF_GBA_{}_sorted_{}_{}.csv".format(self.agent_identifier, self.agent_start_time, self.agent_end_time), self.agent_traj)
 
     def adjust_ground_truth(self):
         first_timestamp_GT = self.groundTruth.timestamps[0]
-        self.groundTruth.timestamps -= first_timestamp_GT
+        self.groundTruth.timestamps = (self.groundTruth.timestamps -
+                                       first_timestamp_GT)
         write_tum_trajectory_file(self.groundTruth_relative, self.groundTruth)
 
     def run(self):
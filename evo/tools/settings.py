@@ -129,10 +129,12 @@ def update_if_outdated() -> None:
     """
     Update user settings to a new version if needed.
     """
-    if open(USER_ASSETS_VERSION_PATH).read() == __version__:
-        return
     from evo.tools.settings_template import DEFAULT_SETTINGS_DICT
     old_settings = json.loads(open(DEFAULT_PATH).read())
+    # Also update if parameters were added without a version change.
+    if open(USER_ASSETS_VERSION_PATH).read() == __version__ \
+            and DEFAULT_SETTINGS_DICT.keys() <= old_settings.keys():
+        return
     updated_settings = merge_dicts(old_settings, DEFAULT_SETTINGS_DICT,
                                    soft=True)
     write_to_json_file(DEFAULT_PATH, updated_settings)
@@ -36,6 +36,20 @@ def get_default_plot_backend() -> str:
 # default settings with documentation
 # yapf: disable
 DEFAULT_SETTINGS_DICT_DOC = {
+    "file_cache_dir": (
+        os.path.join(os.path.expanduser('~'), ".evo", "file_cache"),
+        "Directory of the trajectory file cache, see file_cache_enabled."
+    ),
+    "file_cache_enabled": (
+        False,
+        ("Cache trajectories parsed from TUM, KITTI and EuRoC files as\n"
+         "binary .npy files, to load them faster when they are used again.")
+    ),
+    "file_cache_max_size": (
+        1024,
+        ("Maximum size of the trajectory file cache in MB.\n"
+         "The least recently used entries are removed first.")
+    ),
     "global_logfile_enabled": (
         False,
         ("Whether to write a global logfile to the home folder.\n"
@@ -172,6 +186,10 @@ DEFAULT_SETTINGS_DICT_DOC = {
         "Equal axes ratio for realistic trajectory plots.\n"
         "Turning it off allows to stretch the plot without keeping the ratio."
     ),
+    "result_index_path": (
+        os.path.join(os.path.expanduser('~'), ".evo", "result_index.db"),
+        "SQLite database of evo_index, queried with evo_res --index."
+    ),
     "ros_map_alpha_value": (
         1.0,
         "Alpha value for blending ROS map image slices."
@@ -192,6 +210,12 @@ DEFAULT_SETTINGS_DICT_DOC = {
         "How to change the plot axis limits (viewport) when plotting a map.\n"
         "One of the following options: keep_unchanged, zoom_to_map, update"
     ),
+    "save_res_format_version": (
+        1,
+        ("Format version of saved result zip files. 1: readable by all evo\n"
+         "versions. 2: binary trajectories and memory mappable arrays,\n"
+         "older evo versions can't load the trajectories of these files.")
+    ),
     "save_traj_in_zip": (
         False,
         "Store backup trajectories in result zip files (increases size)."
@@ -81,6 +81,7 @@ setup(
         "evo_rpe=evo.entry_points:rpe",
         "evo_traj=evo.entry_points:traj",
         "evo_res=evo.entry_points:res",
+        "evo_index=evo.entry_points:index",
         "evo_config=evo.main_config:main",
         "evo_fig=evo.main_fig:main",
         "evo_ipython=evo.main_ipython:main",
@@ -106,6 +107,7 @@ setup(
         "pillow",
         "rosbags>=0.9.10",
     ],
+    extras_require={"arrow": ["pyarrow"]},
     python_requires=">=3.8",
     classifiers=[
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",
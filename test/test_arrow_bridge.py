@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+unit test for the arrow_bridge module
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import helpers
+from evo.core.result import Result
+from evo.tools import arrow_bridge, file_interface
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestTrajectoryTable(unittest.TestCase):
+    def test_write_read_integrity(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for traj_out in (helpers.fake_trajectory(1000, 0.1),
+                             helpers.fake_path(1000)):
+                for suffix in (".parquet", ".arrow"):
+                    path = os.path.join(tmp_dir, "traj" + suffix)
+                    arrow_bridge.write_trajectory_file(path, traj_out)
+                    traj_in = arrow_bridge.read_trajectory_file(path)
+                    self.assertIs(type(traj_in), type(traj_out))
+                    self.assertEqual(traj_in, traj_out)
+
+    def test_timestamps_not_copied(self):
+        traj = helpers.fake_trajectory(100, 0.1)
+        table = arrow_bridge.trajectory_to_table(traj)
+        self.assertTrue(
+            np.shares_memory(
+                table.column("timestamp").chunk(0).to_numpy(),
+                traj.timestamps))
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestResultsTable(unittest.TestCase):
+    @staticmethod
+    def fake_results():
+        r1 = Result()
+        r1.add_info({"title": "APE", "delta": 1, "ids": [1, 2]})
+        r1.add_stats({"rmse": 1., "max": 2.})
+        r1.add_np_array("error_array", np.arange(10.))
+        r1.add_np_array("twists", np.random.rand(10, 6))
+        r2 = Result()
+        r2.add_info({"title": "RPE", "delta": "1 m"})
+        r2.add_stats({"rmse": 3.})
+        r2.add_np_array("error_array", np.arange(3.))
+        return [r1, r2]
+
+    def test_write_read_integrity(self):
+        results_out = self.fake_results()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for suffix in (".parquet", ".feather"):
+                path = os.path.join(tmp_dir, "results" + suffix)
+                arrow_bridge.write_results_file(path, results_out,
+                                                labels=["a", "b"])
+                results_in = arrow_bridge.read_results_file(path)
+                self.assertEqual(results_in, results_out)
+                self.assertEqual(results_in[0].info["ids"], [1, 2])
+                self.assertNotIn("twists", results_in[1].np_arrays)
+                table = arrow_bridge.read_table(path, columns=["label"])
+                self.assertEqual(table.column("label").to_pylist(),
+                                 ["a", "b"])
+
+    def test_lazy_results_in_batches(self):
+        results_out = self.fake_results() * 3
+        batch_bytes = arrow_bridge.BATCH_BYTES
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = [
+                os.path.join(tmp_dir, "{}.zip".format(i))
+                for i in range(len(results_out))
+            ]
+            for path, result_out in zip(paths, results_out):
+                file_interface.save_res_file(path, result_out)
+            results_lazy = [
+                file_interface.load_res_file(path, lazy=True)
+                for path in paths
+            ]
+            table_path = os.path.join(tmp_dir, "results.arrow")
+            try:
+                # A few rows per batch.
+                arrow_bridge.BATCH_BYTES = 500
+                arrow_bridge.write_results_file(
+                    table_path, results_lazy, array_headers=[
+                        file_interface.read_res_array_headers(path)
+                        for path in paths
+                    ])
+            finally:
+                arrow_bridge.BATCH_BYTES = batch_bytes
+            for result_lazy in results_lazy:
+                self.assertFalse(
+                    result_lazy.np_arrays.is_loaded("error_array"))
+            self.assertEqual(arrow_bridge.read_results_file(table_path),
+                             results_out)
+
+    def test_single_result_not_copied(self):
+        result_obj = self.fake_results()[0]
+        table = arrow_bridge.results_to_table([result_obj])
+        self.assertTrue(
+            np.shares_memory(
+                table.column("np_arrays.error_array").chunk(0).values.
+                to_numpy(), result_obj.np_arrays["error_array"]))
+        result_in = arrow_bridge.table_to_results(table)[0]
+        self.assertTrue(
+            np.shares_memory(result_in.np_arrays["error_array"],
+                             result_obj.np_arrays["error_array"]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
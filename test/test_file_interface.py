@@ -20,17 +20,22 @@ along with evo.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import io
+import json
+import os
 import tempfile
 import unittest
+import zipfile
 
 import numpy as np
 from rosbags.rosbag1 import (Reader as Rosbag1Reader, Writer as Rosbag1Writer)
 from rosbags.rosbag2 import (Reader as Rosbag2Reader, Writer as Rosbag2Writer)
 
 import helpers
-from evo.core.result import Result
+from evo.core.result import Result, merge_results
 from evo.core.trajectory import PosePath3D, PoseTrajectory3D
 from evo.tools import file_interface
+from evo.tools.file_cache import FileCache
+from evo.tools.settings import SETTINGS
 
 
 class MockFileTestCase(unittest.TestCase):
@@ -103,6 +108,28 @@ class TestTumFile(MockFileTestCase):
         with self.assertRaises(file_interface.FileInterfaceException):
             file_interface.read_tum_trajectory_file(self.mock_file)
 
+    @MockFileTestCase.run_and_clear
+    def test_iter_chunks(self):
+        traj_out = helpers.fake_trajectory(1000, 0.1)
+        file_interface.write_tum_trajectory_file(self.mock_file, traj_out)
+        self.mock_file.seek(0)
+        chunks = list(
+            file_interface.iter_tum_trajectory_file(self.mock_file,
+                                                    chunk_size=300))
+        self.assertEqual([c.num_poses for c in chunks], [300, 300, 300, 100])
+        traj_in = PoseTrajectory3D(
+            np.concatenate([c.positions_xyz for c in chunks]),
+            np.concatenate([c.orientations_quat_wxyz for c in chunks]),
+            np.concatenate([c.timestamps for c in chunks]))
+        self.assertTrue(traj_out == traj_in)
+
+    @MockFileTestCase.run_and_clear
+    def test_iter_chunks_invalid_row(self):
+        self.mock_file.write(u"0 0 0 0 0 0 0 1\n1 2 3 4 5 6 7\n")
+        self.mock_file.seek(0)
+        with self.assertRaises(file_interface.FileInterfaceException):
+            list(file_interface.iter_tum_trajectory_file(self.mock_file))
+
 
 class TestKittiFile(MockFileTestCase):
     def __init__(self, *args, **kwargs):
@@ -148,6 +175,124 @@ class TestKittiFile(MockFileTestCase):
             file_interface.read_kitti_poses_file(self.mock_file)
 
 
+class TestBinaryTrajectoryFile(unittest.TestCase):
+    def test_write_read_integrity(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "traj.npy")
+            for traj_out in (helpers.fake_trajectory(1000, 0.1),
+                             helpers.fake_path(1000)):
+                file_interface.write_binary_trajectory_file(
+                    file_path, traj_out, chunk_size=64)
+                for mmap in (True, False):
+                    traj_in = file_interface.read_binary_trajectory_file(
+                        file_path, mmap=mmap)
+                    self.assertIs(type(traj_in), type(traj_out))
+                    self.assertEqual(
+                        isinstance(traj_in.positions_xyz, np.memmap), mmap)
+                    self.assertTrue(traj_out == traj_in)
+                del traj_in
+
+    def test_invalid_shape(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "traj.npy")
+            np.save(file_path, np.zeros((10, 3)))
+            with self.assertRaises(file_interface.FileInterfaceException):
+                file_interface.read_binary_trajectory_file(file_path)
+
+
+class TestCsvReadFloatMatrix(unittest.TestCase):
+    def test_same_as_csv_read_matrix(self):
+        content = u"# comment\n" + u"".join(
+            u"{} {} {}\n".format(i, i * 0.5, -i * 1e-3) for i in range(100))
+        expected = np.array(
+            file_interface.csv_read_matrix(io.StringIO(content),
+                                           delim=" ")).astype(float)
+        for chunk_size in (1, 7, 100, 1000):
+            mat = file_interface.csv_read_float_matrix(
+                io.StringIO(content), delim=" ", chunk_size=chunk_size)
+            self.assertEqual(mat.dtype, np.float64)
+            self.assertTrue(np.array_equal(mat, expected))
+
+    def test_invalid_rows(self):
+        for content in (u"1 2 3\n4 5\n", u"1 2 3\n4 5 6 \n", u"1 2 x\n"):
+            with self.assertRaises(ValueError):
+                file_interface.csv_read_float_matrix(io.StringIO(content),
+                                                     delim=" ", chunk_size=1)
+
+    def test_empty(self):
+        mat = file_interface.csv_read_float_matrix(io.StringIO(u"# only\n"))
+        self.assertEqual(mat.size, 0)
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        self.source = os.path.join(self.tmp_dir.name, "traj.txt")
+        self.traj = helpers.fake_trajectory(100, 0.1)
+        file_interface.write_tum_trajectory_file(self.source, self.traj)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_store_load(self):
+        cache = FileCache(self.cache_dir, 1024**2)
+        self.assertIsNone(cache.load(self.source, "test"))
+        array = np.random.rand(10, 3)
+        cache.store(self.source, "test", array)
+        cached = cache.load(self.source, "test")
+        self.assertIsInstance(cached, np.memmap)
+        self.assertTrue(np.array_equal(cached, array))
+        self.assertIsNone(cache.load(self.source, "other kind"))
+        # Touched but unchanged source file keeps the entry.
+        os.utime(self.source, ns=(0, 0))
+        self.assertIsNotNone(cache.load(self.source, "test"))
+        # Modified source file invalidates the entry.
+        with open(self.source, 'a') as f:
+            f.write("# comment")
+        self.assertIsNone(cache.load(self.source, "test"))
+
+    def test_touched_source(self):
+        cache = FileCache(self.cache_dir, 1024**2)
+        cache.store(self.source, "test", np.random.rand(10, 3))
+        meta_path = cache.entries()[0][1]
+        os.utime(self.source, ns=(0, 0))
+        # Unchanged content is hashed once, then the new mtime is stored.
+        self.assertIsNotNone(cache.load(self.source, "test"))
+        with open(meta_path) as meta_file:
+            self.assertEqual(json.load(meta_file)["mtime_ns"], 0)
+
+    def test_lru_eviction(self):
+        sources = [self.source + str(i) for i in range(3)]
+        for source in sources:
+            open(source, 'w').close()
+        array = np.random.rand(1000)
+        cache = FileCache(self.cache_dir, 2.5 * array.nbytes)
+        for i, source in enumerate(sources[:2]):
+            cache.store(source, "test", array)
+            os.utime(cache.entries()[-1][1], (i, i))
+        cache.load(sources[0], "test")  # now most recently used
+        cache.store(sources[2], "test", array)
+        self.assertIsNone(cache.load(sources[1], "test"))
+        self.assertIsNotNone(cache.load(sources[0], "test"))
+        self.assertIsNotNone(cache.load(sources[2], "test"))
+        self.assertLessEqual(cache.size_bytes(), cache.max_size_bytes)
+        cache.clear()
+        self.assertEqual(cache.entries(), [])
+
+    def test_readers(self):
+        settings_backup = dict(SETTINGS)
+        SETTINGS.file_cache_enabled = True
+        SETTINGS.file_cache_dir = self.cache_dir
+        try:
+            for _ in range(2):  # parse & store, then load from cache
+                traj_in = file_interface.read_tum_trajectory_file(self.source)
+                self.assertTrue(traj_in == self.traj)
+            self.assertEqual(len(FileCache(self.cache_dir, 0).entries()), 1)
+        finally:
+            SETTINGS.update(settings_backup)
+
+
 class TestBagFile(MockFileTestCase):
     def __init__(self, *args, **kwargs):
         super(TestBagFile, self).__init__(io.BytesIO(), *args, **kwargs)
@@ -189,6 +334,103 @@ class TestResultFile(MockFileTestCase):
                                                  load_trajectories=True)
         self.assertEqual(result_in, result_out)
 
+    def test_format_versions(self):
+        result_out = Result()
+        result_out.add_np_array("test-array", np.ones(1000))
+        result_out.add_trajectory("traj", helpers.fake_trajectory(100, 0.1))
+        result_out.add_trajectory("path", helpers.fake_path(100))
+        # Version 1 by default, for compatibility with older evo versions.
+        for format_version, members in ((None, {"traj.tum", "path.kitti"}),
+                                        (1, {"traj.tum", "path.kitti"}),
+                                        (2, {"traj.traj", "path.traj"})):
+            zip_file = io.BytesIO()
+            file_interface.save_res_file(zip_file, result_out,
+                                         format_version=format_version)
+            with zipfile.ZipFile(zip_file) as archive:
+                self.assertTrue(members <= set(archive.namelist()))
+            result_in = file_interface.load_res_file(zip_file,
+                                                     load_trajectories=True)
+            self.assertEqual(result_in.np_arrays.keys(),
+                             result_out.np_arrays.keys())
+            self.assertIsInstance(result_in.trajectories["path"], PosePath3D)
+            self.assertIsInstance(result_in.trajectories["traj"],
+                                  PoseTrajectory3D)
+
+    def test_aligned_members(self):
+        result_out = Result()
+        for i, name in enumerate(("a", "error_array", "ä" * 7, "x" * 61)):
+            result_out.add_np_array(name, np.arange(i * 37 + 1.))
+            result_out.add_trajectory(name,
+                                      helpers.fake_trajectory(i * 13 + 1, 0.1))
+        zip_file = io.BytesIO()
+        file_interface.save_res_file(zip_file, result_out, format_version=2)
+        data = zip_file.getvalue()
+        with zipfile.ZipFile(zip_file) as archive:
+            infos = [
+                zinfo for zinfo in archive.infolist()
+                if zinfo.filename.endswith((".npy", ".traj"))
+            ]
+            self.assertEqual(len(infos), 8)
+            for zinfo in infos:
+                local_header = data[zinfo.header_offset:zinfo.header_offset +
+                                    30]
+                self.assertEqual(local_header[:4], b"PK\x03\x04")
+                name_length = int.from_bytes(local_header[26:28], "little")
+                extra_length = int.from_bytes(local_header[28:30], "little")
+                offset = zinfo.header_offset + 30 + name_length + extra_length
+                self.assertEqual(offset % file_interface.ZIP_ALIGNMENT, 0)
+                with archive.open(zinfo) as member:
+                    np.lib.format.read_magic(member)
+                    np.lib.format.read_array_header_1_0(member)
+                    array_offset = offset + member.tell()
+                self.assertEqual(array_offset % file_interface.ZIP_ALIGNMENT,
+                                 0)
+
+    def test_lazy_memory_mapped(self):
+        result_out = Result()
+        result_out.add_np_array("a", np.arange(1000.))
+        result_out.add_np_array("b", np.arange(10))
+        result_out.add_stats({"rmse": 1.})
+        result_out.add_trajectory("traj", helpers.fake_trajectory(100, 0.1))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            zip_path = os.path.join(tmp_dir, "result.zip")
+            file_interface.save_res_file(zip_path, result_out,
+                                         format_version=2)
+            result_in = file_interface.load_res_file(zip_path,
+                                                     load_trajectories=True,
+                                                     lazy=True)
+            self.assertFalse(result_in.np_arrays.is_loaded("a"))
+            self.assertFalse(result_in.trajectories.is_loaded("traj"))
+            array = result_in.np_arrays["a"]
+            self.assertIsInstance(array, np.memmap)
+            self.assertTrue(array.flags.aligned)
+            self.assertEqual(array.offset % file_interface.ZIP_ALIGNMENT, 0)
+            self.assertEqual(result_in, result_out)
+            del array, result_in
+
+            result_in = file_interface.load_res_file(zip_path,
+                                                     load_arrays=False)
+            self.assertEqual(result_in.stats, result_out.stats)
+            self.assertEqual(len(result_in.np_arrays), 0)
+
+    def test_merge_res_files(self):
+        results = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i, size in enumerate((10, 10, 5)):
+                result_out = Result()
+                result_out.add_np_array("a", np.arange(size) * i)
+                result_out.add_stats({"rmse": float(i)})
+                results.append(result_out)
+                file_interface.save_res_file(
+                    os.path.join(tmp_dir, "{}.zip".format(i)), result_out)
+            result_files = [
+                os.path.join(tmp_dir, "{}.zip".format(i)) for i in range(3)
+            ]
+            for n in (1, 2, 3):
+                self.assertEqual(
+                    file_interface.merge_res_files(result_files[:n]),
+                    merge_results(results[:n]))
+
 
 class TestHasUtf8Bom(unittest.TestCase):
     def test_no_bom(self):
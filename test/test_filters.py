@@ -90,6 +90,24 @@ class TestFilterPairsByPath(unittest.TestCase):
                                                 all_pairs=True)
         self.assertEqual(id_pairs, [(0, 7)])
 
+    def test_same_as_brute_force_all_pairs(self):
+        # Random steps with stationary parts, i.e. ties in the distances.
+        steps = np.random.choice([0., 0.25, 0.5, 1.], size=200)
+        poses = np.tile(np.eye(4), (200, 1, 1))
+        poses[:, 0, 3] = np.cumsum(steps)
+        distances = np.cumsum(np.concatenate(([0.], steps[1:])))
+        for target_path, tol in ((1.0, 0.0), (1.3, 0.2), (2.1, 0.05)):
+            expected = []
+            for i in range(len(poses) - 1):
+                errors = np.abs(distances[i + 1:] - distances[i] -
+                                target_path)
+                j = int(np.argmin(errors))
+                if errors[j] <= tol:
+                    expected.append((i, i + 1 + j))
+            id_pairs = filters.filter_pairs_by_path(poses, target_path, tol,
+                                                    all_pairs=True)
+            self.assertEqual(id_pairs, expected)
+
 
 axis = np.array([1, 0, 0])
 POSES_5 = [
@@ -166,5 +184,76 @@ class TestFilterPairsByAngle(unittest.TestCase):
             self.assertEqual(id_pairs, expected_result)
 
 
+class TestConsecutiveSameAsLoop(unittest.TestCase):
+    """
+    Consecutive mode must give the same pairs as the accumulation loop.
+    """
+    def setUp(self):
+        # Exactly representable steps make ties with the deltas likely.
+        self.poses = [lie.se3(np.eye(3), np.zeros(3))]
+        for _ in range(100):
+            step = lie.se3(
+                lie.so3_exp(np.array([1., 0., 0.]) *
+                            np.random.choice([0., 0.25, 0.5])),
+                np.array([0., 0., np.random.choice([0., 0.25, 0.5])]))
+            self.poses.append(self.poses[-1].dot(step))
+
+    def test_path(self):
+        for delta in (0., 0.5, 1., 1.75):
+            ids = []
+            current_path = 0.0
+            for i in range(len(self.poses)):
+                current_path += float(
+                    np.linalg.norm(self.poses[i][:3, 3] -
+                                   self.poses[max(i - 1, 0)][:3, 3]))
+                if current_path >= delta:
+                    ids.append(i)
+                    current_path = 0.0
+            expected = list(zip(ids, ids[1:]))
+            self.assertEqual(
+                filters.filter_pairs_by_path(self.poses, delta), expected)
+
+    def test_angle(self):
+        for delta in (0., 0.5, 1., 1.75):
+            expected = []
+            accumulated_delta = 0.0
+            start = 0
+            for i in range(len(self.poses) - 1):
+                accumulated_delta += lie.so3_log_angle(
+                    lie.relative_so3(self.poses[i][:3, :3],
+                                     self.poses[i + 1][:3, :3]))
+                if accumulated_delta >= delta:
+                    expected.append((start, i + 1))
+                    accumulated_delta = 0.0
+                    start = i + 1
+            self.assertEqual(
+                filters.filter_pairs_by_angle(self.poses, delta), expected)
+
+
+class TestFilterPairsByAngleBlocked(unittest.TestCase):
+    def test_block_sizes(self):
+        poses = [lie.random_se3() for _ in range(50)]
+        expected = []
+        for i in range(len(poses)):
+            for j in range(i + 1, len(poses)):
+                angle = lie.so3_log_angle(
+                    lie.relative_so3(poses[i][:3, :3], poses[j][:3, :3]))
+                if 1.0 <= angle <= 1.4:
+                    expected.append((i, j))
+        for block_size in (1, 7, 50, 1000):
+            progress = []
+            id_pairs = filters.filter_pairs_by_angle(
+                poses, 1.2, 0.2, all_pairs=True, block_size=block_size,
+                workers=2,
+                progress_callback=lambda i, n: progress.append((i, n)))
+            self.assertEqual(id_pairs, expected)
+            self.assertEqual(progress[-1][0], progress[-1][1])
+
+    def test_invalid_block_size(self):
+        with self.assertRaises(filters.FilterException):
+            filters.filter_pairs_by_angle(POSES_5, 1.0, all_pairs=True,
+                                          block_size=0)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
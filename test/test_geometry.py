@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Unit test for geometry module.
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+import numpy as np
+
+from evo.core import geometry
+from evo.core import lie_algebra as lie
+
+
+def transformed_points(x: np.ndarray, r: np.ndarray, t: np.ndarray,
+                       s: float) -> np.ndarray:
+    return s * r.dot(x) + t[:, np.newaxis]
+
+
+class TestUmeyamaAlignment(unittest.TestCase):
+    def test_known_transformation(self):
+        x = np.random.randn(3, 100)
+        r, t, s = lie.random_so3(), np.array([1., 2., 3.]), 1.234
+        y = transformed_points(x, r, t, s)
+        r_a, t_a, s_a = geometry.umeyama_alignment(x, y, with_scale=True)
+        self.assertTrue(np.allclose(r_a, r))
+        self.assertTrue(np.allclose(t_a, t))
+        self.assertAlmostEqual(s_a, s)
+
+    def test_degenerate(self):
+        x = np.ones((3, 100))
+        with self.assertRaises(geometry.GeometryException):
+            geometry.umeyama_alignment(x, x)
+
+
+class TestUmeyamaAlignmentBatch(unittest.TestCase):
+    def test_same_as_single(self):
+        for with_scale in (False, True):
+            # Pairs with different numbers of points.
+            x = [np.random.randn(3, n) for n in (10, 50, 100)]
+            y = [np.random.randn(3, n) for n in (10, 50, 100)]
+            r, t, s = geometry.umeyama_alignment_batch(x, y, with_scale)
+            self.assertEqual(r.shape, (3, 3, 3))
+            self.assertEqual(t.shape, (3, 3))
+            self.assertEqual(s.shape, (3, ))
+            for k, (x_k, y_k) in enumerate(zip(x, y)):
+                r_k, t_k, s_k = geometry.umeyama_alignment(
+                    x_k, y_k, with_scale)
+                self.assertTrue(np.allclose(r[k], r_k))
+                self.assertTrue(np.allclose(t[k], t_k))
+                self.assertAlmostEqual(s[k], s_k)
+
+    def test_stacked_array(self):
+        x = np.random.randn(5, 3, 100)
+        y = np.array([
+            transformed_points(x_k, lie.random_so3(), np.ones(3), 2.)
+            for x_k in x
+        ])
+        r, t, s = geometry.umeyama_alignment_batch(x, y, with_scale=True)
+        self.assertTrue(np.allclose(s, 2.))
+        for k in range(5):
+            self.assertTrue(
+                np.allclose(transformed_points(x[k], r[k], t[k], s[k]), y[k]))
+
+    def test_degenerate(self):
+        x = [np.random.randn(3, 100), np.ones((3, 100))]
+        with self.assertRaises(geometry.GeometryException):
+            geometry.umeyama_alignment_batch(x, x)
+
+
+class TestUmeyamaAlignmentPrefixes(unittest.TestCase):
+    def test_same_as_single(self):
+        # Large offset to check the numerical stability of the running sums.
+        x = np.random.randn(3, 200) + 1e4
+        y = np.random.randn(3, 200) - 1e4
+        lengths = [150, 3, 50, 50, 120]
+        for with_scale in (False, True):
+            r, t, s = geometry.umeyama_alignment_prefixes(
+                x, y, with_scale, lengths)
+            self.assertEqual(r.shape, (len(lengths), 3, 3))
+            for k, n in enumerate(lengths):
+                r_n, t_n, s_n = geometry.umeyama_alignment(
+                    x[:, :n], y[:, :n], with_scale)
+                self.assertTrue(np.allclose(r[k], r_n))
+                self.assertTrue(np.allclose(t[k], t_n))
+                self.assertAlmostEqual(s[k], s_n)
+
+    def test_all_prefixes(self):
+        x = np.random.randn(3, 20)
+        r, _, _ = geometry.umeyama_alignment_prefixes(x, x)
+        self.assertEqual(r.shape, (18, 3, 3))
+        self.assertTrue(np.allclose(r, np.eye(3)))
+
+    def test_invalid_lengths(self):
+        x = np.random.randn(3, 20)
+        with self.assertRaises(geometry.GeometryException):
+            geometry.umeyama_alignment_prefixes(x, x, lengths=[21])
+        with self.assertRaises(geometry.GeometryException):
+            geometry.umeyama_alignment_prefixes(x, x, lengths=[2])
+        with self.assertRaises(geometry.GeometryException):
+            geometry.umeyama_alignment_prefixes(x, x, lengths=[10, 0, 20])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -24,8 +24,10 @@ import timeit
 import unittest
 
 import numpy as np
+import scipy.linalg
 
 from evo.core import lie_algebra as lie
+from evo.core import transformations as tr
 
 
 class TestSE3(unittest.TestCase):
@@ -104,6 +106,127 @@ class TestSO3(unittest.TestCase):
         self.assertTrue(np.allclose(r, lie.so3_exp(rotvec)))
 
 
+class TestQuaternionBatch(unittest.TestCase):
+    def test_quat_wxyz_to_so3_batch(self):
+        quats = np.random.randn(100, 4)  # also non-unit quaternions
+        quats[0] = [0., 0., 0., 0.]
+        rotations = lie.quat_wxyz_to_so3_batch(quats)
+        self.assertEqual(rotations.shape, (100, 3, 3))
+        for q, r in zip(quats, rotations):
+            self.assertTrue(np.allclose(tr.quaternion_matrix(q)[:3, :3], r))
+
+    def test_so3_to_quat_wxyz_batch(self):
+        rotations = np.array([lie.random_so3() for _ in range(100)])
+        rotations[0] = np.diag([1, -1, -1])  # w = 0
+        quats = lie.so3_to_quat_wxyz_batch(rotations)
+        self.assertEqual(quats.shape, (100, 4))
+        for r, q in zip(rotations, quats):
+            self.assertTrue(np.allclose(tr.quaternion_from_matrix(r), q))
+        self.assertTrue(np.all(quats[:, 0] >= 0.))
+        self.assertTrue(
+            np.allclose(lie.quat_wxyz_to_so3_batch(quats), rotations))
+
+
+class TestBatch(unittest.TestCase):
+    def test_relative_se3_batch(self):
+        p1 = np.array([lie.random_se3() for _ in range(100)])
+        p2 = np.array([lie.random_se3() for _ in range(100)])
+        relative = lie.relative_se3_batch(p1, p2)
+        for a, b, rel in zip(p1, p2, relative):
+            self.assertTrue(np.allclose(lie.relative_se3(a, b), rel))
+
+    def test_so3_log_angle_batch(self):
+        rotations = np.array([lie.random_so3() for _ in range(100)])
+        rotations[0] = np.eye(3)
+        for degrees in (False, True):
+            angles = lie.so3_log_angle_batch(rotations, degrees)
+            for r, angle in zip(rotations, angles):
+                self.assertAlmostEqual(lie.so3_log_angle(r, degrees), angle)
+        self.assertEqual(lie.so3_log_angle_batch(np.empty((0, 3, 3))).size, 0)
+
+    def test_so3_log_angle_batch_invalid(self):
+        rotations = np.array([lie.random_so3() for _ in range(10)])
+        rotations[5] *= 2
+        with self.assertRaises(lie.LieAlgebraException):
+            lie.so3_log_angle_batch(rotations)
+
+    def test_so3_log_angle_skip_check(self):
+        rotations = np.array([lie.random_so3() for _ in range(10)])
+        angles = lie.so3_log_angle_batch(rotations, check=False)
+        self.assertTrue(np.allclose(angles, lie.so3_log_angle_batch(rotations)))
+        self.assertAlmostEqual(lie.so3_log_angle(rotations[0], check=False),
+                               angles[0])
+        # Invalid input is only rejected with the check.
+        rotations[5] *= 2
+        lie.so3_log_angle_batch(rotations, check=False)
+        lie.so3_log_angle(rotations[5], check=False)
+        with self.assertRaises(lie.LieAlgebraException):
+            lie.so3_log_angle(rotations[5])
+
+    def test_se3_inverse_batch(self):
+        poses = np.array([lie.random_se3() for _ in range(100)])
+        for p, p_inv in zip(poses, lie.se3_inverse_batch(poses)):
+            self.assertTrue(np.allclose(lie.se3_inverse(p), p_inv))
+
+    def test_sim3_inverse_batch(self):
+        sim3s = np.array([
+            lie.sim3(lie.random_so3(), np.random.rand(3),
+                     np.random.rand() * 10) for _ in range(100)
+        ])
+        for a, a_inv in zip(sim3s, lie.sim3_inverse_batch(sim3s)):
+            self.assertTrue(np.allclose(lie.sim3_inverse(a), a_inv))
+
+    def test_relative_so3_batch(self):
+        r1 = np.array([lie.random_so3() for _ in range(100)])
+        r2 = np.array([lie.random_so3() for _ in range(100)])
+        relative = lie.relative_so3_batch(r1, r2)
+        for a, b, rel in zip(r1, r2, relative):
+            self.assertTrue(np.allclose(lie.relative_so3(a, b), rel))
+
+    def test_so3_log_batch(self):
+        rotations = np.array([lie.random_so3() for _ in range(100)])
+        rotation_vectors = lie.so3_log_batch(rotations)
+        skews = lie.so3_log_batch(rotations, return_skew=True)
+        for r, rotvec, skew in zip(rotations, rotation_vectors, skews):
+            self.assertTrue(np.allclose(lie.so3_log(r), rotvec))
+            self.assertTrue(np.allclose(lie.so3_log(r, True), skew))
+        self.assertEqual(lie.so3_log_batch(np.empty((0, 3, 3))).shape, (0, 3))
+
+    def test_se3_exp_log_batch(self):
+        twists = np.random.randn(100, 6)
+        twists[0] = 0.
+        twists[1, 3:] = [0., 0., 1e-6]  # small angle
+        poses = lie.se3_exp_batch(twists)
+        for twist, p in zip(twists, poses):
+            # Reference: matrix exponential of the se(3) element.
+            log = np.zeros((4, 4))
+            log[:3, :3], log[:3, 3] = lie.hat(twist[3:]), twist[:3]
+            self.assertTrue(np.allclose(scipy.linalg.expm(log), p))
+            self.assertTrue(np.allclose(lie.se3_exp(twist), p))
+        # Inverse for rotation angles below pi.
+        twists[:, 3:] *= 3. / np.linalg.norm(twists[:, 3:], axis=1).clip(
+            3., None)[:, np.newaxis]
+        poses = lie.se3_exp_batch(twists)
+        self.assertTrue(np.allclose(lie.se3_log_batch(poses), twists))
+        self.assertTrue(np.allclose(lie.se3_log(poses[5]), twists[5]))
+        self.assertEqual(lie.se3_log_batch(np.empty((0, 4, 4))).shape, (0, 6))
+        poses[3, :3, :3] *= 2
+        with self.assertRaises(lie.LieAlgebraException):
+            lie.se3_log_batch(poses)
+
+    def test_is_se3_batch(self):
+        poses = np.array([lie.random_se3() for _ in range(10)])
+        poses[3, :3, :3] *= 2
+        poses[5, 3, 0] = 1
+        poses[7, :3, :3] = np.diag([1, 1, -1])  # reflection, det = -1
+        mask = lie.is_se3_batch(poses)
+        self.assertEqual(mask.tolist(), [lie.is_se3(p) for p in poses])
+        self.assertEqual(np.flatnonzero(~mask).tolist(), [3, 5, 7])
+        self.assertEqual(
+            lie.is_so3_batch(poses[:, :3, :3]).tolist(),
+            [lie.is_so3(p[:3, :3]) for p in poses])
+
+
 class TestSim3(unittest.TestCase):
     def test_is_sim3(self):
         r = lie.random_so3()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""
+Unit test for metrics module.
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+import numpy as np
+import scipy.linalg
+
+import helpers
+from evo.core import metrics
+from evo.core import lie_algebra as lie
+from evo.core.trajectory import PosePath3D
+
+SE3_RELATIONS = (metrics.PoseRelation.full_transformation,
+                 metrics.PoseRelation.translation_part,
+                 metrics.PoseRelation.rotation_part,
+                 metrics.PoseRelation.rotation_angle_rad,
+                 metrics.PoseRelation.rotation_angle_deg,
+                 metrics.PoseRelation.twist)
+
+
+def twist_from_pose(E_i):
+    log = np.real(scipy.linalg.logm(E_i))
+    return np.hstack((log[:3, 3], lie.vee(log[:3, :3])))
+
+
+def errors_from_poses(E, pose_relation):
+    # Reference implementation on single error poses.
+    if pose_relation == metrics.PoseRelation.full_transformation:
+        return [np.linalg.norm(E_i - np.eye(4)) for E_i in E]
+    elif pose_relation == metrics.PoseRelation.translation_part:
+        return [np.linalg.norm(E_i[:3, 3]) for E_i in E]
+    elif pose_relation == metrics.PoseRelation.rotation_part:
+        return [np.linalg.norm(E_i[:3, :3] - np.eye(3)) for E_i in E]
+    elif pose_relation == metrics.PoseRelation.twist:
+        return [np.linalg.norm(twist_from_pose(E_i)) for E_i in E]
+    degrees = pose_relation == metrics.PoseRelation.rotation_angle_deg
+    return [lie.so3_log_angle(E_i[:3, :3], degrees) for E_i in E]
+
+
+class TestAPE(unittest.TestCase):
+    def test_same_as_single_poses(self):
+        path_ref = helpers.fake_path(100)
+        path_est = helpers.fake_path(100)
+        E = [
+            metrics.APE.ape_base(x_t, x_t_star) for x_t, x_t_star in zip(
+                path_est.poses_se3, path_ref.poses_se3)
+        ]
+        for pose_relation in SE3_RELATIONS:
+            ape_metric = metrics.APE(pose_relation)
+            ape_metric.process_data((path_ref, path_est))
+            self.assertTrue(
+                np.allclose(ape_metric.error,
+                            errors_from_poses(E, pose_relation)))
+
+    def test_twist(self):
+        path_ref = helpers.fake_path(10)
+        path_est = helpers.fake_path(10)
+        ape_metric = metrics.APE(metrics.PoseRelation.twist)
+        ape_metric.process_data((path_ref, path_est))
+        self.assertEqual(ape_metric.twists.shape, (10, 6))
+        self.assertTrue(
+            np.allclose(ape_metric.twists,
+                        [twist_from_pose(E_i) for E_i in ape_metric.E]))
+        result = ape_metric.get_result()
+        self.assertTrue(np.array_equal(result.np_arrays["twists"],
+                                       ape_metric.twists))
+
+    def test_retain_E(self):
+        path_ref = helpers.fake_path(10)
+        path_est = helpers.fake_path(10)
+        ape_metric = metrics.APE(metrics.PoseRelation.rotation_part)
+        ape_metric.process_data((path_ref, path_est))
+        self.assertEqual(ape_metric.E.shape, (10, 4, 4))
+        ape_metric = metrics.APE(metrics.PoseRelation.rotation_part,
+                                 retain_E=False)
+        ape_metric.process_data((path_ref, path_est))
+        self.assertEqual(ape_metric.E.size, 0)
+        self.assertEqual(ape_metric.error.size, 10)
+
+    def test_accumulate(self):
+        path_ref = helpers.fake_path(1000)
+        path_est = helpers.fake_path(1000)
+        ape_full = metrics.APE(metrics.PoseRelation.full_transformation)
+        ape_full.process_data((path_ref, path_est))
+        expected = ape_full.get_all_statistics()
+        for median_accuracy in (None, 0.01):
+            ape_metric = metrics.APE(metrics.PoseRelation.full_transformation,
+                                     accumulate=True,
+                                     median_accuracy=median_accuracy)
+            for i in range(0, 1000, 300):
+                ape_metric.process_data(
+                    (PosePath3D(poses_se3=path_ref.poses_se3[i:i + 300]),
+                     PosePath3D(poses_se3=path_est.poses_se3[i:i + 300])))
+            stats = ape_metric.get_result().stats
+            for name, value in expected.items():
+                if name == "median" and median_accuracy is not None:
+                    self.assertLessEqual(abs(stats[name] - value),
+                                         median_accuracy * value)
+                else:
+                    self.assertAlmostEqual(stats[name], value)
+
+
+class TestRPE(unittest.TestCase):
+    def test_same_as_single_pairs(self):
+        path_ref = helpers.fake_path(100)
+        path_est = helpers.fake_path(100)
+        Q, P = path_ref.poses_se3, path_est.poses_se3
+        E = [
+            metrics.RPE.rpe_base(Q[i], Q[i + 2], P[i], P[i + 2])
+            for i in range(98)
+        ]
+        for pose_relation in SE3_RELATIONS:
+            # Small chunks to test the chunked processing.
+            rpe_metric = metrics.RPE(pose_relation, delta=2,
+                                     all_pairs=True, chunk_size=7)
+            rpe_metric.process_data((path_ref, path_est))
+            self.assertEqual(rpe_metric.delta_ids, list(range(2, 100)))
+            self.assertTrue(np.allclose(rpe_metric.E, E))
+            self.assertTrue(
+                np.allclose(rpe_metric.error,
+                            errors_from_poses(E, pose_relation)))
+
+    def test_point_distance(self):
+        path_ref = helpers.fake_path(100)
+        path_est = helpers.fake_path(100)
+        rpe_metric = metrics.RPE(metrics.PoseRelation.point_distance)
+        rpe_metric.process_data((path_ref, path_est))
+        x_ref, x_est = path_ref.positions_xyz, path_est.positions_xyz
+        expected = [
+            abs(np.linalg.norm(x_ref[i + 1] - x_ref[i]) -
+                np.linalg.norm(x_est[i + 1] - x_est[i])) for i in range(99)
+        ]
+        self.assertTrue(np.allclose(rpe_metric.error, expected))
+
+    def test_empty_id_pairs(self):
+        path_ref = helpers.fake_path(10)
+        path_est = helpers.fake_path(10)
+        for pose_relation in (metrics.PoseRelation.translation_part,
+                              metrics.PoseRelation.point_distance):
+            rpe_metric = metrics.RPE(pose_relation)
+            with self.assertRaises(metrics.MetricsException):
+                rpe_metric.process_id_pairs((path_ref, path_est), [])
+
+    def test_invalid_chunk_size(self):
+        for chunk_size in (0, -1):
+            with self.assertRaises(metrics.MetricsException):
+                metrics.RPE(chunk_size=chunk_size)
+
+
+class TestRPEForDeltas(unittest.TestCase):
+    def test_same_as_single_deltas(self):
+        path_ref = helpers.fake_path(200)
+        path_est = helpers.fake_path(200)
+        deltas = [5., 2., 10.]
+        for all_pairs in (False, True):
+            rpe_metrics = metrics.rpe_for_deltas(
+                (path_ref, path_est), deltas, delta_unit=metrics.Unit.meters,
+                all_pairs=all_pairs)
+            self.assertEqual(len(rpe_metrics), len(deltas))
+            for delta, rpe_metric in zip(deltas, rpe_metrics):
+                single = metrics.RPE(delta=delta,
+                                     delta_unit=metrics.Unit.meters,
+                                     all_pairs=all_pairs)
+                single.process_data((path_ref, path_est))
+                self.assertEqual(rpe_metric.delta, delta)
+                self.assertEqual(rpe_metric.delta_ids, single.delta_ids)
+                self.assertTrue(np.array_equal(rpe_metric.error, single.error))
+
+
+class TestKittiOdometry(unittest.TestCase):
+    def test_same_as_loop(self):
+        path_ref = helpers.fake_path(100)
+        path_est = helpers.fake_path(100)
+        Q, P = path_ref.poses_se3, path_est.poses_se3
+        distances = path_ref.distances
+        lengths = (2., 5.)
+        expected_pairs, expected_t, expected_r = [], [], []
+        for i in range(0, 100, 3):
+            for length in lengths:
+                later = np.flatnonzero(distances > distances[i] + length)
+                if later.size == 0:
+                    continue
+                j = int(later[0])
+                E = metrics.RPE.rpe_base(Q[i], Q[j], P[i], P[j])
+                expected_pairs.append((i, j))
+                expected_t.append(np.linalg.norm(E[:3, 3]) / length * 100)
+                expected_r.append(lie.so3_log_angle(E[:3, :3]) / length)
+        kitti_t = metrics.KittiOdometry(metrics.PoseRelation.translation_part,
+                                        lengths, step_size=3)
+        kitti_t.process_data((path_ref, path_est))
+        self.assertEqual(kitti_t.id_pairs.tolist(),
+                         [list(pair) for pair in expected_pairs])
+        self.assertTrue(np.allclose(kitti_t.error, expected_t))
+        kitti_r = metrics.KittiOdometry(
+            metrics.PoseRelation.rotation_angle_rad, lengths, step_size=3)
+        kitti_r.process_data((path_ref, path_est))
+        self.assertTrue(np.allclose(kitti_r.error, expected_r))
+
+    def test_unsupported(self):
+        with self.assertRaises(metrics.MetricsException):
+            metrics.KittiOdometry(metrics.PoseRelation.full_transformation)
+        path = helpers.fake_path(10)
+        kitti = metrics.KittiOdometry(lengths=(1e6, ))
+        with self.assertRaises(metrics.MetricsException):
+            kitti.process_data((path, path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
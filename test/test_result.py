@@ -70,3 +70,43 @@ class TestMergeResult(unittest.TestCase):
         r2.add_stats({"foo": 1., "bar": 2.})
         with self.assertRaises(result.ResultException):
             result.merge_results([r1, r2])
+
+    def test_merge_n_results_equal_weights(self):
+        results = []
+        for i in range(5):
+            r = result.Result()
+            r.add_np_array("test", np.full(3, float(i)))
+            r.add_stats({"bla": float(i)})
+            results.append(r)
+        merged = result.merge_results(iter(results))
+        self.assertTrue(np.allclose(merged.np_arrays["test"], 2.))
+        self.assertEqual(merged.stats, {"bla": 2.})
+
+    def test_merger_with_array_headers(self):
+        for sizes in ((3, 3, 3), (3, 1, 2)):
+            results = []
+            for i, size in enumerate(sizes):
+                r = result.Result()
+                r.add_np_array("test", np.arange(size) + i)
+                r.add_stats({"bla": float(i)})
+                results.append(r)
+            headers = {
+                "test": [(r.np_arrays["test"].shape,
+                          r.np_arrays["test"].dtype) for r in results]
+            }
+            merger = result.ResultMerger(headers)
+            for r in results:
+                merger.add(r)
+            merged = merger.get_result()
+            expected = result.merge_results(results)
+            self.assertEqual(merged, expected)
+            self.assertEqual(merged.stats, {"bla": 1.})
+
+    def test_merger_with_wrong_array_headers(self):
+        r = result.Result()
+        r.add_np_array("test", np.arange(3))
+        merger = result.ResultMerger(
+            {"test": [((3, ), np.dtype(int)), ((1, ), np.dtype(int))]})
+        merger.add(r)
+        with self.assertRaises(result.ResultException):
+            merger.add(r)
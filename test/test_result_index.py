@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+unit test for the result_index module
+author: Michael Grupp
+
+This file is part of evo (github.com/MichaelGrupp/evo).
+
+evo is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+evo is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with evo.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from evo.core.result import Result
+from evo.tools import file_interface
+from evo.tools.result_index import ResultIndex, downsample
+
+
+def save_result(path: str, est_name: str, rmse: float) -> None:
+    result_obj = Result()
+    result_obj.add_info({"title": "APE", "est_name": est_name})
+    result_obj.add_stats({"rmse": rmse, "max": 2 * rmse})
+    result_obj.add_np_array("error_array", np.arange(5000.))
+    file_interface.save_res_file(path, result_obj)
+
+
+class TestResultIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.files = [
+            os.path.join(self.tmp_dir.name, "{}.zip".format(i))
+            for i in range(3)
+        ]
+        for i, path in enumerate(self.files):
+            save_result(path, "orb_{}".format(i) if i < 2 else "vins", i)
+        self.index = ResultIndex(os.path.join(self.tmp_dir.name, "index.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_incremental_update(self):
+        self.assertEqual(self.index.update(self.files), (3, 0))
+        self.assertEqual(self.index.update(self.files), (0, 3))
+        save_result(self.files[0], "orb_0", 42.)
+        os.utime(self.files[0], ns=(0, 0))
+        self.assertEqual(self.index.update(self.files), (1, 2))
+        df = self.index.query()
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df.loc[self.files[0], ("stats", "rmse")], 42.)
+
+    def test_query(self):
+        self.index.update(self.files)
+        df = self.index.query({"est_name": "orb_*"})
+        self.assertEqual(list(df.index), self.files[:2])
+        self.assertEqual(list(df["stats", "rmse"]), [0., 1.])
+        self.assertEqual(list(df["info", "est_name"]), ["orb_0", "orb_1"])
+        df = self.index.query({"est_name": "orb_*"}, paths=self.files[1:])
+        self.assertEqual(list(df.index), self.files[1:2])
+        os.utime(self.files[2], ns=(0, 0))
+        self.index.update(self.files)
+        df = self.index.query(min_mtime=time.time() - 3600)
+        self.assertEqual(list(df.index), self.files[:2])
+        self.assertTrue(self.index.query({"title": "RPE"}).empty)
+
+    def test_arrays(self):
+        self.index.update(self.files, ["error_array"], max_array_size=100)
+        array = self.index.load_array(self.files[0], "error_array")
+        self.assertTrue(
+            np.array_equal(array, downsample(np.arange(5000.), 100)))
+        self.assertEqual(array[[0, -1]].tolist(), [0., 4999.])
+        self.assertIsNone(self.index.load_array(self.files[0], "timestamps"))
+
+    def test_prune(self):
+        self.index.update(self.files)
+        os.remove(self.files[0])
+        self.assertEqual(self.index.prune(), 1)
+        self.assertEqual(list(self.index.query().index), self.files[1:])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -19,10 +19,16 @@ You should have received a copy of the GNU General Public License
 along with evo.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import copy
 import unittest
 
+import numpy as np
+
 import helpers
+from evo.core import metrics
 from evo.core import sync
+from evo.core import lie_algebra as lie
+from evo.core.trajectory import PoseTrajectory3D
 
 
 class TestMatchingTimeIndices(unittest.TestCase):
@@ -58,6 +64,30 @@ class TestMatchingTimeIndices(unittest.TestCase):
         self.assertEqual(len(matches[0]), 10)
         self.assertEqual(len(matches[1]), 10)
 
+    def test_same_as_brute_force(self):
+        stamps_1 = np.sort(np.random.uniform(0., 10., 300))
+        stamps_2 = np.sort(np.random.uniform(0., 10., 1000))
+        max_diff = 0.005
+        expected_1, expected_2 = [], []
+        for index_1, stamp_1 in enumerate(stamps_1):
+            diffs = np.abs(stamps_2 + 0.1 - stamp_1)
+            index_2 = int(np.argmin(diffs))
+            if diffs[index_2] <= max_diff:
+                expected_1.append(index_1)
+                expected_2.append(index_2)
+        matches = sync.matching_time_indices(stamps_1, stamps_2, max_diff,
+                                             offset_2=0.1)
+        self.assertEqual(matches, (expected_1, expected_2))
+
+    def test_unique_matches(self):
+        stamps_1 = np.array([0., 0.1, 0.11, 0.2])
+        stamps_2 = np.array([0., 0.1, 0.2])
+        matches = sync.matching_time_indices(stamps_1, stamps_2, max_diff=0.05)
+        self.assertEqual(matches, ([0, 1, 2, 3], [0, 1, 1, 2]))
+        matches = sync.matching_time_indices(stamps_1, stamps_2, max_diff=0.05,
+                                             unique_matches=True)
+        self.assertEqual(matches, ([0, 1, 3], [0, 1, 2]))
+
 
 class TestAssociateTrajectories(unittest.TestCase):
     def test_wrong_type(self):
@@ -80,6 +110,134 @@ class TestAssociateTrajectories(unittest.TestCase):
         self.assertNotEqual(traj_2.num_poses, traj_2_sync.num_poses)
         self.assertEqual(traj_2_sync.num_poses, 10)
 
+    def test_association_shares_memory(self):
+        traj_1 = helpers.fake_trajectory(10, 0.1)
+        traj_2 = helpers.fake_trajectory(10, 0.1)
+        traj_1_backup = copy.deepcopy(traj_1)
+        traj_1_sync, traj_2_sync = sync.associate_trajectories(traj_1, traj_2)
+        self.assertTrue(
+            np.shares_memory(traj_1.poses_se3, traj_1_sync.poses_se3))
+        self.assertTrue(
+            np.shares_memory(traj_1.timestamps, traj_1_sync.timestamps))
+        # Modifying the synchronized trajectory must not affect the input.
+        traj_1_sync.transform(lie.random_se3())
+        traj_1_sync.scale(2.)
+        traj_1_sync.timestamps += 1.
+        self.assertEqual(traj_1, traj_1_backup)
+        self.assertTrue(np.array_equal(traj_1.timestamps,
+                                       traj_1_backup.timestamps))
+
+    def test_association_copy_on_write(self):
+        # Contiguous matches (views) and non-contiguous ones (copies)
+        # must behave the same.
+        traj_1 = helpers.fake_trajectory(10, 0.1)
+        for traj_2 in (helpers.fake_trajectory(10, 0.1),
+                       helpers.fake_trajectory(5, 0.2)):
+            traj_1_backup = copy.deepcopy(traj_1)
+            traj_1_sync, traj_2_sync = sync.associate_trajectories(
+                traj_1, traj_2)
+            with self.assertRaises(ValueError):
+                traj_1_sync.timestamps[0] = 42.
+            traj_1_sync.align(traj_2_sync)
+            traj_1_sync.timestamps[0] = 42.
+            traj_1_sync.positions_xyz[0] = 42.
+            self.assertEqual(traj_1, traj_1_backup)
+            self.assertTrue(
+                np.array_equal(traj_1.timestamps, traj_1_backup.timestamps))
+
+    def test_association_read_only_not_copied(self):
+        # Arrays that are read-only anyway (like memory maps) stay shared
+        # after the synchronized trajectory is modified.
+        traj_1 = helpers.fake_trajectory(10, 0.1)
+        traj_1.timestamps.flags.writeable = False
+        traj_2 = helpers.fake_trajectory(10, 0.1)
+        traj_1_sync, traj_2_sync = sync.associate_trajectories(traj_1, traj_2)
+        traj_1_sync.align(traj_2_sync)
+        self.assertTrue(
+            np.shares_memory(traj_1_sync.timestamps, traj_1.timestamps))
+        self.assertFalse(
+            np.shares_memory(traj_1_sync.positions_xyz, traj_1.positions_xyz))
+        traj_1_sync.positions_xyz[0] = 42.
+        traj_2_sync.scale(2.)
+        self.assertFalse(
+            np.shares_memory(traj_2_sync.timestamps, traj_2.timestamps))
+
+
+class TestAssociateTrajectoryStreams(unittest.TestCase):
+    @staticmethod
+    def chunks(traj, chunk_size):
+        return (PoseTrajectory3D(traj.positions_xyz[i:i + chunk_size],
+                                 traj.orientations_quat_wxyz[i:i + chunk_size],
+                                 traj.timestamps[i:i + chunk_size])
+                for i in range(0, traj.num_poses, chunk_size))
+
+    def test_same_as_associate_trajectories(self):
+        traj_1 = helpers.fake_trajectory(100, 0.1)
+        traj_2 = helpers.fake_trajectory(1000, 0.01, start_time=0.5)
+        for offset_2 in (0., 0.2, -0.3):
+            expected_1, expected_2 = sync.associate_trajectories(
+                traj_1, traj_2, max_diff=0.005, offset_2=offset_2)
+            for chunk_size_1, chunk_size_2 in ((7, 13), (100, 1), (1, 1000)):
+                pairs = list(
+                    sync.associate_trajectory_streams(
+                        self.chunks(traj_1, chunk_size_1),
+                        self.chunks(traj_2, chunk_size_2), max_diff=0.005,
+                        offset_2=offset_2))
+                for i, expected in enumerate((expected_1, expected_2)):
+                    self.assertTrue(
+                        np.array_equal(
+                            np.concatenate([p[i].timestamps for p in pairs]),
+                            expected.timestamps))
+                    self.assertTrue(
+                        np.allclose(
+                            np.concatenate([p[i].poses_se3 for p in pairs]),
+                            expected.poses_se3))
+
+    def test_both_orders_same_as_ape(self):
+        # Dense reference and sparse estimate with jittered timestamps.
+        traj_ref = helpers.fake_trajectory(1000, 0.01)
+        traj_est = helpers.fake_trajectory(300, 0.033, start_time=0.2)
+        traj_est.timestamps = traj_est.timestamps + np.random.uniform(
+            -0.004, 0.004, traj_est.num_poses)
+        for first, second in ((traj_ref, traj_est), (traj_est, traj_ref)):
+            expected_1, expected_2 = sync.associate_trajectories(
+                first, second, max_diff=0.01)
+            ape_expected = metrics.APE(metrics.PoseRelation.translation_part)
+            ape_expected.process_data((expected_1, expected_2))
+            ape_metric = metrics.APE(metrics.PoseRelation.translation_part,
+                                     accumulate=True)
+            num_pairs = 0
+            for chunk_1, chunk_2 in sync.associate_trajectory_streams(
+                    self.chunks(first, 64), self.chunks(second, 50),
+                    max_diff=0.01):
+                num_pairs += chunk_1.num_poses
+                ape_metric.process_data((chunk_1, chunk_2))
+            self.assertEqual(num_pairs, expected_1.num_poses)
+            stats = ape_metric.get_result().stats
+            for name, value in ape_expected.get_all_statistics().items():
+                self.assertAlmostEqual(stats[name], value)
+
+    def test_one_to_one(self):
+        traj_1 = helpers.fake_trajectory(100, 0.01)
+        traj_2 = helpers.fake_trajectory(10, 0.1, start_time=0.001)
+        for first, second in ((traj_1, traj_2), (traj_2, traj_1)):
+            pairs = list(
+                sync.associate_trajectory_streams(self.chunks(first, 7),
+                                                  self.chunks(second, 3),
+                                                  max_diff=0.05))
+            for i in range(2):
+                stamps = np.concatenate([p[i].timestamps for p in pairs])
+                self.assertEqual(stamps.size, 10)
+                self.assertEqual(np.unique(stamps).size, 10)
+
+    def test_unsorted(self):
+        traj = helpers.fake_trajectory(10, 0.1)
+        with self.assertRaises(sync.SyncException):
+            list(
+                sync.associate_trajectory_streams(
+                    reversed(list(self.chunks(traj, 3))),
+                    self.chunks(traj, 3)))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -19,6 +19,8 @@ You should have received a copy of the GNU General Public License
 along with evo.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import os
+import tempfile
 import unittest
 import copy
 
@@ -99,6 +101,28 @@ class TestPosePath3D(unittest.TestCase):
         len_reduced = path_reduced.path_length
         self.assertAlmostEqual(len_initial_segment, len_reduced)
 
+    def test_poses_se3_storage(self):
+        poses = helpers.random_se3_list(10)
+        path = PosePath3D(poses_se3=poses)
+        self.assertIsInstance(path.poses_se3, np.ndarray)
+        self.assertEqual(path.poses_se3.shape, (10, 4, 4))
+        # Still usable like a list of 4x4 matrices.
+        self.assertEqual(len(path.poses_se3), 10)
+        for p_in, p_stored in zip(poses, path.poses_se3):
+            self.assertTrue(np.array_equal(p_in, p_stored))
+        with self.assertRaises(trajectory.TrajectoryException):
+            PosePath3D(poses_se3=np.zeros((10, 3, 4)))
+
+    def test_transform_right_mul_propagate(self):
+        path = helpers.fake_path(10)
+        path_transformed = copy.deepcopy(path)
+        t = lie.random_se3()
+        path_transformed.transform(t, right_mul=True, propagate=True)
+        expected = [path.poses_se3[0]]
+        for p_i, p_j in zip(path.poses_se3, path.poses_se3[1:]):
+            expected.append(expected[-1].dot(lie.relative_se3(p_i, p_j)).dot(t))
+        self.assertTrue(np.allclose(path_transformed.poses_se3, expected))
+
     def test_transform(self):
         path = helpers.fake_path(10)
         path_transformed = copy.deepcopy(path)
@@ -131,6 +155,19 @@ class TestPosePath3D(unittest.TestCase):
         path_wrong._orientations_quat_wxyz[1][1] = 666
         self.assertFalse(path_wrong.check()[0])
 
+    def test_so3_validated(self):
+        path = helpers.fake_path(10)
+        self.assertFalse(path.so3_validated)
+        self.assertTrue(path.check()[0])
+        self.assertTrue(path.so3_validated)
+        path.transform(lie.random_se3())
+        path.scale(2.)
+        path.reduce_to_ids([1, 2, 3])
+        self.assertTrue(path.so3_validated)
+        path.transform(lie.sim3(r=lie.random_so3(), t=np.ones(3), s=1.234))
+        self.assertFalse(path.so3_validated)
+        self.assertTrue(helpers.fake_path(10).validate_so3())
+
     def test_get_infos(self):
         helpers.fake_path(10).get_infos()
 
@@ -173,6 +210,48 @@ class TestPoseTrajectory3D(unittest.TestCase):
         self.assertGreaterEqual(traj.timestamps[0], start)
         self.assertLessEqual(traj.timestamps[-1], end)
 
+    def test_memmap(self):
+        traj = helpers.fake_trajectory(100, 0.1)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            arrays = {}
+            for name in ("timestamps", "positions_xyz",
+                         "orientations_quat_wxyz"):
+                file_path = os.path.join(tmp_dir, name + ".npy")
+                np.save(file_path, getattr(traj, name))
+                arrays[name] = np.load(file_path, mmap_mode='r')
+            traj_mmap = PoseTrajectory3D(**arrays)
+            self.assertIsInstance(traj_mmap.positions_xyz, np.memmap)
+            self.assertTrue(traj_mmap == traj)
+            # Chunk-wise read-only operations give the same results.
+            chunk_size = trajectory.CHUNK_SIZE
+            trajectory.CHUNK_SIZE = 7
+            try:
+                stats = traj_mmap.get_statistics()
+                for k, v in traj.get_statistics().items():
+                    self.assertAlmostEqual(stats[k], v)
+                start, end = traj.timestamps[[10, 50]]
+                traj.reduce_to_time_range(start, end)
+                traj_mmap.reduce_to_time_range(start, end)
+            finally:
+                trajectory.CHUNK_SIZE = chunk_size
+            # Reduced to views of the memory maps.
+            self.assertIsInstance(traj_mmap.timestamps, np.memmap)
+            self.assertTrue(traj_mmap == traj)
+            del traj_mmap, arrays
+
+    def test_speeds(self):
+        traj = helpers.fake_trajectory(100, 0.1)
+        expected = [
+            trajectory.calc_speed(traj.positions_xyz[i],
+                                  traj.positions_xyz[i + 1],
+                                  traj.timestamps[i], traj.timestamps[i + 1])
+            for i in range(99)
+        ]
+        self.assertTrue(np.allclose(traj.speeds, expected))
+        traj.timestamps[5] = traj.timestamps[4]
+        with self.assertRaises(trajectory.TrajectoryException):
+            traj.speeds
+
     def test_reduce_to_empty_time_range(self):
         """
         A time-range that doesn't intersect should produce an empty trajectory.